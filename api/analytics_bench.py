@@ -0,0 +1,67 @@
+# api/analytics_bench.py
+"""
+Round-trip benchmark for the /analytics/metrics computation: builds each
+semester's payload the way analytics_snapshots.rebuild() does, counting the
+statements sent to the database and timing the build. Runs against
+DATABASE_URL and writes nothing, so the count can be compared with the
+module count on real data (it should stay at 2 however many modules).
+
+    python -m api.analytics_bench            # every semester with modules, 5 runs each
+    python -m api.analytics_bench 3 10       # semester 3, 10 runs
+"""
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from . import analytics_snapshots, models
+from .database import SessionLocal, engine
+
+
+def run(semester_ids: Optional[List[int]] = None, n: int = 5) -> List[dict]:
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    db = SessionLocal()
+    try:
+        if semester_ids is None:
+            semester_ids = sorted(s for (s,) in db.query(models.Module.semester).distinct())
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            out = []
+            for sid in semester_ids:
+                times, queries, modules = [], set(), 0
+                for _ in range(n):
+                    statements[0] = 0
+                    t0 = time.perf_counter()
+                    rows = analytics_snapshots._module_counts(db, semester_id=sid)
+                    counts = {code: {"name": name, "offers": o, "scheduled": s} for code, name, _, o, s in rows}
+                    analytics_snapshots._render(counts, analytics_snapshots._lecturer_stats(db))
+                    times.append((time.perf_counter() - t0) * 1000)
+                    queries.add(statements[0])
+                    modules = len(counts)
+                    db.rollback()
+                out.append(
+                    {
+                        "semester_id": sid,
+                        "modules": modules,
+                        "queries": sorted(queries),
+                        "ms_median": round(statistics.median(times), 2),
+                        "ms_max": round(max(times), 2),
+                    }
+                )
+            return out
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    for row in run([args[0]] if args else None, args[1] if len(args) > 1 else 5):
+        print(row)
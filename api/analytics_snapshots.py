@@ -0,0 +1,217 @@
+# api/analytics_snapshots.py
+"""
+Precomputed /analytics/metrics payloads, one row per module semester.
+
+A snapshot stores the per-module counts it was built from next to the
+rendered payload. Writers call refresh_modules() with the module codes they
+touched; only those modules are re-counted and patched into the affected
+snapshots, so the dashboard read stays a single primary-key lookup.
+
+Rebuild from the command line:
+    python -m api.analytics_snapshots            # every semester
+    python -m api.analytics_snapshots 1 2        # selected semesters
+"""
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def _module_counts(db: Session, semester_id: Optional[int] = None, module_codes: Optional[Iterable[str]] = None):
+    """[(module_code, name, semester, offers, scheduled)] from one grouped query."""
+    q = db.query(
+        models.Module.module_code,
+        models.Module.name,
+        models.Module.semester,
+        func.count(func.distinct(models.OfferedModule.id)),
+        func.count(models.ScheduleEntry.id),
+    )\
+        .outerjoin(models.OfferedModule, models.Module.module_code == models.OfferedModule.module_code)\
+        .outerjoin(models.ScheduleEntry, models.OfferedModule.id == models.ScheduleEntry.offered_module_id)
+    if semester_id is not None:
+        q = q.filter(models.Module.semester == semester_id)
+    if module_codes is not None:
+        q = q.filter(models.Module.module_code.in_(list(module_codes)))
+    return q.group_by(models.Module.module_code, models.Module.name, models.Module.semester).all()
+
+
+def _lecturer_stats(db: Session) -> List[dict]:
+    rows = db.query(
+        models.Lecturer.employment_type,
+        func.count(models.Lecturer.id)
+    ).group_by(models.Lecturer.employment_type).all()
+    return [{"name": r[0], "value": r[1]} for r in rows]
+
+
+def _render(module_counts: Dict[str, dict], lecturer_stats: List[dict]) -> dict:
+    rows = [module_counts[code] for code in sorted(module_counts)]
+
+    total_modules = len(rows)
+    scheduled_modules = sum(1 for r in rows if r["scheduled"] > 0)
+    planning_progress = int((scheduled_modules / total_modules) * 100) if total_modules > 0 else 0
+    missing_units = sum(1 for r in rows if r["offers"] == 0)
+
+    return {
+        "kpis": {
+            "missing_units": missing_units,
+            "pending_requests": 0,  # you don’t have request table
+            "planning_progress": planning_progress,
+            "total_modules": total_modules
+        },
+        "lecturer_stats": lecturer_stats,
+        "bar_data": [
+            {
+                "name": r["name"],
+                "needed": 1,  # since you don’t have required_hours
+                "scheduled": r["scheduled"]
+            }
+            for r in rows
+        ],
+    }
+
+
+def _store(db: Session, semester_id: int, module_counts: Dict[str, dict], lecturer_stats: List[dict],
+           snap: Optional[models.AnalyticsSnapshot] = None) -> models.AnalyticsSnapshot:
+    if snap is None:
+        snap = db.get(models.AnalyticsSnapshot, semester_id)
+    if snap is None:
+        snap = models.AnalyticsSnapshot(semester_id=semester_id)
+        db.add(snap)
+    # assign fresh objects so the JSON columns are flagged dirty
+    snap.module_counts = dict(module_counts)
+    snap.payload = _render(module_counts, lecturer_stats)
+    snap.refreshed_at = datetime.utcnow()
+    return snap
+
+
+def _lock_snapshots(db: Session, semester_ids: Iterable[int]) -> List[models.AnalyticsSnapshot]:
+    """Existing snapshots of `semester_ids`, row-locked in key order until commit."""
+    return (
+        db.query(models.AnalyticsSnapshot)
+        .filter(models.AnalyticsSnapshot.semester_id.in_(list(semester_ids)))
+        .order_by(models.AnalyticsSnapshot.semester_id)
+        .with_for_update()
+        .all()
+    )
+
+
+def rebuild(db: Session, semester_id: int) -> models.AnalyticsSnapshot:
+    snap = next(iter(_lock_snapshots(db, [semester_id])), None)
+    counts = {
+        code: {"name": name, "offers": offers, "scheduled": scheduled}
+        for code, name, _, offers, scheduled in _module_counts(db, semester_id=semester_id)
+    }
+    snap = _store(db, semester_id, counts, _lecturer_stats(db), snap=snap)
+    db.commit()
+    return snap
+
+
+def rebuild_all(db: Session, semester_ids: Optional[Iterable[int]] = None) -> List[int]:
+    if semester_ids is None:
+        semester_ids = {s for (s,) in db.query(models.Module.semester).distinct()}
+        semester_ids |= {s for (s,) in db.query(models.AnalyticsSnapshot.semester_id)}
+    done = []
+    for sid in sorted(set(semester_ids)):
+        rebuild(db, sid)
+        done.append(sid)
+    return done
+
+
+def get_or_build(db: Session, semester_id: int) -> models.AnalyticsSnapshot:
+    snap = db.get(models.AnalyticsSnapshot, semester_id)
+    if snap is not None:
+        return snap
+    try:
+        return rebuild(db, semester_id)
+    except IntegrityError:
+        # a concurrent first request inserted the row; use theirs
+        db.rollback()
+        return db.get(models.AnalyticsSnapshot, semester_id) or rebuild(db, semester_id)
+
+
+def module_codes_for_offers(db: Session, offer_ids: Iterable[int]) -> List[str]:
+    ids = list(set(offer_ids))
+    if not ids:
+        return []
+    return [
+        c for (c,) in db.query(models.OfferedModule.module_code)
+        .filter(models.OfferedModule.id.in_(ids))
+        .distinct()
+    ]
+
+
+def refresh_modules(db: Session, module_codes: Iterable[str], semesters: Iterable[int] = ()):
+    """
+    Re-count `module_codes` and patch them into existing snapshots. Pass the
+    previous semester(s) in `semesters` when a module moved or was deleted.
+    Call after the write has been committed.
+    """
+    codes = {c for c in module_codes if c}
+    if not codes:
+        return
+    try:
+        # lock the snapshots first and count afterwards: a concurrent refresh
+        # that counted earlier must not be able to commit its counts last
+        affected = set(semesters) | {
+            sem for (sem,) in db.query(models.Module.semester).filter(models.Module.module_code.in_(codes)).distinct()
+        }
+        snaps = _lock_snapshots(db, affected)
+        fresh = {
+            code: (semester, {"name": name, "offers": offers, "scheduled": scheduled})
+            for code, name, semester, offers, scheduled in _module_counts(db, module_codes=codes)
+        }
+        moved = {sem for sem, _ in fresh.values()} - affected
+        if moved:
+            # a module changed semester after the lookup above
+            snaps += _lock_snapshots(db, moved)
+        for snap in snaps:
+            counts = {k: v for k, v in (snap.module_counts or {}).items() if k not in codes}
+            for code, (sem, row) in fresh.items():
+                if sem == snap.semester_id:
+                    counts[code] = row
+            _store(db, snap.semester_id, counts, snap.payload.get("lecturer_stats") or [], snap=snap)
+        db.commit()
+    except Exception:
+        # never fail the caller's (already committed) write; drop the snapshots so reads rebuild them
+        db.rollback()
+        invalidate(db)
+
+
+def refresh_lecturer_stats(db: Session):
+    """Employment-type counts are global; patch them into every snapshot."""
+    try:
+        snaps = db.query(models.AnalyticsSnapshot).order_by(models.AnalyticsSnapshot.semester_id).with_for_update().all()
+        stats = _lecturer_stats(db)
+        for snap in snaps:
+            _store(db, snap.semester_id, snap.module_counts or {}, stats, snap=snap)
+        db.commit()
+    except Exception:
+        db.rollback()
+        invalidate(db)
+
+
+def invalidate(db: Session, semester_ids: Optional[Iterable[int]] = None):
+    try:
+        q = db.query(models.AnalyticsSnapshot)
+        if semester_ids is not None:
+            q = q.filter(models.AnalyticsSnapshot.semester_id.in_(list(semester_ids)))
+        q.delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+
+
+if __name__ == "__main__":
+    from .database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        ids = [int(a) for a in sys.argv[1:]] or None
+        print("Rebuilt analytics snapshots for semesters:", rebuild_all(session, ids))
+    finally:
+        session.close()
@@ -1,10 +1,12 @@
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
@@ -18,28 +20,145 @@ SECRET_KEY = os.getenv("SECRET_KEY", "FALLBACK_DEV_KEY_ONLY_CHANGE_ME_IN_PROD")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# passlib/bcrypt and jose are imported on first use, not at cold start
+_pwd_context = None
+
+
+def _get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
 
 # --- UTILS ---
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict):
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# --- RESOLVED USER CACHE ---
+class UserCache:
+    """
+    Bounded LRU of resolved users keyed by token subject (email), each entry
+    valid for `ttl` seconds. Holds plain column values, never ORM instances,
+    so nothing is shared between request sessions.
+
+    This process drops a user's entry when a change to that user commits.
+    Other instances only see the change once their entry expires, so a role
+    change or delete takes up to AUTH_USER_CACHE_TTL_SECONDS to reach them.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()  # email -> (expires_at, {column: value})
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate(); see put()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, key: str, value: dict, generation: Optional[int] = None):
+        """`generation` from before the row was read: skips the put if an invalidation happened since."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+user_cache = UserCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_users(session, flush_context, instances):
+    emails = set()
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User):
+            emails.add(obj.email)
+            emails.update(inspect(obj).attrs.email.history.deleted or ())
+    if emails:
+        session.info.setdefault("changed_user_emails", set()).update(emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_cached_users(session):
+    # only once the change is visible to other sessions, so nobody re-caches the old row
+    for email in session.info.pop("changed_user_emails", ()):
+        user_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop("changed_user_emails", None)
+
+
 # --- DEPENDENCY: Get Current User ---
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -56,9 +175,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise credentials_exception
+    cached = user_cache.get(email)
+    if cached is None:
+        generation = user_cache.generation()
+        row = db.query(models.User).filter(models.User.email == email).first()
+        if row is None:
+            raise credentials_exception
+        cached = {"id": row.id, "email": row.email, "role": row.role}
+        user_cache.put(email, cached, generation)
+
+    # fresh, session-less instance per request (routers only read its attributes)
+    user = models.User(**cached)
 
     # NEW: Dynamically attach lecturer_id to the user object
     # This ensures backward compatibility with your permissions.py file
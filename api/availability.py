@@ -0,0 +1,116 @@
+# api/availability.py
+"""
+"Who is free" lookups over lecturer availability.
+
+Each LecturerAvailability row carries its schedule_data as a weekly bitmap of
+15-minute slots (api/timeslots.py), written by /availabilities/update. All
+bitmaps are held in-process per lecturer, so checking a time range is one
+AND per qualified lecturer instead of walking JSON. The map is reloaded after
+AVAILABILITY_INDEX_TTL_SECONDS to pick up other instances' writes.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models, conflicts
+from .timeslots import (
+    availability_bitmap, bitmap_from_hex, bitmap_to_hex, day_index, hhmm_to_minutes, range_bitmap,
+)
+
+INDEX_TTL_SECONDS = float(os.getenv("AVAILABILITY_INDEX_TTL_SECONDS", "60"))
+
+_lock = threading.Lock()
+_cache = None  # (loaded_at, {lecturer_id: bitmap or None})
+
+
+def set_bitmap(row: models.LecturerAvailability):
+    """Keep slot_bitmap in step with schedule_data; call before committing a write."""
+    row.slot_bitmap = bitmap_to_hex(availability_bitmap(row.schedule_data))
+
+
+def _load(db: Session) -> Dict[int, Optional[int]]:
+    la = models.LecturerAvailability
+    out: Dict[int, Optional[int]] = {}
+    unconverted = []
+    for lecturer_id, bitmap in db.query(la.lecturer_id, la.slot_bitmap):
+        if bitmap is None:
+            unconverted.append(lecturer_id)
+        else:
+            out[lecturer_id] = bitmap_from_hex(bitmap)
+    if unconverted:
+        # rows written before slot_bitmap existed
+        for lecturer_id, data in db.query(la.lecturer_id, la.schedule_data).filter(la.lecturer_id.in_(unconverted)):
+            out[lecturer_id] = availability_bitmap(data)
+    return out
+
+
+def bitmaps(db: Session) -> Dict[int, Optional[int]]:
+    """lecturer_id -> bitmap; None = recorded without restriction. Missing = no record."""
+    global _cache
+    now = time.monotonic()
+    with _lock:
+        if _cache and now - _cache[0] < INDEX_TTL_SECONDS:
+            return _cache[1]
+    data = _load(db)
+    with _lock:
+        _cache = (now, data)
+    return data
+
+
+def invalidate():
+    global _cache
+    with _lock:
+        _cache = None
+
+
+def free_lecturers(
+    db: Session,
+    module_code: str,
+    day_of_week: str,
+    start_time: str,
+    end_time: str,
+    semester: Optional[str] = None,
+) -> List[dict]:
+    """
+    Lecturers qualified for `module_code` (lecturer_modules) whose availability
+    covers the whole range and, if `semester` is given, who have no schedule
+    entry overlapping it. Lecturers without availability data count as free.
+    Raises ValueError for a bad day/time.
+    """
+    need = range_bitmap(day_of_week, start_time, end_time)
+    day = day_index(day_of_week)
+    start, end = hhmm_to_minutes(start_time), hhmm_to_minutes(end_time)
+
+    qualified = (
+        db.query(models.Lecturer.id, models.Lecturer.first_name, models.Lecturer.last_name)
+        .join(models.lecturer_modules, models.lecturer_modules.c.lecturer_id == models.Lecturer.id)
+        .filter(models.lecturer_modules.c.module_code == module_code)
+        .order_by(models.Lecturer.id)
+        .all()
+    )
+    if not qualified:
+        return []
+
+    avail = bitmaps(db)
+    busy = set()
+    if semester:
+        busy = conflicts.busy_resources(db, semester, "lecturer", [lid for lid, _, _ in qualified], day, start, end)
+
+    out = []
+    for lid, first, last in qualified:
+        if lid in busy:
+            continue
+        bits = avail.get(lid)
+        if bits is not None and bits & need != need:
+            continue
+        out.append(
+            {
+                "lecturer_id": lid,
+                "name": f"{first} {last or ''}".strip(),
+                "has_availability": bits is not None,
+            }
+        )
+    return out
@@ -0,0 +1,60 @@
+# api/coldstart.py
+"""
+Cold-start benchmark: time from interpreter start of `import api.index` to the
+first response of GET /, measured in fresh processes (like a new serverless
+instance). The request goes straight through the ASGI app, no server needed.
+
+    python -m api.coldstart          # 5 runs
+    python -m api.coldstart 10
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+_PROBE = r"""
+import asyncio, time
+t0 = time.perf_counter()
+from api.index import app
+t_import = time.perf_counter()
+
+async def first_response():
+    sent = []
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+             "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80)}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+status = asyncio.run(first_response())
+t_resp = time.perf_counter()
+print(f"{(t_import - t0) * 1000:.1f} {(t_resp - t0) * 1000:.1f} {status}")
+"""
+
+
+def run(n: int = 5) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    imports, firsts = [], []
+    for _ in range(n):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        t_import, t_first, status = out.split()
+        if status != "200":
+            raise RuntimeError(f"GET / returned {status}")
+        imports.append(float(t_import))
+        firsts.append(float(t_first))
+    return {
+        "runs": n,
+        "import_ms_median": round(statistics.median(imports), 1),
+        "first_response_ms_median": round(statistics.median(firsts), 1),
+        "first_response_ms_max": round(max(firsts), 1),
+    }
+
+
+if __name__ == "__main__":
+    print(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
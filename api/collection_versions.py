@@ -0,0 +1,174 @@
+# api/collection_versions.py
+"""
+Version counters behind the ETags of the big list endpoints.
+
+Flushes record which lists a write changed: any insert or delete of a tracked
+model, an update only when it changes a column the list shows (see
+_ONLY_ON). The counters are bumped once per transaction in before_commit,
+in sorted name order, so the row locks are held only for the commit itself
+and a reader can never see a new version with old rows. A list GET then
+costs one primary-key lookup when the client already holds the current
+ETag (If-None-Match -> 304).
+"""
+import time
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import engine, fetch_all
+
+# model -> list endpoints whose payload includes its rows
+_DEPENDENTS = {
+    models.Module: ("modules", "lecturers", "study-programs", "schedule"),
+    models.Specialization: ("specializations", "modules"),
+    models.ModuleAssessment: ("modules",),
+    models.Lecturer: ("lecturers", "study-programs", "schedule"),
+    models.Domain: ("domains", "lecturers", "study-programs"),
+    models.StudyProgram: ("study-programs",),
+    models.Room: ("rooms", "schedule"),
+    models.Group: ("groups", "schedule"),
+    models.Semester: ("semesters", "schedule"),
+    models.SchedulerConstraint: ("constraints",),
+    # calendar feeds (api/ical.py) embed names of all of the above
+    models.OfferedModule: ("schedule",),
+    models.ScheduleEntry: ("schedule",),
+}
+
+# (model, list) -> the columns of an update that change that list; other
+# updates of the model leave it alone. Unlisted pairs: any update counts.
+_ONLY_ON = {
+    (models.Module, "schedule"): ("module_code", "name"),
+    (models.Lecturer, "schedule"): ("first_name", "last_name"),
+    (models.Room, "schedule"): ("name",),
+    (models.Group, "schedule"): ("name",),
+    (models.Semester, "schedule"): ("name", "acronym", "start_date", "end_date"),
+}
+
+_table = models.CollectionVersion.__table__
+_table_checked_at = None
+_table_exists = False
+
+
+def _enabled() -> bool:
+    # databases not yet migrated have no collection_versions table: no ETags, writes unaffected
+    global _table_checked_at, _table_exists
+    now = time.monotonic()
+    if not _table_exists and (_table_checked_at is None or now - _table_checked_at > 60):
+        _table_checked_at = now
+        try:
+            _table_exists = inspect(engine).has_table(_table.name)
+        except Exception:
+            _table_exists = False
+    return _table_exists
+
+
+def _changed_lists(session: Session, obj) -> set:
+    names = _DEPENDENTS.get(type(obj), ())
+    if not names or obj in session.new or obj in session.deleted:
+        return set(names)
+    if not session.is_modified(obj):
+        return set()
+    attrs = inspect(obj).attrs
+    out = set()
+    for name in names:
+        only = _ONLY_ON.get((type(obj), name))
+        if only is None or any(attrs[a].history.has_changes() for a in only):
+            out.add(name)
+    return out
+
+
+@event.listens_for(Session, "before_flush")
+def _collect(session, flush_context, instances):
+    names = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        names |= _changed_lists(session, obj)
+    if names:
+        session.info.setdefault("bump_collections", set()).update(names)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_committing(session):
+    # the commit's own final flush runs after this hook; do it first so its
+    # writes are counted
+    session.flush()
+    names = session.info.pop("bump_collections", None)
+    # new counter values, read by later before_commit hooks (schedule_revisions)
+    session.info["commit_versions"] = _bump(session, names) if names else {}
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    session.info.pop("bump_collections", None)
+    session.info.pop("commit_versions", None)
+
+
+def mark_changed(session: Session, *names: str):
+    """For Core insert/update/delete through `session`, which the flush hook never sees."""
+    session.info.setdefault("bump_collections", set()).update(names)
+
+
+def _bump(session: Session, names: set) -> Dict[str, int]:
+    """Increments the counters; returns their new values (empty before the table exists)."""
+    # picked up after commit by response_cache
+    session.info.setdefault("changed_collections", set()).update(names)
+    if not _enabled():
+        return {}
+    conn = session.connection()
+    out = {}
+    for name in sorted(names):  # fixed order, no lock-order deadlocks between writers
+        res = conn.execute(
+            update(_table).where(_table.c.name == name).values(version=_table.c.version + 1).returning(_table.c.version)
+        ).scalar()
+        if res is None:
+            conn.execute(insert(_table).values(name=name, version=1))
+            res = 1
+        out[name] = res
+    return out
+
+
+def _etag(name: str, version: Optional[int], variant: str) -> Optional[str]:
+    if version is None:
+        return None
+    return f'"{name}-{version}{variant}"'
+
+
+def _conditional(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    inm = request.headers.get("if-none-match")
+    if inm:
+        tags = [t.strip() for t in inm.split(",")]
+        if "*" in tags or etag in tags or f"W/{etag}" in tags:
+            return Response(status_code=304, headers=headers)
+    return None
+
+
+def version(db: Session, name: str) -> Optional[int]:
+    if not _enabled():
+        return None
+    return db.execute(select(_table.c.version).where(_table.c.name == name)).scalar() or 0
+
+
+async def version_async(db, name: str) -> Optional[int]:
+    """Same as version() for a get_read_db session (sync or async)."""
+    if not _enabled():
+        return None
+    rows = await fetch_all(db, select(_table.c.version).where(_table.c.name == name))
+    return rows[0] if rows else 0
+
+
+def not_modified(request: Request, response: Response, db: Session, name: str, variant: str = "") -> Optional[Response]:
+    """
+    Sets the collection's ETag on `response`; returns a 304 to send instead
+    when the client's If-None-Match already matches it.
+    """
+    return _conditional(request, response, _etag(name, version(db, name), variant))
+
+
+async def not_modified_async(request: Request, response: Response, db, name: str, variant: str = "") -> Optional[Response]:
+    return _conditional(request, response, _etag(name, await version_async(db, name), variant))
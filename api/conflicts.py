@@ -0,0 +1,305 @@
+# api/conflicts.py
+"""
+Double-booking checks for schedule entries.
+
+Each semester gets an in-process interval index: per (resource, day) a list
+of (start, end, entry_id) sorted by start, so a check is a bisect plus a
+short backwards walk instead of scanning the whole semester. The index is
+loaded with one query (served by the composite index on schedule_entries),
+kept in sync by this process's own writes and reloaded after
+SCHEDULE_INDEX_TTL_SECONDS to pick up writes from other instances, so it can
+be up to that stale: it only serves read-only checks (/schedule/check,
+/rooms/free).
+
+Writes use find_write_conflicts() instead: a range query on
+(semester, week_start_minute) inside the write transaction, after taking a
+per-semester lock that is held until commit, so of two concurrent writers the
+second one sees the first one's entry.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from . import models
+from .timeslots import DAYS, MINUTES_PER_DAY, day_index, hhmm_to_minutes, minutes_to_hhmm
+
+INDEX_TTL_SECONDS = float(os.getenv("SCHEDULE_INDEX_TTL_SECONDS", "60"))
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self._lists: Dict[tuple, list] = {}  # (kind, resource_id, day) -> sorted [(start, end, entry_id)]
+        self._max_len: Dict[tuple, int] = {}
+        self._entries: Dict[int, tuple] = {}  # entry_id -> (day, start, end, keys)
+
+    @staticmethod
+    def _keys(day: int, room_id, lecturer_id, group_ids) -> List[tuple]:
+        keys = []
+        if room_id is not None:
+            keys.append(("room", room_id, day))
+        if lecturer_id is not None:
+            keys.append(("lecturer", lecturer_id, day))
+        for g in set(group_ids or []):
+            keys.append(("group", g, day))
+        return keys
+
+    def add(self, entry_id: int, day: int, start: int, end: int, room_id, lecturer_id, group_ids):
+        self.remove(entry_id)
+        keys = self._keys(day, room_id, lecturer_id, group_ids)
+        for k in keys:
+            insort(self._lists.setdefault(k, []), (start, end, entry_id))
+            self._max_len[k] = max(self._max_len.get(k, 0), end - start)
+        self._entries[entry_id] = (day, start, end, keys)
+
+    def remove(self, entry_id: int):
+        old = self._entries.pop(entry_id, None)
+        if not old:
+            return
+        _, start, end, keys = old
+        for k in keys:
+            lst = self._lists.get(k)
+            if lst is None:
+                continue
+            i = bisect_left(lst, (start, end, entry_id))
+            if i < len(lst) and lst[i] == (start, end, entry_id):
+                lst.pop(i)
+
+    def overlapping(self, key: tuple, start: int, end: int, exclude_id: Optional[int] = None) -> List[tuple]:
+        lst = self._lists.get(key)
+        if not lst:
+            return []
+        # anything overlapping [start, end) starts before `end` and after `start - longest interval`
+        i = bisect_left(lst, (end,))
+        floor = start - self._max_len.get(key, 0)
+        out = []
+        while i > 0:
+            i -= 1
+            s, e, eid = lst[i]
+            if s <= floor:
+                break
+            if e > start and eid != exclude_id:
+                out.append((s, e, eid))
+        return out
+
+    def find(self, day: int, start: int, end: int, room_id, lecturer_id, group_ids, exclude_id=None) -> List[dict]:
+        out = []
+        for kind, rid, d in self._keys(day, room_id, lecturer_id, group_ids):
+            for s, e, eid in self.overlapping((kind, rid, d), start, end, exclude_id):
+                out.append(
+                    {
+                        "type": kind,
+                        "resource_id": rid,
+                        "entry_id": eid,
+                        "day_of_week": DAYS[d],
+                        "start_time": minutes_to_hhmm(s),
+                        "end_time": minutes_to_hhmm(e),
+                    }
+                )
+        return out
+
+
+_lock = threading.Lock()
+_indexes: Dict[str, tuple] = {}  # semester -> (loaded_at, ScheduleIndex)
+
+
+def _entry_args(entry: models.ScheduleEntry):
+    """ScheduleEntry row -> ScheduleIndex.add() args, or None if the row has unusable times."""
+    if entry.week_start_minute is not None and entry.week_end_minute is not None:
+        day, start = divmod(entry.week_start_minute, MINUTES_PER_DAY)
+        end = entry.week_end_minute - day * MINUTES_PER_DAY
+    else:
+        try:
+            day = day_index(entry.day_of_week)
+            start = hhmm_to_minutes(entry.start_time)
+            end = hhmm_to_minutes(entry.end_time)
+        except ValueError:
+            return None
+    lecturer_id = entry.offered_module.lecturer_id if entry.offered_module else None
+    return (entry.id, day, start, end, entry.room_id, lecturer_id, [g.id for g in entry.groups])
+
+
+def load_index(db: Session, semester: str) -> ScheduleIndex:
+    """Fresh (uncached) index of `semester`."""
+    idx = ScheduleIndex()
+    rows = (
+        db.query(models.ScheduleEntry)
+        .options(joinedload(models.ScheduleEntry.offered_module), selectinload(models.ScheduleEntry.groups))
+        .filter(models.ScheduleEntry.semester == semester)
+        .all()
+    )
+    for r in rows:
+        args = _entry_args(r)
+        if args:
+            idx.add(*args)
+    return idx
+
+
+def semester_index(db: Session, semester: str) -> ScheduleIndex:
+    now = time.monotonic()
+    with _lock:
+        cached = _indexes.get(semester)
+        if cached and now - cached[0] < INDEX_TTL_SECONDS:
+            return cached[1]
+    idx = load_index(db, semester)
+    with _lock:
+        _indexes[semester] = (now, idx)
+    return idx
+
+
+def invalidate(semester: Optional[str] = None):
+    with _lock:
+        if semester is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(semester, None)
+
+
+def record_entry(entry: models.ScheduleEntry):
+    """Write-through after a committed create/update (only if the semester is already indexed)."""
+    args = _entry_args(entry)
+    with _lock:
+        for sem, (_, idx) in _indexes.items():
+            if sem != entry.semester:
+                idx.remove(entry.id)
+        cached = _indexes.get(entry.semester)
+        if cached:
+            if args:
+                cached[1].add(*args)
+            else:
+                cached[1].remove(entry.id)
+
+
+def forget_entry(semester: str, entry_id: int):
+    with _lock:
+        cached = _indexes.get(semester)
+        if cached:
+            cached[1].remove(entry_id)
+
+
+def busy_resources(db: Session, semester: str, kind: str, ids: Iterable[int], day: int, start: int, end: int) -> set:
+    """Subset of `ids` ("room" / "lecturer" / "group") with an entry overlapping [start, end) on `day`."""
+    idx = semester_index(db, semester)
+    with _lock:
+        return {rid for rid in ids if idx.overlapping((kind, rid, day), start, end)}
+
+
+def find_conflicts(
+    db: Session,
+    semester: str,
+    day_of_week: str,
+    start_time: str,
+    end_time: str,
+    room_id: Optional[int],
+    lecturer_id: Optional[int],
+    group_ids: Optional[Iterable[int]],
+    exclude_id: Optional[int] = None,
+) -> List[dict]:
+    """Raises ValueError for an unknown day or malformed time."""
+    day = day_index(day_of_week)
+    start = hhmm_to_minutes(start_time)
+    end = hhmm_to_minutes(end_time)
+    idx = semester_index(db, semester)
+    with _lock:
+        return idx.find(day, start, end, room_id, lecturer_id, list(group_ids or []), exclude_id)
+
+
+class WriteConflictError(Exception):
+    """A bulk writer found the semester changed under it; nothing was written."""
+
+    def __init__(self, found: List[dict], message: str = "Schedule conflict"):
+        self.conflicts = found
+        super().__init__(message)
+
+
+def lock_semester(db: Session, semester: str):
+    """Serializes schedule writers of `semester` until the transaction ends."""
+    # sqlite has a single writer anyway; Postgres gets a transaction-scoped advisory lock
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"schedule:{semester}"})
+
+
+def find_write_conflicts(
+    db: Session,
+    semester: str,
+    day_of_week: str,
+    start_time: str,
+    end_time: str,
+    room_id: Optional[int],
+    lecturer_id: Optional[int],
+    group_ids: Optional[Iterable[int]],
+    exclude_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    find_conflicts() read from the database in the caller's transaction, after
+    lock_semester(). Call right before the insert/update it guards.
+    """
+    day = day_index(day_of_week)
+    start = hhmm_to_minutes(start_time)
+    end = hhmm_to_minutes(end_time)
+    groups = set(group_ids or [])
+    lock_semester(db, semester)
+
+    e, o, links = models.ScheduleEntry, models.OfferedModule, models.schedule_entry_groups
+    resources = []
+    if room_id is not None:
+        resources.append(e.room_id == room_id)
+    if lecturer_id is not None:
+        resources.append(o.lecturer_id == lecturer_id)
+    if groups:
+        resources.append(e.id.in_(select(links.c.schedule_entry_id).where(links.c.group_id.in_(groups))))
+    if not resources:
+        return []
+
+    base = day * MINUTES_PER_DAY
+    q = (
+        select(e.id, e.room_id, o.lecturer_id, e.week_start_minute, e.week_end_minute)
+        .outerjoin(o, o.id == e.offered_module_id)
+        .where(
+            e.semester == semester,
+            e.week_start_minute < base + end,
+            e.week_end_minute > base + start,
+            or_(*resources),
+        )
+        .order_by(e.week_start_minute, e.id)
+    )
+    if exclude_id is not None:
+        q = q.where(e.id != exclude_id)
+    rows = db.execute(q).all()
+    if not rows:
+        return []
+
+    row_groups: Dict[int, set] = {}
+    if groups:
+        for eid, gid in db.execute(
+            select(links.c.schedule_entry_id, links.c.group_id).where(
+                links.c.schedule_entry_id.in_([r.id for r in rows]), links.c.group_id.in_(groups)
+            )
+        ):
+            row_groups.setdefault(eid, set()).add(gid)
+
+    out = []
+    for kind, rid, _ in ScheduleIndex._keys(day, room_id, lecturer_id, groups):
+        for r in rows:
+            if kind == "room":
+                hit = r.room_id == rid
+            elif kind == "lecturer":
+                hit = r.lecturer_id == rid
+            else:
+                hit = rid in row_groups.get(r.id, ())
+            if hit:
+                out.append(
+                    {
+                        "type": kind,
+                        "resource_id": rid,
+                        "entry_id": r.id,
+                        "day_of_week": DAYS[day],
+                        "start_time": minutes_to_hhmm(r.week_start_minute - base),
+                        "end_time": minutes_to_hhmm(r.week_end_minute - base),
+                    }
+                )
+    return out
@@ -0,0 +1,367 @@
+# api/constraint_rules.py
+"""
+Compiler for SchedulerConstraint.rule_text.
+
+The rule language is the sentences the constraint builder in
+ConstraintOverview.jsx writes, plus a few short custom forms. A rule is one
+or more statements separated by "." or ";", each of which compiles to a
+predicate over a single schedule entry:
+
+    The University is open on: Monday, Tuesday, Wednesday.    days allowed
+    Room "A1" is unavailable on Fridays.   / not on Saturday   days forbidden
+    The University is open from 08:00 to 20:00.               time window
+    between 09:00 and 17:00 / not before 09:00 / not after 18:00
+    Holiday 'Christmas' is from 2026-12-21 to 2027-01-03.     no occurrences
+    no classes from 2026-12-21 to 2027-01-03
+    Standard lecture slots are 90 minutes long with a 15 minute break.
+    Module "X" has a specific duration of 180 minutes.
+    Program "Y" must be conducted Online.                     Online: no room
+
+Enabled constraints are compiled into a ConstraintIndex keyed by
+(scope, target_id), target "0" meaning every target of the scope, so an
+entry is only checked against the constraints of its own lecturer, groups,
+module, program, room and campus. The index is cached (response_cache,
+collection "constraints") until a constraint row changes.
+"""
+import re
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models, response_cache
+from .timeslots import DAYS, day_index, hhmm_to_minutes, minutes_to_hhmm
+
+# UNIVERSITY targets other than "0" are campuses; ids as in ConstraintOverview.jsx
+CAMPUSES = {"10000": "berlin", "10001": "düsseldorf", "10002": "munich"}
+
+SCOPES = ("university", "lecturer", "group", "module", "room", "program")
+
+
+class RuleError(ValueError):
+    pass
+
+
+# ---------- predicates ----------
+class EntryFacts:
+    """What the predicates need to know about one schedule entry."""
+
+    __slots__ = (
+        "entry_id", "day", "start", "end", "room_id", "room_location", "lecturer_id",
+        "group_ids", "module_code", "program_id", "first_date", "last_date",
+    )
+
+    def __init__(self, entry_id, day, start, end, room_id=None, room_location=None, lecturer_id=None,
+                 group_ids=(), module_code=None, program_id=None, first_date=None, last_date=None):
+        self.entry_id = entry_id
+        self.day = day
+        self.start = start
+        self.end = end
+        self.room_id = room_id
+        self.room_location = room_location
+        self.lecturer_id = lecturer_id
+        self.group_ids = tuple(group_ids)
+        self.module_code = module_code
+        self.program_id = program_id
+        self.first_date = first_date  # semester dates, when known
+        self.last_date = last_date
+
+
+class DaysAllowed:
+    def __init__(self, days: Iterable[str]):
+        self.days = frozenset(days)
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if f.day not in self.days:
+            return f"not allowed on {f.day}"
+        return None
+
+    def describe(self) -> str:
+        return "only on " + (", ".join(d for d in DAYS if d in self.days) or "no day")
+
+
+class DaysForbidden:
+    def __init__(self, days: Iterable[str]):
+        self.days = frozenset(days)
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if f.day in self.days:
+            return f"not allowed on {f.day}"
+        return None
+
+    def describe(self) -> str:
+        return "not on " + ", ".join(d for d in DAYS if d in self.days)
+
+
+class TimeWindow:
+    def __init__(self, start: int, end: int):
+        if end <= start:
+            raise RuleError("time window must end after it starts")
+        self.start = start
+        self.end = end
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if f.start < self.start or f.end > self.end:
+            return f"outside {minutes_to_hhmm(self.start)}-{minutes_to_hhmm(self.end)}"
+        return None
+
+    def describe(self) -> str:
+        return f"between {minutes_to_hhmm(self.start)} and {minutes_to_hhmm(self.end)}"
+
+
+class Blackout:
+    def __init__(self, start: date, end: date, label: str = ""):
+        if end < start:
+            raise RuleError("date range must end after it starts")
+        self.start = start
+        self.end = end
+        self.label = label
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if f.first_date is None or f.last_date is None:
+            return None  # semester dates unknown: cannot tell
+        lo, hi = max(self.start, f.first_date), min(self.end, f.last_date)
+        if lo > hi:
+            return None
+        hit = lo + timedelta(days=(day_index(f.day) - lo.weekday()) % 7)
+        if hit <= hi:
+            name = f"'{self.label}' " if self.label else ""
+            return f"falls in {name}{self.start}..{self.end} on {hit}"
+        return None
+
+    def describe(self) -> str:
+        return f"no classes {self.start}..{self.end}"
+
+
+class SlotLength:
+    def __init__(self, minutes: int):
+        if minutes <= 0:
+            raise RuleError("slot length must be positive")
+        self.minutes = minutes
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if (f.end - f.start) % self.minutes:
+            return f"{f.end - f.start} minutes is not a multiple of the {self.minutes} minute slot"
+        return None
+
+    def describe(self) -> str:
+        return f"length a multiple of {self.minutes} minutes"
+
+
+class Duration:
+    def __init__(self, minutes: int):
+        if minutes <= 0:
+            raise RuleError("duration must be positive")
+        self.minutes = minutes
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if f.end - f.start != self.minutes:
+            return f"lasts {f.end - f.start} minutes instead of {self.minutes}"
+        return None
+
+    def describe(self) -> str:
+        return f"lasts {self.minutes} minutes"
+
+
+class DeliveryMode:
+    def __init__(self, mode: str):
+        self.mode = mode.lower()
+
+    def check(self, f: EntryFacts) -> Optional[str]:
+        if self.mode == "online" and f.room_id is not None:
+            return "online delivery but a room is booked"
+        if self.mode == "onsite" and f.room_id is None:
+            return "onsite delivery but no room is booked"
+        return None
+
+    def describe(self) -> str:
+        return f"delivered {self.mode}"
+
+
+# ---------- parser ----------
+_TIME = r"(\d{1,2}:\d{2})"
+_DATE = r"(\d{4}-\d{2}-\d{2})"
+
+
+def _days(text: str) -> List[str]:
+    out = []
+    for word in re.split(r",|\band\b|\bor\b|/", text):
+        word = word.strip().strip("'\"").lower()
+        if not word or word == "no days":
+            continue
+        if word.endswith("s") and word[:-1] in {d.lower() for d in DAYS}:
+            word = word[:-1]
+        try:
+            out.append(DAYS[day_index(word)])
+        except ValueError:
+            raise RuleError(f"unknown day '{word}'")
+    return out
+
+
+def _time(value: str) -> int:
+    try:
+        return hhmm_to_minutes(value)
+    except ValueError as e:
+        raise RuleError(str(e))
+
+
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise RuleError(f"invalid date '{value}'")
+
+
+# (pattern, builder); the first match wins, so "unavailable on" precedes "available on"
+_STATEMENTS = [
+    (re.compile(r"\b(?:unavailable|not available|closed|not)\s+on:?\s+(.+)$"), lambda m: DaysForbidden(_days(m[1]))),
+    (re.compile(r"\b(?:open|only|available)\s+on:?\s+(.+)$"), lambda m: DaysAllowed(_days(m[1]))),
+    (re.compile(rf"\bholiday\s+'([^']*)'\s+is\s+from\s+{_DATE}\s+to\s+{_DATE}$"),
+     lambda m: Blackout(_date(m[2]), _date(m[3]), m[1])),
+    (re.compile(rf"\bno\s+classes\s+from\s+{_DATE}\s+to\s+{_DATE}$"), lambda m: Blackout(_date(m[1]), _date(m[2]))),
+    (re.compile(rf"\b(?:open\s+)?from\s+{_TIME}\s+to\s+{_TIME}$"), lambda m: TimeWindow(_time(m[1]), _time(m[2]))),
+    (re.compile(rf"\bbetween\s+{_TIME}\s+and\s+{_TIME}$"), lambda m: TimeWindow(_time(m[1]), _time(m[2]))),
+    (re.compile(rf"\bnot\s+before\s+{_TIME}$"), lambda m: TimeWindow(_time(m[1]), 24 * 60)),
+    (re.compile(rf"\bnot\s+after\s+{_TIME}$"), lambda m: TimeWindow(0, _time(m[1]))),
+    (re.compile(r"\bslots\s+are\s+(\d+)\s+minutes\s+long\b"), lambda m: SlotLength(int(m[1]))),
+    (re.compile(r"\bduration\s+of\s+(\d+)\s+minutes$"), lambda m: Duration(int(m[1]))),
+    (re.compile(r"\bmust\s+be\s+conducted\s+(onsite|online|hybrid)$"), lambda m: DeliveryMode(m[1])),
+]
+
+
+def _statements(text: str) -> List[str]:
+    # "." ends a statement unless it is part of a number; quoted names are dropped first
+    text = re.sub(r'"[^"]*"', '""', text or "")
+    return [s.strip() for s in re.split(r";|\.(?!\d)", text) if s.strip()]
+
+
+def compile_rule(text: str) -> list:
+    """rule_text -> predicates; raises RuleError on a statement it does not understand."""
+    predicates = []
+    for stmt in _statements(text):
+        if "[date]" in stmt.lower():
+            raise RuleError("dates are missing")
+        low = stmt.lower()
+        for pattern, build in _STATEMENTS:
+            m = pattern.search(low)
+            if m:
+                predicates.append(build(m))
+                break
+        else:
+            raise RuleError(f"cannot understand '{stmt}'")
+    if not predicates:
+        raise RuleError("rule is empty")
+    return predicates
+
+
+# ---------- compiled constraints ----------
+class CompiledConstraint:
+    __slots__ = ("id", "name", "scope", "target", "valid_from", "valid_to", "predicates")
+
+    def __init__(self, row: models.SchedulerConstraint, predicates: list):
+        self.id = row.id
+        self.name = row.name
+        self.scope = (row.scope or "").strip().lower()
+        self.target = str(row.target_id or "0").strip() or "0"
+        self.valid_from = row.valid_from
+        self.valid_to = row.valid_to
+        self.predicates = predicates
+
+    def applies(self, f: EntryFacts) -> bool:
+        if f.first_date is None or f.last_date is None:
+            return True
+        if self.valid_from and self.valid_from > f.last_date:
+            return False
+        if self.valid_to and self.valid_to < f.first_date:
+            return False
+        return True
+
+    def violations(self, f: EntryFacts) -> List[str]:
+        if not self.applies(f):
+            return []
+        return [msg for p in self.predicates if (msg := p.check(f))]
+
+
+class ConstraintIndex:
+    def __init__(self):
+        self.by_key: Dict[Tuple[str, str], List[CompiledConstraint]] = {}
+        self.errors: Dict[int, str] = {}  # constraint id -> why it was not compiled
+        self.compiled: Dict[int, CompiledConstraint] = {}
+
+    def add(self, c: CompiledConstraint):
+        self.compiled[c.id] = c
+        self.by_key.setdefault((c.scope, c.target), []).append(c)
+
+    def _keys(self, f: EntryFacts):
+        yield "university", "0"
+        if f.room_location:
+            loc = f.room_location.strip().lower()
+            for target, city in CAMPUSES.items():
+                if city in loc:
+                    yield "university", target
+        for scope, values in (
+            ("lecturer", (f.lecturer_id,)),
+            ("group", f.group_ids),
+            ("module", (f.module_code,)),
+            ("room", (f.room_id,)),
+            ("program", (f.program_id,)),
+        ):
+            yield scope, "0"
+            for v in values:
+                if v is not None:
+                    yield scope, str(v)
+
+    def relevant(self, f: EntryFacts) -> List[CompiledConstraint]:
+        out = []
+        for key in self._keys(f):
+            out.extend(self.by_key.get(key, ()))
+        return out
+
+    def check(self, f: EntryFacts) -> List[dict]:
+        return [
+            {"constraint_id": c.id, "constraint": c.name, "scope": c.scope, "message": msg}
+            for c in self.relevant(f)
+            for msg in c.violations(f)
+        ]
+
+
+def build_index(rows: Iterable[models.SchedulerConstraint]) -> ConstraintIndex:
+    index = ConstraintIndex()
+    for row in rows:
+        if not row.is_enabled:
+            continue
+        if (row.scope or "").strip().lower() not in SCOPES:
+            index.errors[row.id] = f"unknown scope '{row.scope}'"
+            continue
+        try:
+            index.add(CompiledConstraint(row, compile_rule(row.rule_text)))
+        except RuleError as e:
+            index.errors[row.id] = str(e)
+    return index
+
+
+def load_index(db: Session) -> ConstraintIndex:
+    """Compiled enabled constraints, rebuilt after a SchedulerConstraint write commits."""
+    return response_cache.cached_value(
+        "constraints", "compiled", lambda: build_index(db.query(models.SchedulerConstraint).all())
+    )
+
+
+def entry_facts(entry: models.ScheduleEntry, semester: Optional[models.Semester] = None) -> EntryFacts:
+    """Facts of an ORM entry loaded with offered_module.module, room and groups."""
+    offer = entry.offered_module
+    module = offer.module if offer else None
+    return EntryFacts(
+        entry_id=entry.id,
+        day=DAYS[day_index(entry.day_of_week)],
+        start=hhmm_to_minutes(entry.start_time),
+        end=hhmm_to_minutes(entry.end_time),
+        room_id=entry.room_id,
+        room_location=entry.room.location if entry.room else None,
+        lecturer_id=offer.lecturer_id if offer else None,
+        group_ids=[g.id for g in entry.groups],
+        module_code=offer.module_code if offer else None,
+        program_id=module.program_id if module else None,
+        first_date=semester.start_date if semester else None,
+        last_date=semester.end_date if semester else None,
+    )
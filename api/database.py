@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,11 +22,126 @@ else:
     db_url = raw_url.replace("postgres://", "postgresql://", 1)
 
 
-engine = create_engine(
-    db_url,
-    pool_pre_ping=True,
-    connect_args={"sslmode": "require"} if "postgresql" in db_url else {}
-)
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() in ("1", "true", "yes")
+
+
+# --- Connection pool settings ---
+# DB_POOL_MODE=queue : pooled connections kept per process (long-running server)
+# DB_POOL_MODE=null  : no pooling in-process; for serverless functions and/or an
+#                      external pooler (pgbouncer / Supabase pooler). Default on Vercel.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "null" if os.getenv("VERCEL") else "queue").strip().lower()
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+# pooled connections can be closed server-side (SSL idle timeouts, failovers)
+# well before pool_recycle; NullPool opens a fresh one per checkout anyway
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", DB_POOL_MODE != "null")
+# compiled-statement cache (SQLAlchemy side, safe behind any pooler)
+DB_QUERY_CACHE_SIZE = _env_int("DB_QUERY_CACHE_SIZE", 1000)
+
+
+class PoolStats:
+    """Counters fed by pool events and by _TimedQueuePool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _TimedQueuePool(QueuePool):
+    # measures how long a checkout waits for a free (or new) connection
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with pool_stats._lock:
+                pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - t0)
+
+
+engine_kwargs = {"pool_pre_ping": DB_POOL_PRE_PING, "query_cache_size": DB_QUERY_CACHE_SIZE}
+if db_url.startswith("postgresql"):
+    engine_kwargs["connect_args"] = {"sslmode": "require"}
+    if DB_POOL_MODE == "null":
+        engine_kwargs["poolclass"] = NullPool
+    else:
+        engine_kwargs.update(
+            poolclass=_TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_use_lifo=True,  # lets idle surplus connections age out via recycle
+        )
+
+engine = create_engine(db_url, **engine_kwargs)
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_conn, record):
+    with pool_stats._lock:
+        pool_stats.connects += 1
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_conn, record, proxy):
+    with pool_stats._lock:
+        pool_stats.checkouts += 1
+        pool_stats.checked_out += 1
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_conn, record):
+    with pool_stats._lock:
+        pool_stats.checked_out -= 1
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    out = {"mode": DB_POOL_MODE, "pool_class": type(pool).__name__, **pool_stats.snapshot()}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            pool_timeout=pool._timeout,
+            pool_recycle=pool._recycle,
+        )
+    return out
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -32,4 +151,66 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- Optional async engine for read endpoints (DB_ASYNC=1, needs asyncpg / aiosqlite) ---
+DB_ASYNC = os.getenv("DB_ASYNC", "0").strip().lower() in ("1", "true", "yes")
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_kwargs = {"pool_pre_ping": DB_POOL_PRE_PING, "query_cache_size": DB_QUERY_CACHE_SIZE}
+    if db_url.startswith("postgresql"):
+        async_db_url = db_url.split("://", 1)[1]
+        async_db_url = "postgresql+asyncpg://" + async_db_url
+        async_kwargs["connect_args"] = {"ssl": "require"}
+        if DB_POOL_MODE == "null":
+            # server-side prepared statements break behind transaction-mode poolers
+            async_kwargs["poolclass"] = NullPool
+            async_kwargs["connect_args"]["statement_cache_size"] = 0
+            async_db_url += ("&" if "?" in async_db_url else "?") + "prepared_statement_cache_size=0"
+        else:
+            async_kwargs.update(
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+            )
+    else:
+        async_db_url = db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+    async_engine = create_async_engine(async_db_url, **async_kwargs)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_read_db():
+    """
+    Session for read-only endpoints: an AsyncSession when DB_ASYNC is on,
+    otherwise the usual sync Session. Query it through fetch_all / fetch_first.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def fetch_all(db, stmt) -> list:
+    """ORM entities of `stmt` (joined eager loads de-duplicated). All relationships
+    the caller touches must be eager-loaded: lazy loads are not possible on AsyncSession."""
+    if isinstance(db, Session):
+        return await run_in_threadpool(lambda: db.execute(stmt).unique().scalars().all())
+    return (await db.execute(stmt)).unique().scalars().all()
+
+
+async def fetch_first(db, stmt):
+    rows = await fetch_all(db, stmt.limit(1))
+    return rows[0] if rows else None
\ No newline at end of file
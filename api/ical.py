@@ -0,0 +1,188 @@
+# api/ical.py
+"""
+iCalendar (RFC 5545) rendering of schedule entries.
+
+Every entry is one weekly recurring VEVENT: DTSTART is the first matching
+weekday on or after its semester's start_date, RRULE repeats it weekly until
+end_date. Times are local ("floating") unless ICAL_TZID names a zone such as
+Europe/Berlin, which is then put on DTSTART/DTEND and described by a
+VTIMEZONE (RFC 5545 3.6.5) listing that zone's offset changes over the
+feed's years. Times stay local rather than UTC so the weekly RRULE follows
+daylight saving time.
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from . import models
+from .timeslots import day_index, hhmm_to_minutes
+
+ICAL_TZID = os.getenv("ICAL_TZID", "").strip()
+PRODID = "-//ICSS//Timetable//EN"
+
+
+def escape(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Split content lines longer than 75 octets, without cutting a UTF-8 sequence."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _local(d: date, minutes: int) -> str:
+    return f"{d:%Y%m%d}T{minutes // 60:02d}{minutes % 60:02d}00"
+
+
+def _until(end: date) -> str:
+    # RFC 5545: UNTIL is UTC when DTSTART carries a TZID, floating otherwise
+    if not ICAL_TZID:
+        return _local(end, 23 * 60 + 59)
+    last = datetime(end.year, end.month, end.day, 23, 59, tzinfo=ZoneInfo(ICAL_TZID))
+    return last.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _offset(delta: timedelta) -> str:
+    total = int(delta.total_seconds())
+    sign = "-" if total < 0 else "+"
+    h, rest = divmod(abs(total), 3600)
+    m, sec = divmod(rest, 60)
+    return f"{sign}{h:02d}{m:02d}" + (f"{sec:02d}" if sec else "")
+
+
+def _transitions(tz: ZoneInfo, start: datetime, end: datetime) -> List[datetime]:
+    """UTC instants in [start, end) at which `tz` changes its UTC offset."""
+    out = []
+    step = timedelta(days=1)
+    t = start
+    while t < end:
+        nxt = min(t + step, end)
+        if t.astimezone(tz).utcoffset() != nxt.astimezone(tz).utcoffset():
+            lo, hi = t, nxt
+            while hi - lo > timedelta(minutes=1):  # changes fall on whole minutes
+                mid = lo + (hi - lo) / 2
+                mid = mid.replace(second=0, microsecond=0)
+                if mid <= lo:
+                    break
+                if mid.astimezone(tz).utcoffset() == lo.astimezone(tz).utcoffset():
+                    lo = mid
+                else:
+                    hi = mid
+            out.append(hi)
+        t = nxt
+    return out
+
+
+def vtimezone(tzid: str, first_year: int, last_year: int) -> List[str]:
+    """VTIMEZONE for `tzid`: the observance when `first_year` begins plus every change until `last_year` ends."""
+    tz = ZoneInfo(tzid)
+    start = datetime(first_year - 1, 12, 31, tzinfo=timezone.utc)  # a day early: covers Jan 1 in every zone
+    end = datetime(last_year + 1, 1, 1, tzinfo=timezone.utc)
+
+    def observance(at_utc: datetime, before: timedelta) -> List[str]:
+        local = at_utc.astimezone(tz)
+        kind = "DAYLIGHT" if local.dst() else "STANDARD"
+        return [
+            f"BEGIN:{kind}",
+            # local wall time the change happens at, still on the old offset
+            f"DTSTART:{(at_utc + before).strftime('%Y%m%dT%H%M%S')}",
+            f"TZOFFSETFROM:{_offset(before)}",
+            f"TZOFFSETTO:{_offset(local.utcoffset())}",
+            f"TZNAME:{local.tzname()}",
+            f"END:{kind}",
+        ]
+
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{tzid}"]
+    lines += observance(start, start.astimezone(tz).utcoffset())
+    for at in _transitions(tz, start, end):
+        lines += observance(at, (at - timedelta(seconds=1)).astimezone(tz).utcoffset())
+    lines.append("END:VTIMEZONE")
+    return lines
+
+
+def first_occurrence(start: date, day_of_week: str) -> date:
+    return start + timedelta(days=(day_index(day_of_week) - start.weekday()) % 7)
+
+
+def entry_lines(entry: models.ScheduleEntry, semester: models.Semester, stamp: str) -> List[str]:
+    """VEVENT lines for one entry; empty when it never falls inside the semester."""
+    first = first_occurrence(semester.start_date, entry.day_of_week)
+    if first > semester.end_date:
+        return []
+    start, end = hhmm_to_minutes(entry.start_time), hhmm_to_minutes(entry.end_time)
+    tz = f";TZID={ICAL_TZID}" if ICAL_TZID else ""
+
+    offer = entry.offered_module
+    module = offer.module if offer else None
+    summary = module.name if module else "Unknown"
+    details = []
+    if module:
+        details.append(f"Module: {module.module_code}")
+    if offer and offer.lecturer:
+        details.append(f"Lecturer: {offer.lecturer.first_name} {offer.lecturer.last_name or ''}".rstrip())
+    groups = getattr(entry, "groups", None) or []
+    if groups:
+        details.append("Groups: " + ", ".join(g.name for g in groups))
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:schedule-entry-{entry.id}@icss",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART{tz}:{_local(first, start)}",
+        f"DTEND{tz}:{_local(first, end)}",
+        f"RRULE:FREQ=WEEKLY;UNTIL={_until(semester.end_date)}",
+        f"SUMMARY:{escape(summary)}",
+    ]
+    if entry.room:
+        lines.append(f"LOCATION:{escape(entry.room.name)}")
+    if details:
+        lines.append(f"DESCRIPTION:{escape(chr(10).join(details))}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def render(name: str, entries: Iterable[models.ScheduleEntry], semesters: Dict[str, models.Semester]) -> bytes:
+    """
+    VCALENDAR for `entries`; `semesters` maps ScheduleEntry.semester values to
+    Semester rows. Entries of a semester without dates are left out.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+    ]
+    if ICAL_TZID:
+        lines.append(f"X-WR-TIMEZONE:{ICAL_TZID}")  # non-standard hint some clients want as well
+        dated = [s for s in semesters.values() if s is not None and s.start_date and s.end_date]
+        if dated:
+            lines += vtimezone(
+                ICAL_TZID, min(s.start_date.year for s in dated), max(s.end_date.year for s in dated)
+            )
+    for entry in entries:
+        semester: Optional[models.Semester] = semesters.get(entry.semester)
+        if semester is not None:
+            lines.extend(entry_lines(entry, semester, stamp))
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(fold(line) for line in lines) + "\r\n").encode("utf-8")
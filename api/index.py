@@ -1,4 +1,5 @@
 # api/index.py
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import datetime
@@ -22,11 +23,16 @@ from .routers.schedule import router as schedule_router
 from .routers.domains import router as domains_router
 
 
-try:
-    models.Base.metadata.create_all(bind=engine)
-    print(" DB connected.")
-except Exception as e:
-    print(" DB Startup Error:", e)
+# create_all opens a connection and inspects every table, which a serverless cold
+# start pays before its first response. Off on Vercel: run `python -m api.migrate`.
+CREATE_ALL_ON_STARTUP = os.getenv("DB_CREATE_ALL_ON_STARTUP", "0" if os.getenv("VERCEL") else "1")
+
+if CREATE_ALL_ON_STARTUP.strip().lower() in ("1", "true", "yes"):
+    try:
+        models.Base.metadata.create_all(bind=engine)
+        print(" DB connected.")
+    except Exception as e:
+        print(" DB Startup Error:", e)
 
 app = FastAPI(title="Study Program Backend", root_path="/api")
 
@@ -36,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 @app.get("/")
@@ -57,6 +64,7 @@ app.include_router(domains_router)
 
 app.include_router(lecturers_router)
 app.include_router(modules_router)
+app.include_router(analytics_router)
 app.include_router(specializations_router)
 app.include_router(groups_router)
 app.include_router(rooms_router)
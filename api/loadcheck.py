@@ -0,0 +1,138 @@
+# api/loadcheck.py
+"""
+Concurrency check for the read endpoints served through get_read_db: sends
+REQUESTS requests per endpoint, CONCURRENCY at a time, straight through the
+ASGI app (no server), and reports requests/s and latency percentiles. Runs
+against DATABASE_URL; compare DB_ASYNC=0 with DB_ASYNC=1 on the same
+database, which --both does in two fresh processes.
+
+Endpoints that need a login use a token for LOADCHECK_EMAIL, or for the
+first user in the database when that is unset. GET /schedule/ asks for
+LOADCHECK_SEMESTER, or the semester with the most entries. Needs httpx
+(pip install httpx), which the app itself does not.
+
+    python -m api.loadcheck                  # current DB_ASYNC, 200 requests x 20 concurrent
+    python -m api.loadcheck 500 50
+    python -m api.loadcheck --both 500 50
+"""
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+from urllib.parse import quote
+
+ENDPOINTS = ["/schedule/", "/offered-modules/", "/modules/", "/lecturers/"]
+
+
+def _setup() -> tuple:
+    """(bearer token or None, semester for GET /schedule/)"""
+    from sqlalchemy import func
+
+    from . import auth, models
+    from .database import SessionLocal
+
+    email = os.getenv("LOADCHECK_EMAIL")
+    semester = os.getenv("LOADCHECK_SEMESTER")
+    db = SessionLocal()
+    try:
+        if not email:
+            user = db.query(models.User).order_by(models.User.id).first()
+            email = user.email if user else None
+        if not semester:
+            row = (
+                db.query(models.ScheduleEntry.semester, func.count())
+                .group_by(models.ScheduleEntry.semester)
+                .order_by(func.count().desc())
+                .first()
+            )
+            semester = row[0] if row else ""
+    finally:
+        db.close()
+    token = auth.create_access_token({"sub": email, "lecturer_id": 0}) if email else None
+    return token, semester
+
+
+def _pct(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _endpoint(client, path: str, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    statuses = set()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            t0 = time.perf_counter()
+            r = await client.get(path)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if r.status_code != 200:
+                errors += 1
+                statuses.add(r.status_code)
+
+    await client.get(path)  # warm-up: caches, pool, compiled statements
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "error_statuses": sorted(statuses),
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(_pct(latencies, 0.95), 1),
+        "max_ms": round(max(latencies), 1),
+    }
+
+
+async def _run(requests: int, concurrency: int) -> dict:
+    import httpx
+
+    from .database import DB_ASYNC
+    from .index import app
+
+    token, semester = _setup()
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    paths = [f"{p}?semester={quote(semester)}" if p == "/schedule/" else p for p in ENDPOINTS]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadcheck", headers=headers) as client:
+        results = [await _endpoint(client, p, requests, concurrency) for p in paths]
+    return {"db_async": DB_ASYNC, "endpoints": results}
+
+
+def run(requests: int = 200, concurrency: int = 20) -> dict:
+    return asyncio.run(_run(requests, concurrency))
+
+
+def run_both(requests: int = 200, concurrency: int = 20) -> List[dict]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = []
+    for flag in ("0", "1"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "api.loadcheck", str(requests), str(concurrency)],
+            cwd=root, env={**os.environ, "DB_ASYNC": flag}, capture_output=True, text=True, check=True,
+        )
+        out.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return out
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    both = "--both" in args
+    nums = [int(a) for a in args if a != "--both"]
+    requests = nums[0] if nums else 200
+    concurrency = nums[1] if len(nums) > 1 else 20
+    if both:
+        for result in run_both(requests, concurrency):
+            print(json.dumps(result))
+    else:
+        print(json.dumps(run(requests, concurrency)))
@@ -0,0 +1,72 @@
+# api/migrate.py
+"""
+Explicit schema setup, replacing create_all at import on serverless.
+
+    python -m api.migrate            # create missing tables, apply pending db/migrations/*.sql
+    python -m api.migrate --status   # list applied / pending migrations
+
+The SQL files are Postgres-only and are applied in filename order; each one
+is recorded in schema_migrations so it runs once per database.
+"""
+import sys
+from pathlib import Path
+
+from sqlalchemy import text
+
+from . import models
+from .database import engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "db" / "migrations"
+
+
+def _migration_files():
+    return sorted(MIGRATIONS_DIR.glob("*.sql"))
+
+
+def _applied(conn) -> set:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " name varchar(200) PRIMARY KEY,"
+        " applied_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    return {name for (name,) in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+
+def migrate() -> list:
+    models.Base.metadata.create_all(bind=engine)
+    if engine.dialect.name != "postgresql":
+        return []
+
+    done = []
+    with engine.begin() as conn:
+        applied = _applied(conn)
+    for path in _migration_files():
+        if path.name in applied:
+            continue
+        # one transaction per file, recorded together with its changes
+        with engine.begin() as conn:
+            conn.exec_driver_sql(path.read_text())
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:n)"), {"n": path.name})
+        done.append(path.name)
+    return done
+
+
+def status() -> dict:
+    if engine.dialect.name != "postgresql":
+        return {"applied": [], "pending": []}
+    with engine.begin() as conn:
+        applied = _applied(conn)
+    names = [p.name for p in _migration_files()]
+    return {
+        "applied": [n for n in names if n in applied],
+        "pending": [n for n in names if n not in applied],
+    }
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv[1:]:
+        st = status()
+        print("Applied:", ", ".join(st["applied"]) or "-")
+        print("Pending:", ", ".join(st["pending"]) or "-")
+    else:
+        print("Applied migrations:", ", ".join(migrate()) or "none pending")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Text, JSON, TIMESTAMP, Table
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Text, JSON, TIMESTAMP, Table, Index
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
 
@@ -34,6 +34,7 @@ schedule_entry_groups = Table(
     Base.metadata,
     Column("schedule_entry_id", Integer, ForeignKey("schedule_entries.id", ondelete="CASCADE"), primary_key=True),
     Column("group_id", Integer, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_schedule_entry_groups_group", "group_id"),
 )
 
 
@@ -109,6 +110,22 @@ class Module(Base):
 
     specializations = relationship("Specialization", secondary=module_specializations, back_populates="modules")
     lecturers = relationship("Lecturer", secondary=lecturer_modules, back_populates="modules")
+    assessments = relationship(
+        "ModuleAssessment",
+        order_by="ModuleAssessment.position",
+        cascade="all, delete-orphan",
+    )
+
+
+# Assessment breakdown of a module (weights sum to 100). Replaces the JSON
+# that used to be stored in Module.assessment_type.
+class ModuleAssessment(Base):
+    __tablename__ = "module_assessments"
+    id = Column(Integer, primary_key=True, index=True)
+    module_code = Column(String, ForeignKey("modules.module_code", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    type = Column(String(100), nullable=False)
+    weight = Column(Integer, nullable=True)
 
 
 class Specialization(Base):
@@ -158,6 +175,9 @@ class LecturerAvailability(Base):
     id = Column(Integer, primary_key=True, index=True)
     lecturer_id = Column(Integer, ForeignKey("lecturers.ID", ondelete="CASCADE"), unique=True, nullable=False)
     schedule_data = Column(JSON, default={}, nullable=False)
+    # schedule_data as a hex-encoded weekly 15-minute slot bitmap (api/timeslots.py),
+    # written together with schedule_data. "" = no restriction, NULL = not converted yet.
+    slot_bitmap = Column(String(200), nullable=True)
 
 
 class SchedulerConstraint(Base):
@@ -186,6 +206,9 @@ class Semester(Base):
 
 class OfferedModule(Base):
     __tablename__ = "offered_modules"
+    __table_args__ = (
+        Index("ix_offered_modules_semester_lecturer", "semester", "lecturer_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     module_code = Column(String, ForeignKey("modules.module_code", ondelete="CASCADE"), nullable=False)
@@ -199,6 +222,16 @@ class OfferedModule(Base):
 
 class ScheduleEntry(Base):
     __tablename__ = "schedule_entries"
+    __table_args__ = (
+        # conflict checks / per-day lookups: room double-booking is a prefix scan
+        Index("ix_schedule_entries_semester_day_room", "semester", "day_of_week", "room_id"),
+        Index("ix_schedule_entries_semester_week_start", "semester", "week_start_minute"),
+        # per-resource timetables (/schedule/by-room, /by-lecturer via offered_modules)
+        Index("ix_schedule_entries_room_semester", "room_id", "semester"),
+        Index("ix_schedule_entries_offered_module", "offered_module_id"),
+        # delta sync: GET /schedule/changes?since=
+        Index("ix_schedule_entries_semester_revision", "semester", "revision"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     offered_module_id = Column(Integer, ForeignKey("offered_modules.id", ondelete="CASCADE"), nullable=False)
@@ -208,8 +241,15 @@ class ScheduleEntry(Base):
     start_time = Column(String, nullable=False)  # "08:00"
     end_time = Column(String, nullable=False)  # "10:00"
 
+    # minute-of-week (Monday 00:00 = 0), derived from the three columns above on every write
+    week_start_minute = Column(Integer, nullable=True)
+    week_end_minute = Column(Integer, nullable=True)
+
     semester = Column(String, nullable=False)
 
+    # "schedule" collection version of the last write (api/schedule_revisions.py)
+    revision = Column(Integer, nullable=True)
+
     offered_module = relationship("OfferedModule")
     room = relationship("Room")
 
@@ -219,3 +259,33 @@ class ScheduleEntry(Base):
         secondary=schedule_entry_groups,
         back_populates="schedule_entries",
     )
+
+
+class ScheduleEntryTombstone(Base):
+    __tablename__ = "schedule_entry_tombstones"
+    __table_args__ = (Index("ix_schedule_entry_tombstones_semester_revision", "semester", "revision"),)
+
+    # an entry that left `semester` (deleted or moved) at `revision`
+    id = Column(Integer, primary_key=True)
+    entry_id = Column(Integer, nullable=False)
+    semester = Column(String, nullable=False)
+    revision = Column(Integer, nullable=False)
+    deleted_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class AnalyticsSnapshot(Base):
+    __tablename__ = "analytics_snapshots"
+
+    # Module.semester (study semester number), same key as /analytics/metrics?semester_id=
+    semester_id = Column(Integer, primary_key=True)
+    module_counts = Column(JSON, default={}, nullable=False)  # module_code -> {name, offers, scheduled}
+    payload = Column(JSON, default={}, nullable=False)
+    refreshed_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    # bumped in the writing transaction (api/collection_versions.py); drives list ETags
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
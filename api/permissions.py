@@ -1,10 +1,16 @@
 # api/permissions.py
+import os
+import threading
+import time
 from fastapi import HTTPException
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, FrozenSet, Optional, Tuple
 
 from . import models
 
+HOSP_SCOPE_TTL_SECONDS = float(os.getenv("HOSP_SCOPE_TTL_SECONDS", "300"))
+
 
 def role_of(user: models.User) -> str:
     return (user.role or "").lower()
@@ -24,17 +30,78 @@ def require_lecturer_link(user: models.User) -> int:
         raise HTTPException(status_code=403, detail="User is not linked to a lecturer profile")
     return int(user.lecturer_id)
 
-def hosp_programs(db: Session, user: models.User) -> List[models.StudyProgram]:
-    lec_id = require_lecturer_link(user)
-    return (
-        db.query(models.StudyProgram)
+
+# --- HoSP program scope, resolved once per lecturer ---
+# lecturer_id -> (expires_at, program ids, lowercased names/acronyms/ids used by groups.program)
+_scope_lock = threading.Lock()
+_scopes: Dict[int, Tuple[float, FrozenSet[int], FrozenSet[str]]] = {}
+_scope_generation = 0  # bumped on invalidation; a load that started before it is not cached
+
+
+def _load_scope(db: Session, lec_id: int) -> Tuple[FrozenSet[int], FrozenSet[str]]:
+    rows = (
+        db.query(models.StudyProgram.id, models.StudyProgram.name, models.StudyProgram.acronym)
         .filter(models.StudyProgram.head_of_program_id == lec_id)
         .all()
     )
+    keys = set()
+    for pid, name, acronym in rows:
+        keys.add((name or "").strip().lower())
+        keys.add((acronym or "").strip().lower())
+        keys.add(str(pid))
+    return frozenset(pid for pid, _, _ in rows), frozenset(keys)
+
+
+def hosp_scope(db: Session, user: models.User) -> Tuple[FrozenSet[int], FrozenSet[str]]:
+    lec_id = require_lecturer_link(user)
+    # memoised on the request's user object, then in the process-wide cache
+    scope = getattr(user, "_hosp_scope", None)
+    if scope is not None:
+        return scope
+    now = time.monotonic()
+    with _scope_lock:
+        cached = _scopes.get(lec_id)
+    if cached and cached[0] > now:
+        scope = cached[1:]
+    else:
+        with _scope_lock:
+            generation = _scope_generation
+        scope = _load_scope(db, lec_id)
+        with _scope_lock:
+            if generation == _scope_generation:
+                _scopes[lec_id] = (now + HOSP_SCOPE_TTL_SECONDS,) + scope
+    user._hosp_scope = scope
+    return scope
+
+
+def invalidate_hosp_scopes():
+    global _scope_generation
+    with _scope_lock:
+        _scope_generation += 1
+        _scopes.clear()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_program_writes(session, flush_context, instances):
+    # head_of_program_id, name or acronym may change; programs are rarely written
+    if any(isinstance(o, models.StudyProgram) for o in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info["hosp_scopes_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_hosp_scopes(session):
+    # after commit, so a concurrent request cannot re-cache the old scope
+    if session.info.pop("hosp_scopes_changed", False):
+        invalidate_hosp_scopes()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_program_writes(session, previous_transaction):
+    session.info.pop("hosp_scopes_changed", None)
 
 
-def hosp_program_ids(db: Session, user: models.User) -> List[int]:
-    return [p.id for p in hosp_programs(db, user)]
+def hosp_program_ids(db: Session, user: models.User) -> FrozenSet[int]:
+    return hosp_scope(db, user)[0]
 
 
 def check_is_hosp_for_program(user: models.User, program: models.StudyProgram):
@@ -48,14 +115,8 @@ def check_is_hosp_for_program(user: models.User, program: models.StudyProgram):
     raise HTTPException(status_code=403, detail="Access denied")
 
 def group_payload_in_hosp_domain(db: Session, user: models.User, program_field: Optional[str]) -> bool:
-    progs = hosp_programs(db, user)
     val = (program_field or "").strip().lower()
-    allowed = set()
-    for p in progs:
-        allowed.add((p.name or "").strip().lower())
-        allowed.add((p.acronym or "").strip().lower())
-        allowed.add(str(p.id))
-    return val in allowed
+    return val in hosp_scope(db, user)[1]
 
 
 def group_is_in_hosp_domain(db: Session, user: models.User, group: models.Group) -> bool:
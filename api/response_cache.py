@@ -0,0 +1,200 @@
+# api/response_cache.py
+"""
+Pre-serialized JSON for the reference-data GET endpoints (rooms, domains,
+semesters, study programs, specializations), and the rendered .ics feeds.
+
+A hit returns the stored bytes with their ETag, without touching the
+database. Entries are dropped when a transaction that changed the
+collection commits (the same commit hook that bumps collection_versions),
+and expire after REFERENCE_CACHE_TTL_SECONDS so other instances' writes
+show up too. The in-process store keeps at most REFERENCE_CACHE_MAX_ENTRIES
+entries, evicting the least recently used. The store is pluggable through
+set_backend().
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import collection_versions  # noqa: F401  registers the hooks feeding "changed_collections"
+
+CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+
+CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "4096"))
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class InProcessBackend:
+    """
+    Bounded LRU with per-entry expiry. Expired entries are swept at most once
+    per TTL; past max_entries the least recently used are evicted, and
+    on_evict(keys) is told which ones went (outside the lock).
+    """
+    # values: (body, etag) for responses, plain Python data for cached_value()
+    def __init__(self, ttl: float, max_entries: int, on_evict: Optional[Callable[[List[str]], None]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._data = OrderedDict()  # key -> (expires_at, (body, etag)), least recently used first
+        self._next_sweep = time.monotonic() + ttl
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                evicted = [key]
+            else:
+                self._data.move_to_end(key)
+                return item[1]
+        self._evicted(evicted)
+        return None
+
+    def set(self, key: str, value: Tuple[bytes, str]):
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            if now >= self._next_sweep:
+                evicted = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+                for k in evicted:
+                    del self._data[k]
+                self._next_sweep = now + self.ttl
+            while len(self._data) > self.max_entries:
+                evicted.append(self._data.popitem(last=False)[0])
+        self._evicted(evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _evicted(self, keys: List[str]):
+        if keys and self.on_evict is not None:
+            self.on_evict(keys)
+
+
+# bumped on every invalidation so a build that raced a write is not stored
+_generations = {}
+# re-entrant: cached_value() stores while holding it, and a store can evict
+_gen_lock = threading.RLock()
+# collection -> keys of cached_value() entries derived from it
+_derived = {}
+
+
+def _forget_derived(keys: List[str]):
+    with _gen_lock:
+        for key in keys:
+            collection = key.split(":", 1)[0]
+            derived = _derived.get(collection)
+            if derived is not None:
+                derived.discard(key)
+                if not derived:
+                    del _derived[collection]
+
+
+_backend = InProcessBackend(CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, on_evict=_forget_derived)
+
+
+def set_backend(backend):
+    """Any object with get(key) / set(key, value) / delete(key)."""
+    global _backend
+    _backend = backend
+
+
+def invalidate(*keys: str):
+    with _gen_lock:
+        for key in keys:
+            _generations[key] = _generations.get(key, 0) + 1
+        derived = [d for key in keys for d in _derived.pop(key, ())]
+    for key in list(keys) + derived:
+        _backend.delete(key)
+
+
+def cached_value(collection: str, name: str, load: Callable[[], Any]):
+    """Plain data derived from `collection`, dropped whenever that collection is invalidated."""
+    key = f"{collection}:{name}"
+    value = _backend.get(key)
+    if value is not None:
+        return value
+    with _gen_lock:
+        _derived.setdefault(collection, set()).add(key)
+        gen = _generations.get(collection, 0)
+    value = load()
+    with _gen_lock:
+        if _generations.get(collection, 0) == gen:
+            _backend.set(key, value)
+    return value
+
+
+def serialize(response_type: Any, data) -> bytes:
+    """ORM rows -> JSON bytes, the same way FastAPI applies response_model."""
+    adapter = TypeAdapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True), by_alias=True)
+
+
+def cached_json(request: Request, key: str, response_type: Any, load: Callable[[], Any]) -> Response:
+    """
+    Serve `key` from the cache, or call load() (ORM rows), serialize them as
+    `response_type` and store the bytes. Honours If-None-Match.
+    """
+    entry = _backend.get(key)
+    if entry is None:
+        with _gen_lock:
+            gen = _generations.get(key, 0)
+        body = serialize(response_type, load())
+        entry = (body, '"%s"' % hashlib.sha1(body).hexdigest()[:20])
+        with _gen_lock:
+            if _generations.get(key, 0) == gen:
+                _backend.set(key, entry)
+
+    body, etag = entry
+    return _respond(request, body, etag, "application/json")
+
+
+def cached_body(request: Request, collection: str, name: str, media_type: str, render: Callable[[], bytes]) -> Response:
+    """
+    Non-JSON variant: render() builds the bytes once, kept until `collection`
+    is invalidated. Honours If-None-Match.
+    """
+    def load():
+        body = render()
+        return body, '"%s"' % hashlib.sha1(body).hexdigest()[:20]
+
+    body, etag = cached_value(collection, name, load)
+    return _respond(request, body, etag, media_type)
+
+
+def _respond(request: Request, body: bytes, etag: str, media_type: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    inm = request.headers.get("if-none-match")
+    if inm:
+        tags = [t.strip() for t in inm.split(",")]
+        if "*" in tags or etag in tags or f"W/{etag}" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# collection_versions records the collections a transaction changed in
+# session.info["changed_collections"]; drop them once the write is durable.
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    names = session.info.pop("changed_collections", None)
+    if names:
+        invalidate(*names)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    session.info.pop("changed_collections", None)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import models, schemas, auth
+from ..permissions import require_admin_or_pm
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -41,4 +42,10 @@ def me(current_user: models.User = Depends(auth.get_current_user)):
         "role": current_user.role,
 
         "lecturer_id": getattr(current_user, "lecturer_id", None)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/cache-stats")
+def user_cache_stats(current_user: models.User = Depends(auth.get_current_user)):
+    require_admin_or_pm(current_user)
+    return auth.user_cache.stats()
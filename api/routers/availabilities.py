@@ -1,14 +1,22 @@
 # api/routers/availabilities.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from pydantic import BaseModel
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, availability
 from ..permissions import role_of, is_admin_or_pm, require_lecturer_link
 
 router = APIRouter(prefix="/availabilities", tags=["availabilities"])
 
+
+class FreeLecturer(BaseModel):
+    lecturer_id: int
+    name: str
+    has_availability: bool  # False: no availability recorded, treated as free
+
+
 @router.get("/", response_model=List[schemas.AvailabilityResponse])
 def read_availabilities(db: Session = Depends(get_db),
                         current_user: models.User = Depends(auth.get_current_user)):
@@ -42,13 +50,17 @@ def update_availability(payload: schemas.AvailabilityUpdate, db: Session = Depen
 
     if existing:
         existing.schedule_data = payload.schedule_data
+        availability.set_bitmap(existing)
         db.commit()
+        availability.invalidate()
         db.refresh(existing)
         return existing
 
     row = models.LecturerAvailability(**payload.model_dump())
+    availability.set_bitmap(row)
     db.add(row)
     db.commit()
+    availability.invalidate()
     db.refresh(row)
     return row
 
@@ -71,4 +83,26 @@ def delete_availability(lecturer_id: int, db: Session = Depends(get_db),
     if row:
         db.delete(row)
         db.commit()
+        availability.invalidate()
     return {"ok": True}
+
+
+@router.get("/free", response_model=List[FreeLecturer])
+def free_lecturers(
+    module_code: str,
+    day: str,
+    start: str,
+    end: str,
+    semester: Optional[str] = None,  # also skip lecturers already scheduled then
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    # e.g. /availabilities/free?module_code=CS101&day=Tuesday&start=10:00&end=12:00
+    if not (role_of(current_user) == "hosp" or is_admin_or_pm(current_user)):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    if not db.query(models.Module.module_code).filter(models.Module.module_code == module_code).first():
+        raise HTTPException(status_code=404, detail="Module not found")
+    try:
+        return availability.free_lecturers(db, module_code, day, start, end, semester)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -1,10 +1,11 @@
 # api/routers/constraints.py
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, constraint_rules
 from ..permissions import role_of, is_admin_or_pm, hosp_can_manage_constraint
 
 router = APIRouter(tags=["constraints"])
@@ -13,12 +14,60 @@ router = APIRouter(tags=["constraints"])
 # NOTE: "Constraint Types" endpoint removed as per new architecture
 # ---------------------------------------------------------
 
+class CompiledConstraintStatus(BaseModel):
+    id: int
+    name: str
+    scope: str
+    target_id: Optional[str] = None
+    ok: bool
+    clauses: List[str] = []
+    error: Optional[str] = None
+
+
+class RuleCheck(BaseModel):
+    rule_text: str
+
+
 # ---- scheduler constraints ----
 @router.get("/scheduler-constraints/", response_model=List[schemas.SchedulerConstraintResponse])
 def read_scheduler_constraints(db: Session = Depends(get_db),
                                current_user: models.User = Depends(auth.get_current_user)):
     return db.query(models.SchedulerConstraint).all()
 
+@router.get("/scheduler-constraints/compiled", response_model=List[CompiledConstraintStatus])
+def read_compiled_constraints(db: Session = Depends(get_db),
+                              current_user: models.User = Depends(auth.get_current_user)):
+    """How each enabled constraint's rule_text was understood (see api/constraint_rules.py)."""
+    index = constraint_rules.load_index(db)
+    rows = (
+        db.query(models.SchedulerConstraint)
+        .filter(models.SchedulerConstraint.is_enabled == True)  # noqa: E712
+        .order_by(models.SchedulerConstraint.id)
+        .all()
+    )
+    out = []
+    for row in rows:
+        compiled = index.compiled.get(row.id)
+        out.append({
+            "id": row.id,
+            "name": row.name,
+            "scope": row.scope,
+            "target_id": row.target_id,
+            "ok": compiled is not None,
+            "clauses": [p.describe() for p in compiled.predicates] if compiled else [],
+            "error": index.errors.get(row.id),
+        })
+    return out
+
+@router.post("/scheduler-constraints/compile", response_model=CompiledConstraintStatus)
+def compile_scheduler_rule(p: RuleCheck, current_user: models.User = Depends(auth.get_current_user)):
+    """Dry run of the rule compiler for the constraint editor; nothing is stored."""
+    try:
+        predicates = constraint_rules.compile_rule(p.rule_text)
+    except constraint_rules.RuleError as e:
+        return {"id": 0, "name": "", "scope": "", "ok": False, "error": str(e)}
+    return {"id": 0, "name": "", "scope": "", "ok": True, "clauses": [x.describe() for x in predicates]}
+
 @router.post("/scheduler-constraints/", response_model=schemas.SchedulerConstraintResponse)
 def create_scheduler_constraint(p: schemas.SchedulerConstraintCreate, db: Session = Depends(get_db),
                                 current_user: models.User = Depends(auth.get_current_user)):
@@ -3,8 +3,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from ..database import get_db
+from ..database import get_db, pool_status
 from .. import models, auth
+from ..permissions import require_admin_or_pm
 
 router = APIRouter(tags=["dev"])
 
@@ -25,3 +26,9 @@ def seed_users(db: Session = Depends(get_db)):
 
     db.commit()
     return {"status": "Complete", "changes": log}
+
+
+@router.get("/db-pool")
+def db_pool_metrics(current_user: models.User = Depends(auth.get_current_user)):
+    require_admin_or_pm(current_user)
+    return pool_status()
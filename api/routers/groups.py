@@ -1,10 +1,10 @@
 # api/routers/groups.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, conflicts, collection_versions
 from ..permissions import role_of, is_admin_or_pm, group_payload_in_hosp_domain
 
 router = APIRouter(prefix="/groups", tags=["groups"])
@@ -14,7 +14,10 @@ router = APIRouter(prefix="/groups", tags=["groups"])
 # Al borrar "current_user = Depends(...)", eliminamos al portero.
 # No hay chequeo de rol -> No hay error 403.
 @router.get("/", response_model=List[schemas.GroupResponse])
-def read_groups(db: Session = Depends(get_db)):
+def read_groups(request: Request, response: Response, db: Session = Depends(get_db)):
+    unchanged = collection_versions.not_modified(request, response, db, "groups")
+    if unchanged:
+        return unchanged
     return db.query(models.Group).all()
 
 
@@ -69,5 +72,6 @@ def delete_group(id: int, db: Session = Depends(get_db),
         if row:
             db.delete(row)
             db.commit()
+            conflicts.invalidate()
         return {"ok": True}
     raise HTTPException(status_code=403, detail="Not allowed")
\ No newline at end of file
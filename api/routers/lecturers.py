@@ -1,29 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from typing import List, Union
 
-from ..database import get_db
-from .. import models, schemas, auth
+from ..database import get_db, get_read_db, fetch_all, fetch_first
+from .. import models, schemas, auth, analytics_snapshots, collection_versions
 from ..permissions import role_of, is_admin_or_pm, require_admin_or_pm, require_lecturer_link
 
 router = APIRouter(prefix="/lecturers", tags=["lecturers"])
 
 
+# Everything LecturerResponse serializes, eager-loaded (required on AsyncSession).
+# Collections use one batched IN query each instead of joining both many-to-many
+# tables into lecturers x modules x domains rows.
+_LECTURER_LOAD = (
+    selectinload(models.Lecturer.modules),
+    joinedload(models.Lecturer.domain_rel),
+    selectinload(models.Lecturer.domains),
+)
+
+
 def _load_lecturer_with_relations(db: Session, lecturer_id: int):
-    # keep your old domain_rel joinedload for backward compatibility,
+    # keep your old domain_rel for backward compatibility,
     # but also load the new many-to-many domains
     return (
         db.query(models.Lecturer)
-        .options(
-            joinedload(models.Lecturer.modules),
-            joinedload(models.Lecturer.domain_rel),
-            joinedload(models.Lecturer.domains),
-        )
+        .options(*_LECTURER_LOAD)
         .filter(models.Lecturer.id == lecturer_id)
         .first()
     )
 
 
+def _lecturers_select():
+    return select(models.Lecturer).options(*_LECTURER_LOAD)
+
+
+def _summary_select():
+    # ?view=summary: lecturers columns only, no association tables
+    return select(models.Lecturer).options(
+        load_only(
+            models.Lecturer.id,
+            models.Lecturer.first_name,
+            models.Lecturer.last_name,
+            models.Lecturer.employment_type,
+        )
+    ).order_by(models.Lecturer.id)
+
+
+def _summary(rows) -> List[schemas.LecturerSummary]:
+    return [
+        schemas.LecturerSummary(
+            id=l.id,
+            name=f"{l.first_name} {l.last_name or ''}".strip(),
+            employment_type=l.employment_type,
+        )
+        for l in rows
+    ]
+
+
 def _validate_and_fetch_domains(db: Session, domain_ids: List[int]) -> List[models.Domain]:
     if not domain_ids:
         return []
@@ -56,53 +90,48 @@ def _sync_single_domain_fk(row: models.Lecturer):
         row.domain_id = None
 
 
-@router.get("/", response_model=List[schemas.LecturerResponse])
-def read_lecturers(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+@router.get("/", response_model=Union[List[schemas.LecturerResponse], List[schemas.LecturerSummary]])
+async def read_lecturers(
+    request: Request,
+    response: Response,
+    view: str = Query("full", pattern="^(full|summary)$"),  # summary: id/name/employment_type for dropdowns
+    db=Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
     r = role_of(current_user)
+    summary = view == "summary"
+    variant = "-summary" if summary else ""
 
     if r == "hosp" or is_admin_or_pm(current_user):
-        return (
-            db.query(models.Lecturer)
-            .options(
-                joinedload(models.Lecturer.modules),
-                joinedload(models.Lecturer.domain_rel),
-                joinedload(models.Lecturer.domains),
-            )
-            .all()
-        )
+        unchanged = await collection_versions.not_modified_async(request, response, db, "lecturers", variant)
+        if unchanged:
+            return unchanged
+        if summary:
+            return _summary(await fetch_all(db, _summary_select()))
+        return await fetch_all(db, _lecturers_select())
 
     if r == "lecturer":
         lec_id = require_lecturer_link(current_user)
-        lec = (
-            db.query(models.Lecturer)
-            .options(
-                joinedload(models.Lecturer.modules),
-                joinedload(models.Lecturer.domain_rel),
-                joinedload(models.Lecturer.domains),
-            )
-            .filter(models.Lecturer.id == lec_id)
-            .first()
+        # lecturers only see their own row: separate ETag per lecturer
+        unchanged = await collection_versions.not_modified_async(
+            request, response, db, "lecturers", f"-l{lec_id}{variant}"
         )
+        if unchanged:
+            return unchanged
+        if summary:
+            return _summary(await fetch_all(db, _summary_select().where(models.Lecturer.id == lec_id)))
+        lec = await fetch_first(db, _lecturers_select().where(models.Lecturer.id == lec_id))
         return [lec] if lec else []
 
     raise HTTPException(status_code=403, detail="Not allowed")
 
 
 @router.get("/me", response_model=schemas.LecturerResponse)
-def get_my_lecturer_profile(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
+async def get_my_lecturer_profile(db=Depends(get_read_db), current_user: models.User = Depends(auth.get_current_user)):
     if role_of(current_user) != "lecturer":
         raise HTTPException(status_code=403, detail="Not allowed")
     lec_id = require_lecturer_link(current_user)
-    lec = (
-        db.query(models.Lecturer)
-        .options(
-            joinedload(models.Lecturer.modules),
-            joinedload(models.Lecturer.domain_rel),
-            joinedload(models.Lecturer.domains),
-        )
-        .filter(models.Lecturer.id == lec_id)
-        .first()
-    )
+    lec = await fetch_first(db, _lecturers_select().where(models.Lecturer.id == lec_id))
     if not lec:
         raise HTTPException(status_code=404, detail="Lecturer profile not found")
     return lec
@@ -168,6 +197,7 @@ def create_lecturer(
 
     db.add(row)
     db.commit()
+    analytics_snapshots.refresh_lecturer_stats(db)
 
     row = _load_lecturer_with_relations(db, row.id)
     return row
@@ -202,6 +232,8 @@ def update_lecturer(
         setattr(row, k, v)
 
     db.commit()
+    if "employment_type" in data:
+        analytics_snapshots.refresh_lecturer_stats(db)
 
     row = _load_lecturer_with_relations(db, id)
     return row
@@ -218,24 +250,25 @@ def delete_lecturer(
     if row:
         db.delete(row)
         db.commit()
+        analytics_snapshots.refresh_lecturer_stats(db)
     return {"ok": True}
 
 
 @router.get("/{id}/modules", response_model=List[schemas.ModuleMini])
-def get_lecturer_modules(
+async def get_lecturer_modules(
     id: int,
-    db: Session = Depends(get_db),
+    db=Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_user),
 ):
     r = role_of(current_user)
     if not (r == "hosp" or is_admin_or_pm(current_user)):
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    lec = (
-        db.query(models.Lecturer)
+    lec = await fetch_first(
+        db,
+        select(models.Lecturer)
         .options(joinedload(models.Lecturer.modules))
-        .filter(models.Lecturer.id == id)
-        .first()
+        .where(models.Lecturer.id == id)
     )
     if not lec:
         raise HTTPException(status_code=404, detail="Lecturer not found")
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from typing import List, Optional, Any, Union
+import hashlib
 import json
 
-from ..database import get_db
-from .. import models, schemas, auth
+from ..database import get_db, get_read_db, fetch_all
+from .. import models, schemas, auth, analytics_snapshots, collection_versions
 from ..permissions import role_of, is_admin_or_pm, hosp_program_ids
 
 router = APIRouter(prefix="/modules", tags=["modules"])
 
+MAX_PAGE_SIZE = 500
+
+# fields= projection: ModuleResponse fields; the plain ones map 1:1 to Module columns
+MODULE_FIELDS = list(schemas.ModuleResponse.model_fields)
+_COLUMN_FIELDS = {"module_code", "name", "ects", "room_type", "assessment_type", "semester", "category", "program_id"}
+
 
 
 def _safe_json_load(s: Optional[str]) -> Optional[Any]:
@@ -112,12 +120,28 @@ def _normalize_assessments(breakdown) -> List[dict]:
 
 
 
-def _make_response(row: models.Module) -> schemas.ModuleResponse:
-    payload = _parse_module_payload(row.assessment_type)
-    assessments = payload.get("assessments") or []
+def _assessments_of(row: models.Module) -> List[dict]:
+    if row.assessments:
+        return [{"type": a.type, "weight": a.weight} for a in row.assessments]
+    # rows not yet converted by db/migrations/005_module_assessments.sql still hold JSON
+    raw = (row.assessment_type or "").lstrip()
+    if raw.startswith(("[", "{")):
+        return _parse_module_payload(row.assessment_type).get("assessments") or []
+    return []
+
 
-    legacy = payload.get("legacy")
-    assessment_type_out = legacy if legacy else row.assessment_type
+def _set_assessments(row: models.Module, normalized: List[dict], assessment_type: Optional[str]):
+    row.assessments = [
+        models.ModuleAssessment(position=i, type=a["type"], weight=a["weight"])
+        for i, a in enumerate(normalized)
+    ]
+    # assessment_type stays a plain label (shown in lists); default to the main assessment
+    row.assessment_type = assessment_type or (normalized[0]["type"] if normalized else None)
+
+
+def _make_response(row: models.Module) -> schemas.ModuleResponse:
+    assessments = _assessments_of(row)
+    assessment_type_out = row.assessment_type
     specializations_mapped = [
         schemas.SpecializationResponse.model_validate(s)
         for s in (row.specializations or [])
@@ -137,17 +161,96 @@ def _make_response(row: models.Module) -> schemas.ModuleResponse:
     )
 
 
-@router.get("/", response_model=List[schemas.ModuleResponse])
-def read_modules(
-    db: Session = Depends(get_db),
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in MODULE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(MODULE_FIELDS)}",
+        )
+    # module_code is the pagination key, always returned
+    return ["module_code"] + [f for f in dict.fromkeys(wanted) if f != "module_code"]
+
+
+def _project(row: models.Module, fields: List[str]) -> dict:
+    """Only the requested parts of _make_response(row)."""
+    out = {}
+    for f in fields:
+        if f == "assessment_breakdown":
+            out[f] = [schemas.AssessmentPart.model_validate(a).model_dump() for a in _assessments_of(row)]
+        elif f == "specializations":
+            out[f] = [schemas.SpecializationResponse.model_validate(s).model_dump() for s in row.specializations or []]
+        elif f == "room_type":
+            out[f] = str(row.room_type) if row.room_type is not None else ""
+        else:
+            out[f] = getattr(row, f)
+    return out
+
+
+# unset fields are left out, so a fields= projection carries only what was asked for
+@router.get(
+    "/",
+    response_model=Union[List[schemas.ModuleResponse], List[schemas.ModuleProjection]],
+    response_model_exclude_unset=True,
+)
+async def read_modules(
+    request: Request,
+    response: Response,
+    program_id: Optional[int] = None,
+    semester: Optional[int] = None,
+    category: Optional[str] = None,
+    specialization_id: Optional[int] = None,
+    after: Optional[str] = None,  # keyset cursor: last module_code of the previous page
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,  # e.g. fields=module_code,name,semester
+    db=Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    rows = (
-        db.query(models.Module)
-        .options(joinedload(models.Module.specializations))
-        .all()
-    )
-    return [_make_response(r) for r in rows]
+    wanted = _parse_fields(fields)
+
+    # one ETag per query variant of the collection
+    variant = ""
+    if request.url.query:
+        variant = "-" + hashlib.sha1(request.url.query.encode()).hexdigest()[:12]
+    unchanged = await collection_versions.not_modified_async(request, response, db, "modules", variant)
+    if unchanged:
+        return unchanged
+
+    stmt = select(models.Module).order_by(models.Module.module_code)
+    if program_id is not None:
+        stmt = stmt.where(models.Module.program_id == program_id)
+    if semester is not None:
+        stmt = stmt.where(models.Module.semester == semester)
+    if category:
+        stmt = stmt.where(models.Module.category == category)
+    if specialization_id is not None:
+        stmt = stmt.where(models.Module.specializations.any(models.Specialization.id == specialization_id))
+    if after:
+        stmt = stmt.where(models.Module.module_code > after)
+    if limit:
+        stmt = stmt.limit(limit + 1)  # one extra row tells whether another page exists
+
+    if wanted is None or "specializations" in wanted:
+        stmt = stmt.options(selectinload(models.Module.specializations))
+    if wanted is None or "assessment_breakdown" in wanted:
+        stmt = stmt.options(selectinload(models.Module.assessments))
+    if wanted is not None:
+        cols = {f for f in wanted if f in _COLUMN_FIELDS}
+        if "assessment_breakdown" in wanted:
+            cols.add("assessment_type")  # fallback for unconverted rows
+        stmt = stmt.options(load_only(*[getattr(models.Module, c) for c in sorted(cols)]))
+
+    rows = await fetch_all(db, stmt)
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = rows[-1].module_code
+
+    if wanted is None:
+        return [_make_response(r) for r in rows]
+    return [_project(r, wanted) for r in rows]
 
 
 @router.post("/", response_model=schemas.ModuleResponse)
@@ -176,11 +279,9 @@ def create_module(
     spec_ids = data.pop("specialization_ids", None)
     assessment_breakdown = data.pop("assessment_breakdown", None)
 
-    if assessment_breakdown is not None:
-        normalized = _normalize_assessments(assessment_breakdown)
-        data["assessment_type"] = json.dumps({"assessments": normalized, "lecturer_assignments": []})
-
     row = models.Module(**data)
+    if assessment_breakdown is not None:
+        _set_assessments(row, _normalize_assessments(assessment_breakdown), data.get("assessment_type"))
 
     if spec_ids:
         specs = db.query(models.Specialization).filter(models.Specialization.id.in_(spec_ids)).all()
@@ -193,10 +294,12 @@ def create_module(
     row = (
         db.query(models.Module)
         .filter(models.Module.module_code == row.module_code)
-        .options(joinedload(models.Module.specializations))
+        .options(joinedload(models.Module.specializations), selectinload(models.Module.assessments))
         .first()
     )
-    return _make_response(row)
+    out = _make_response(row)
+    analytics_snapshots.refresh_modules(db, [row.module_code])
+    return out
 
 
 @router.put("/{module_code}", response_model=schemas.ModuleResponse)
@@ -209,7 +312,7 @@ def update_module(
     row = (
         db.query(models.Module)
         .filter(models.Module.module_code == module_code)
-        .options(joinedload(models.Module.specializations))
+        .options(joinedload(models.Module.specializations), selectinload(models.Module.assessments))
         .first()
     )
     if not row:
@@ -240,15 +343,17 @@ def update_module(
 
     assessment_breakdown = data.pop("assessment_breakdown", None)
     if assessment_breakdown is not None:
-        normalized = _normalize_assessments(assessment_breakdown)
-        row.assessment_type = json.dumps({"assessments": normalized, "lecturer_assignments": []})
+        _set_assessments(row, _normalize_assessments(assessment_breakdown), data.pop("assessment_type", None))
 
+    old_semester = row.semester
     for k, v in data.items():
         setattr(row, k, v)
 
     db.commit()
     db.refresh(row)
-    return _make_response(row)
+    out = _make_response(row)
+    analytics_snapshots.refresh_modules(db, [module_code], semesters=[old_semester])
+    return out
 
 
 @router.delete("/{module_code}")
@@ -273,6 +378,8 @@ def delete_module(
     else:
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    old_semester = row.semester
     db.delete(row)
     db.commit()
+    analytics_snapshots.refresh_modules(db, [module_code], semesters=[old_semester])
     return {"ok": True}
\ No newline at end of file
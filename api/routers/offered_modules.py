@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from pydantic import BaseModel
 
-from ..database import get_db
-from .. import models, auth
+from ..database import get_db, get_read_db, fetch_all
+from .. import models, auth, conflicts, analytics_snapshots
 
 router = APIRouter(prefix="/offered-modules", tags=["offered-modules"])
 
@@ -34,19 +35,19 @@ class OfferResponse(BaseModel):
 
 
 @router.get("/", response_model=List[OfferResponse])
-def get_offers(
+async def get_offers(
     semester: str = None,
-    db: Session = Depends(get_db),
+    db=Depends(get_read_db),
     current_user: models.User = Depends(auth.get_current_user),
 ):
-    query = db.query(models.OfferedModule).options(
+    query = select(models.OfferedModule).options(
         joinedload(models.OfferedModule.module),
         joinedload(models.OfferedModule.lecturer),
     )
     if semester:
-        query = query.filter(models.OfferedModule.semester == semester)
+        query = query.where(models.OfferedModule.semester == semester)
 
-    results = query.all()
+    results = await fetch_all(db, query)
 
     mapped = []
     for r in results:
@@ -82,6 +83,7 @@ def create_offer(
     db.add(new_offer)
     db.commit()
     db.refresh(new_offer)
+    analytics_snapshots.refresh_modules(db, [new_offer.module_code])
 
     return {
         "id": new_offer.id,
@@ -113,6 +115,7 @@ def update_offer(
 
     item.lecturer_id = p.lecturer_id
     db.commit()
+    conflicts.invalidate(item.semester)
 
     # reload for correct names
     item = (
@@ -142,6 +145,10 @@ def delete_offer(
     if not item:
         raise HTTPException(status_code=404, detail="Not found")
 
+    semester = item.semester
+    module_code = item.module_code
     db.delete(item)
     db.commit()
+    conflicts.invalidate(semester)
+    analytics_snapshots.refresh_modules(db, [module_code])
     return {"ok": True}
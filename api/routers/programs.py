@@ -1,10 +1,10 @@
 # api/routers/programs.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, response_cache
 from ..permissions import role_of, is_admin_or_pm
 
 router = APIRouter(prefix="/study-programs", tags=["study-programs"])
@@ -14,14 +14,16 @@ router = APIRouter(prefix="/study-programs", tags=["study-programs"])
 # Antes tenía un bloqueo si eras estudiante. Ahora lo quitamos.
 @router.get("/", response_model=List[schemas.StudyProgramResponse])
 def read_programs(
+        request: Request,
         db: Session = Depends(get_db),
         current_user: models.User = Depends(auth.get_current_user),
 ):
     # Students can read programs (read-only in UI)
-    return (
-        db.query(models.StudyProgram)
-        .options(joinedload(models.StudyProgram.head_lecturer))
-        .all()
+    return response_cache.cached_json(
+        request,
+        "study-programs",
+        List[schemas.StudyProgramResponse],
+        lambda: db.query(models.StudyProgram).options(joinedload(models.StudyProgram.head_lecturer)).all(),
     )
 
 
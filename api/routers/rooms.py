@@ -1,17 +1,60 @@
 # api/routers/rooms.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, conflicts, response_cache
+from ..timeslots import day_index, hhmm_to_minutes
 from ..permissions import require_admin_or_pm
 
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
 @router.get("/", response_model=List[schemas.RoomResponse])
-def read_rooms(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    return db.query(models.Room).all()
+def read_rooms(request: Request, db: Session = Depends(get_db),
+               current_user: models.User = Depends(auth.get_current_user)):
+    return response_cache.cached_json(
+        request, "rooms", List[schemas.RoomResponse], lambda: db.query(models.Room).all()
+    )
+
+def _active_rooms(db: Session) -> List[dict]:
+    return response_cache.cached_value(
+        "rooms",
+        "active",
+        lambda: [
+            schemas.RoomResponse.model_validate(r).model_dump()
+            for r in db.query(models.Room).filter(models.Room.status.is_(True)).all()
+        ],
+    )
+
+
+@router.get("/free", response_model=List[schemas.RoomResponse])
+def free_rooms(semester: str, day: str, start: str, end: str,
+               min_capacity: Optional[int] = None, type: Optional[str] = None,
+               db: Session = Depends(get_db),
+               current_user: models.User = Depends(auth.get_current_user)):
+    # e.g. /rooms/free?semester=WS25&day=Tuesday&start=10:00&end=11:30&min_capacity=40&type=Computer Lab
+    try:
+        d, s, e = day_index(day), hhmm_to_minutes(start), hhmm_to_minutes(end)
+    except ValueError as ex:
+        raise HTTPException(status_code=422, detail=str(ex))
+    if e <= s:
+        raise HTTPException(status_code=422, detail="end must be after start")
+
+    want_type = (type or "").strip().lower()
+    candidates = [
+        r for r in _active_rooms(db)
+        if (min_capacity is None or r["capacity"] >= min_capacity)
+        and (not want_type or (r["type"] or "").strip().lower() == want_type)
+    ]
+    busy = conflicts.busy_resources(db, semester, "room", [r["id"] for r in candidates], d, s, e)
+
+    # best fit first: the smallest room that still holds min_capacity
+    return sorted(
+        (r for r in candidates if r["id"] not in busy),
+        key=lambda r: (r["capacity"] - (min_capacity or 0), r["name"]),
+    )
+
 
 @router.post("/", response_model=schemas.RoomResponse)
 def create_room(p: schemas.RoomCreate, db: Session = Depends(get_db),
@@ -1,20 +1,77 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import io
+import json
+import time
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+import anyio.from_thread
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel, validator
-from datetime import datetime, time
 
-from ..database import get_db
-from .. import models
+from ..database import get_db, get_read_db, fetch_all, fetch_first
+from .. import (
+    models, auth, conflicts, schedule_bulk, schedule_validation, schedule_events, schedule_revisions,
+    analytics_snapshots, collection_versions, ical, response_cache,
+)
+from ..permissions import require_admin_or_pm, require_lecturer_link
+from ..solver import SolverConfig, apply_repair, load_repair, load_solver, write_solution
+from ..timeslots import DAYS, MINUTES_PER_DAY, day_index, hhmm_to_minutes, minutes_to_hhmm, week_range
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+# bulk uploads stay in memory up to this size, then spill to a temp file
 
-def _parse_hhmm(value: str) -> time:
+
+def _parse_hhmm(value: str) -> int:
+    """'09:30' -> minutes since midnight"""
+    try:
+        return hhmm_to_minutes(value)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _parse_day(value: str) -> str:
+    try:
+        return DAYS[day_index(value)]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _set_week_minutes(entry: models.ScheduleEntry):
     try:
-        return datetime.strptime(value, "%H:%M").time()
-    except Exception:
-        raise HTTPException(status_code=422, detail=f"Invalid time format '{value}'. Expected HH:MM.")
+        entry.week_start_minute, entry.week_end_minute = week_range(entry.day_of_week, entry.start_time, entry.end_time)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _find_conflicts(db: Session, semester, day_of_week, start_time, end_time, room_id, lecturer_id, group_ids,
+                    exclude_id=None, write=False):
+    # writes check against the database under the semester lock; the cached index is for dry runs
+    find = conflicts.find_write_conflicts if write else conflicts.find_conflicts
+    try:
+        return find(
+            db, semester, day_of_week, start_time, end_time, room_id, lecturer_id, group_ids, exclude_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _raise_on_conflicts(found: List[dict]):
+    if not found:
+        return
+    parts = [
+        f"{c['type']} {c['resource_id']} is booked {c['day_of_week']} {c['start_time']}-{c['end_time']} (entry {c['entry_id']})"
+        for c in found
+    ]
+    raise HTTPException(status_code=409, detail="Schedule conflict: " + "; ".join(parts))
+
+
+def _raise_write_conflict(e: conflicts.WriteConflictError):
+    _raise_on_conflicts(e.conflicts)
+    raise HTTPException(status_code=409, detail=str(e))
 
 
 class ScheduleCreate(BaseModel):
@@ -28,8 +85,11 @@ class ScheduleCreate(BaseModel):
 
     @validator("start_time", "end_time")
     def validate_time_format(cls, v):
-        _parse_hhmm(v)
-        return v
+        return minutes_to_hhmm(_parse_hhmm(v))
+
+    @validator("day_of_week")
+    def validate_day(cls, v):
+        return _parse_day(v)
 
 
 class ScheduleUpdate(BaseModel):
@@ -45,8 +105,13 @@ class ScheduleUpdate(BaseModel):
     def validate_time_format(cls, v):
         if v is None:
             return v
-        _parse_hhmm(v)
-        return v
+        return minutes_to_hhmm(_parse_hhmm(v))
+
+    @validator("day_of_week")
+    def validate_day(cls, v):
+        if v is None:
+            return v
+        return _parse_day(v)
 
 
 class ScheduleResponse(BaseModel):
@@ -66,8 +131,152 @@ class ScheduleResponse(BaseModel):
         orm_mode = True
 
 
-@router.get("/", response_model=List[ScheduleResponse])
-def get_schedule(semester: str, db: Session = Depends(get_db)):
+class ScheduleChanges(BaseModel):
+    semester: str
+    revision: Optional[int] = None  # send as `since` on the next call
+    full: bool  # entries is the whole semester: replace, don't merge
+    entries: List[ScheduleResponse]
+    deleted: List[int]
+
+
+class ScheduleCheck(BaseModel):
+    entry_id: Optional[int] = None  # set when moving an existing entry, so it doesn't clash with itself
+    offered_module_id: int
+    room_id: Optional[int] = None
+    day_of_week: str
+    start_time: str
+    end_time: str
+    semester: str
+    group_ids: Optional[List[int]] = None
+
+
+class ConflictItem(BaseModel):
+    type: str  # "room" | "lecturer" | "group"
+    resource_id: int
+    entry_id: int
+    day_of_week: str
+    start_time: str
+    end_time: str
+
+
+class ScheduleCheckResponse(BaseModel):
+    ok: bool
+    conflicts: List[ConflictItem]
+
+
+class SolveRequest(BaseModel):
+    semester: str
+    days: Optional[List[str]] = None  # default Monday..Friday
+    day_start: str = "08:00"
+    day_end: str = "20:00"
+    slot_minutes: int = 15
+    start_step_minutes: int = 30
+    session_minutes: int = 90
+    sessions_per_module: int = 1
+    # offered_module_id -> group ids; offers not listed get their program's groups if infer_groups
+    offer_groups: Optional[Dict[int, List[int]]] = None
+    infer_groups: bool = True
+    replace_existing: bool = False
+    dry_run: bool = False
+    max_backtracks: int = 2000
+
+
+class RepairRequest(BaseModel):
+    semester: str
+    # only entries of these resources count as affected; default: every invalid entry
+    lecturer_ids: Optional[List[int]] = None
+    room_ids: Optional[List[int]] = None
+    days: Optional[List[str]] = None  # default Monday..Friday
+    day_start: str = "08:00"
+    day_end: str = "20:00"
+    slot_minutes: int = 15
+    start_step_minutes: int = 30
+    time_budget_ms: int = 500
+    dry_run: bool = True
+
+
+class RepairSlot(BaseModel):
+    day_of_week: str
+    start_time: str
+    end_time: str
+    room_id: Optional[int] = None
+
+
+class RepairMove(BaseModel):
+    entry_id: int
+    offered_module_id: int
+    module_code: Optional[str] = None
+    reason: str
+    before: RepairSlot
+    after: RepairSlot
+
+
+class RepairUnresolved(BaseModel):
+    entry_id: int
+    offered_module_id: int
+    module_code: Optional[str] = None
+    reason: str
+
+
+class RepairResponse(BaseModel):
+    semester: str
+    dry_run: bool
+    affected: int
+    evaluations: int
+    elapsed_ms: int
+    moves: List[RepairMove]
+    unresolved: List[RepairUnresolved]
+
+
+class ValidationViolation(BaseModel):
+    type: str
+    severity: str  # "error" | "warning"
+    entry_ids: List[int]
+    resource_type: Optional[str] = None
+    resource_id: Optional[int] = None
+    day_of_week: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    message: str
+    constraint_id: Optional[int] = None
+
+
+class ValidationReport(BaseModel):
+    semester: str
+    entries_checked: int
+    ok: bool
+    counts: Dict[str, int]
+    violations: List[ValidationViolation]
+    by_entry: Dict[int, List[int]]  # entry id -> indexes into violations
+
+
+class SolvedEntry(BaseModel):
+    id: Optional[int] = None
+    offered_module_id: int
+    module_code: str
+    room_id: Optional[int] = None
+    day_of_week: str
+    start_time: str
+    end_time: str
+    group_ids: List[int] = []
+
+
+class UnplacedEntry(BaseModel):
+    offered_module_id: int
+    module_code: str
+    reason: str
+
+
+class SolveResponse(BaseModel):
+    semester: str
+    dry_run: bool
+    placed: int
+    backtracks: int
+    entries: List[SolvedEntry]
+    unplaced: List[UnplacedEntry]
+
+
+def _entry_options():
     opts = [
         joinedload(models.ScheduleEntry.offered_module).joinedload(models.OfferedModule.module),
         joinedload(models.ScheduleEntry.offered_module).joinedload(models.OfferedModule.lecturer),
@@ -75,48 +284,255 @@ def get_schedule(semester: str, db: Session = Depends(get_db)):
     ]
     if hasattr(models.ScheduleEntry, "groups"):
         opts.append(joinedload(models.ScheduleEntry.groups))
+    return opts
 
-    results = (
-        db.query(models.ScheduleEntry)
-        .filter(models.ScheduleEntry.semester == semester)
-        .options(*opts)
-        .all()
+
+def _entry_out(r: models.ScheduleEntry) -> dict:
+    mod_name = r.offered_module.module.name if (r.offered_module and r.offered_module.module) else "Unknown"
+    lec_name = "Unassigned"
+    if r.offered_module and r.offered_module.lecturer:
+        lec_name = f"{r.offered_module.lecturer.first_name} {r.offered_module.lecturer.last_name}"
+    room_name = r.room.name if r.room else "No Room"
+
+    group_ids = None
+    group_names = None
+    if hasattr(r, "groups") and r.groups is not None:
+        group_ids = [g.id for g in r.groups]
+        group_names = [g.name for g in r.groups]
+
+    return {
+        "id": r.id,
+        "offered_module_id": r.offered_module_id,
+        "module_name": mod_name,
+        "lecturer_name": lec_name,
+        "room_name": room_name,
+        "day_of_week": r.day_of_week,
+        "start_time": r.start_time,
+        "end_time": r.end_time,
+        "semester": r.semester,
+        "group_ids": group_ids,
+        "group_names": group_names,
+    }
+
+
+async def _list_entries(db, query, day: Optional[str], start: Optional[str], end: Optional[str]) -> List[dict]:
+    # optional window: entries overlapping [start, end) on `day` (index range scan on minute-of-week)
+    if day is not None:
+        base = day_index(_parse_day(day)) * MINUTES_PER_DAY
+        lo = base + (_parse_hhmm(start) if start else 0)
+        hi = base + (_parse_hhmm(end) if end else MINUTES_PER_DAY)
+        query = query.where(
+            models.ScheduleEntry.week_start_minute < hi,
+            models.ScheduleEntry.week_end_minute > lo,
+        )
+    elif start or end:
+        raise HTTPException(status_code=422, detail="start/end filters require day")
+
+    results = await fetch_all(
+        db, query.options(*_entry_options()).order_by(models.ScheduleEntry.week_start_minute, models.ScheduleEntry.id)
     )
+    return [_entry_out(r) for r in results]
+
+
+async def _require_exists(db, column, id: int, label: str):
+    if await fetch_first(db, select(column).where(column == id)) is None:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+
+
+# per-resource timetables: kind -> (model whose id is in the path, label for 404s)
+_RESOURCES = {
+    "lecturer": (models.Lecturer, "Lecturer"),
+    "group": (models.Group, "Group"),
+    "room": (models.Room, "Room"),
+}
+
+
+def _resource_entries(kind: str, resource_id: int, semester: Optional[str]):
+    """
+    Entries of one lecturer / group / room, through the indexed join for each:
+    offered_modules (semester, lecturer_id), schedule_entry_groups.group_id,
+    schedule_entries (room_id, semester).
+    """
+    query = select(models.ScheduleEntry)
+    if kind == "lecturer":
+        query = query.join(
+            models.OfferedModule, models.OfferedModule.id == models.ScheduleEntry.offered_module_id
+        ).where(models.OfferedModule.lecturer_id == resource_id)
+        if semester is not None:
+            query = query.where(models.OfferedModule.semester == semester)
+    elif kind == "group":
+        link = models.schedule_entry_groups
+        query = query.join(link, link.c.schedule_entry_id == models.ScheduleEntry.id).where(
+            link.c.group_id == resource_id
+        )
+    else:
+        query = query.where(models.ScheduleEntry.room_id == resource_id)
+    if semester is not None:
+        query = query.where(models.ScheduleEntry.semester == semester)
+    return query
+
+
+async def _resource_schedule(db, kind: str, resource_id: int, semester: str, day, start, end) -> List[dict]:
+    model, label = _RESOURCES[kind]
+    await _require_exists(db, model.id, resource_id, label)
+    return await _list_entries(db, _resource_entries(kind, resource_id, semester), day, start, end)
+
+
+@router.get("/", response_model=List[ScheduleResponse])
+async def get_schedule(
+    semester: str,
+    day: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db=Depends(get_read_db),
+):
+    query = select(models.ScheduleEntry).where(models.ScheduleEntry.semester == semester)
+    return await _list_entries(db, query, day, start, end)
+
+
+@router.get("/changes", response_model=ScheduleChanges)
+async def get_schedule_changes(
+    semester: str,
+    since: Optional[int] = Query(None, ge=0),
+    db=Depends(get_read_db),
+):
+    """
+    Entries created or modified, and ids deleted or moved away, after revision
+    `since`. Without `since`, or when it cannot be answered incrementally, the
+    whole semester comes back with full=true.
+    """
+    # read first: a write committing meanwhile is sent again next time, never skipped
+    revision = await collection_versions.version_async(db, schedule_revisions.COLLECTION)
+    query = select(models.ScheduleEntry).where(models.ScheduleEntry.semester == semester)
+    if since is None or revision is None or since > revision:
+        entries = await _list_entries(db, query, None, None, None)
+        return {"semester": semester, "revision": revision, "full": True, "entries": entries, "deleted": []}
+
+    entries = await _list_entries(db, query.where(models.ScheduleEntry.revision > since), None, None, None)
+    tomb = models.ScheduleEntryTombstone
+    gone = await fetch_all(db, select(tomb.entry_id).where(tomb.semester == semester, tomb.revision > since))
+    live = {e["id"] for e in entries}
+    return {
+        "semester": semester,
+        "revision": revision,
+        "full": False,
+        "entries": entries,
+        "deleted": sorted(set(gone) - live),
+    }
 
-    mapped = []
-    for r in results:
-        mod_name = r.offered_module.module.name if (r.offered_module and r.offered_module.module) else "Unknown"
-        lec_name = "Unassigned"
-        if r.offered_module and r.offered_module.lecturer:
-            lec_name = f"{r.offered_module.lecturer.first_name} {r.offered_module.lecturer.last_name}"
-        room_name = r.room.name if r.room else "No Room"
-
-        group_ids = None
-        group_names = None
-        if hasattr(r, "groups") and r.groups is not None:
-            group_ids = [g.id for g in r.groups]
-            group_names = [g.name for g in r.groups]
-
-        mapped.append(
-            {
-                "id": r.id,
-                "offered_module_id": r.offered_module_id,
-                "module_name": mod_name,
-                "lecturer_name": lec_name,
-                "room_name": room_name,
-                "day_of_week": r.day_of_week,
-                "start_time": r.start_time,
-                "end_time": r.end_time,
-                "semester": r.semester,
-                "group_ids": group_ids,
-                "group_names": group_names,
-            }
+
+@router.get("/me", response_model=List[ScheduleResponse])
+async def get_my_schedule(
+    semester: str,
+    day: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db=Depends(get_read_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    """Entries taught by the lecturer linked to the caller's account."""
+    lecturer_id = require_lecturer_link(current_user)
+    return await _list_entries(db, _resource_entries("lecturer", lecturer_id, semester), day, start, end)
+
+
+@router.get("/by-lecturer/{lecturer_id}", response_model=List[ScheduleResponse])
+async def get_lecturer_schedule(
+    lecturer_id: int,
+    semester: str,
+    day: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db=Depends(get_read_db),
+):
+    return await _resource_schedule(db, "lecturer", lecturer_id, semester, day, start, end)
+
+
+@router.get("/by-group/{group_id}", response_model=List[ScheduleResponse])
+async def get_group_schedule(
+    group_id: int,
+    semester: str,
+    day: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db=Depends(get_read_db),
+):
+    return await _resource_schedule(db, "group", group_id, semester, day, start, end)
+
+
+@router.get("/by-room/{room_id}", response_model=List[ScheduleResponse])
+async def get_room_schedule(
+    room_id: int,
+    semester: str,
+    day: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db=Depends(get_read_db),
+):
+    return await _resource_schedule(db, "room", room_id, semester, day, start, end)
+
+
+@router.get("/ical/{kind}/{resource_id}.ics")
+def get_ical_feed(
+    request: Request,
+    kind: str = Path(..., pattern="^(lecturer|group|room)$"),
+    resource_id: int = Path(...),
+    semester: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Subscribable calendar of one lecturer / group / room, every semester unless
+    `semester` is given. Rendered once and served from the cache until a
+    schedule-related write commits (collection "schedule").
+    """
+    model, label = _RESOURCES[kind]
+    # every distinct ?semester= is its own cache entry; only accept real ones
+    if semester and semester not in _semester_names(db):
+        raise HTTPException(status_code=404, detail="Semester not found")
+
+    def render() -> bytes:
+        resource = db.get(model, resource_id)
+        if resource is None:
+            raise HTTPException(status_code=404, detail=f"{label} not found")
+        entries = (
+            db.execute(
+                _resource_entries(kind, resource_id, semester)
+                .options(*_entry_options())
+                .order_by(models.ScheduleEntry.week_start_minute, models.ScheduleEntry.id)
+            )
+            .unique()
+            .scalars()
+            .all()
         )
-    return mapped
+        # entries store the semester name; the acronym is accepted as a fallback
+        all_semesters = db.query(models.Semester).all()
+        semesters = {sem.acronym: sem for sem in all_semesters}
+        semesters.update({sem.name: sem for sem in all_semesters})
+        return ical.render(_calendar_name(kind, resource, semester), entries, semesters)
+
+    return response_cache.cached_body(
+        request, "schedule", f"ical:{kind}:{resource_id}:{semester or ''}", "text/calendar; charset=utf-8", render
+    )
+
+
+def _semester_names(db: Session) -> frozenset:
+    """Names and acronyms of every semester, dropped when a semester is written."""
+    return response_cache.cached_value(
+        "semesters",
+        "names",
+        lambda: frozenset(n for row in db.query(models.Semester.name, models.Semester.acronym) for n in row),
+    )
+
+
+def _calendar_name(kind: str, resource, semester: Optional[str]) -> str:
+    if kind == "lecturer":
+        name = f"{resource.first_name} {resource.last_name or ''}".rstrip()
+    else:
+        name = resource.name
+    return f"{name} ({semester})" if semester else name
 
 
 @router.post("/", response_model=ScheduleResponse)
-def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
+def create_schedule_entry(entry: ScheduleCreate, force: bool = False, db: Session = Depends(get_db)):
     offer = db.query(models.OfferedModule).filter(models.OfferedModule.id == entry.offered_module_id).first()
     if not offer:
         raise HTTPException(status_code=404, detail="Offered Module not found")
@@ -126,6 +542,14 @@ def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
     if end_t <= start_t:
         raise HTTPException(status_code=422, detail="end_time must be after start_time")
 
+    if not force:
+        _raise_on_conflicts(
+            _find_conflicts(
+                db, entry.semester, entry.day_of_week, entry.start_time, entry.end_time,
+                entry.room_id, offer.lecturer_id, entry.group_ids, write=True,
+            )
+        )
+
     new_entry = models.ScheduleEntry(
         offered_module_id=entry.offered_module_id,
         room_id=entry.room_id,
@@ -134,6 +558,7 @@ def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
         end_time=entry.end_time,
         semester=entry.semester,
     )
+    _set_week_minutes(new_entry)
 
     if entry.group_ids:
         db_groups = db.query(models.Group).filter(models.Group.id.in_(entry.group_ids)).all()
@@ -146,6 +571,7 @@ def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
     db.add(new_entry)
     db.commit()
     db.refresh(new_entry)
+    conflicts.record_entry(new_entry)
 
     room_name = new_entry.room.name if new_entry.room else "No Room"
     mod_name = offer.module.name if offer.module else "Unknown"
@@ -154,7 +580,7 @@ def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
     group_ids = [g.id for g in new_entry.groups] if hasattr(new_entry, "groups") and new_entry.groups else None
     group_names = [g.name for g in new_entry.groups] if hasattr(new_entry, "groups") and new_entry.groups else None
 
-    return {
+    out = {
         "id": new_entry.id,
         "offered_module_id": new_entry.offered_module_id,
         "module_name": mod_name,
@@ -167,11 +593,14 @@ def create_schedule_entry(entry: ScheduleCreate, db: Session = Depends(get_db)):
         "group_ids": group_ids,
         "group_names": group_names,
     }
+    analytics_snapshots.refresh_modules(db, [offer.module_code])
+    schedule_events.upserted(out["semester"], out)
+    return out
 
 
 # ✅ NEW: UPDATE (EDIT EXISTING)
 @router.put("/{id}", response_model=ScheduleResponse)
-def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(get_db)):
+def update_schedule_entry(id: int, patch: ScheduleUpdate, force: bool = False, db: Session = Depends(get_db)):
     entry = (
         db.query(models.ScheduleEntry)
         .options(
@@ -185,6 +614,8 @@ def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(
     )
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
+    old_module_code = entry.offered_module.module_code if entry.offered_module else None
+    old_semester = entry.semester
 
     if patch.start_time is not None:
         entry.start_time = patch.start_time
@@ -208,6 +639,7 @@ def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(
         if not offer:
             raise HTTPException(status_code=404, detail="Offered Module not found")
         entry.offered_module_id = patch.offered_module_id
+    _set_week_minutes(entry)
 
     # groups replace
     if patch.group_ids is not None:
@@ -220,8 +652,19 @@ def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(
                 raise HTTPException(status_code=404, detail="One or more groups not found")
         entry.groups = db_groups
 
+    if not force:
+        offer = db.query(models.OfferedModule).filter(models.OfferedModule.id == entry.offered_module_id).first()
+        found = _find_conflicts(
+            db, entry.semester, entry.day_of_week, entry.start_time, entry.end_time,
+            entry.room_id, offer.lecturer_id if offer else None, [g.id for g in entry.groups], exclude_id=entry.id, write=True,
+        )
+        if found:
+            db.rollback()
+            _raise_on_conflicts(found)
+
     db.commit()
     db.refresh(entry)
+    conflicts.record_entry(entry)
 
     offer = entry.offered_module
     mod_name = offer.module.name if (offer and offer.module) else "Unknown"
@@ -233,7 +676,7 @@ def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(
     group_ids = [g.id for g in entry.groups] if hasattr(entry, "groups") and entry.groups else None
     group_names = [g.name for g in entry.groups] if hasattr(entry, "groups") and entry.groups else None
 
-    return {
+    out = {
         "id": entry.id,
         "offered_module_id": entry.offered_module_id,
         "module_name": mod_name,
@@ -246,6 +689,11 @@ def update_schedule_entry(id: int, patch: ScheduleUpdate, db: Session = Depends(
         "group_ids": group_ids,
         "group_names": group_names,
     }
+    analytics_snapshots.refresh_modules(db, [old_module_code, offer.module_code if offer else None])
+    if old_semester != entry.semester:
+        schedule_events.deleted(old_semester, entry.id)
+    schedule_events.upserted(entry.semester, out)
+    return out
 
 
 @router.delete("/{id}")
@@ -253,6 +701,275 @@ def delete_schedule_entry(id: int, db: Session = Depends(get_db)):
     entry = db.query(models.ScheduleEntry).filter(models.ScheduleEntry.id == id).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
+    semester = entry.semester
+    module_code = entry.offered_module.module_code if entry.offered_module else None
     db.delete(entry)
     db.commit()
+    conflicts.forget_entry(semester, id)
+    analytics_snapshots.refresh_modules(db, [module_code])
+    schedule_events.deleted(semester, id)
     return {"ok": True}
+
+
+@router.post("/check", response_model=ScheduleCheckResponse)
+def check_schedule_entry(payload: ScheduleCheck, db: Session = Depends(get_db)):
+    """Dry run of the create/update conflict check; nothing is written."""
+    start_t = _parse_hhmm(payload.start_time)
+    end_t = _parse_hhmm(payload.end_time)
+    if end_t <= start_t:
+        raise HTTPException(status_code=422, detail="end_time must be after start_time")
+
+    offer = db.query(models.OfferedModule).filter(models.OfferedModule.id == payload.offered_module_id).first()
+    if not offer:
+        raise HTTPException(status_code=404, detail="Offered Module not found")
+
+    found = _find_conflicts(
+        db, payload.semester, payload.day_of_week, payload.start_time, payload.end_time,
+        payload.room_id, offer.lecturer_id, payload.group_ids, exclude_id=payload.entry_id,
+    )
+    return {"ok": not found, "conflicts": found}
+
+
+# idle streams get a comment line this often, so proxies keep them open
+EVENTS_KEEPALIVE_SECONDS = 15
+
+
+def _sse(event_id: Optional[str], event: dict) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event['op']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.get("/events")
+async def schedule_events_stream(request: Request, semester: str):
+    """
+    Server-Sent Events for one semester: "upsert" (data.entry as in GET
+    /schedule/), "delete" (data.id) and "reload" (fetch the schedule again).
+    A reconnect with Last-Event-ID replays what was missed, or sends "reload"
+    when that is no longer known.
+    """
+    schedule_events.ensure_listener()
+    sub = schedule_events.bus.subscribe(semester)
+    last_id = request.headers.get("last-event-id")
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if last_id:
+                missed = schedule_events.bus.since(semester, last_id)
+                if missed is None:
+                    yield _sse(None, {"op": "reload"})
+                else:
+                    for event_id, event in missed:
+                        yield _sse(event_id, event)
+            while True:
+                try:
+                    event_id, event = await asyncio.wait_for(sub.queue.get(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(event_id, event)
+        finally:
+            schedule_events.bus.unsubscribe(semester, sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/validate", response_model=ValidationReport)
+def validate_schedule(semester: str, db: Session = Depends(get_db)):
+    """Every double booking, capacity/room-type mismatch, availability and constraint violation of a semester."""
+    return schedule_validation.validate_semester(db, semester)
+
+
+@router.post("/solve", response_model=SolveResponse)
+def solve_schedule(
+    req: SolveRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    require_admin_or_pm(current_user)
+
+    try:
+        cfg = SolverConfig(
+            days=req.days,
+            day_start=req.day_start,
+            day_end=req.day_end,
+            slot_minutes=req.slot_minutes,
+            start_step_minutes=req.start_step_minutes,
+            session_minutes=req.session_minutes,
+            sessions_per_module=req.sessions_per_module,
+            max_backtracks=req.max_backtracks,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    solver = load_solver(
+        db,
+        req.semester,
+        cfg,
+        offer_groups=req.offer_groups,
+        infer_groups=req.infer_groups,
+        replace_existing=req.replace_existing,
+    ).solve()
+
+    entries = solver.placed_entries()
+    if not req.dry_run:
+        try:
+            ids = write_solution(db, req.semester, entries, replace_existing=req.replace_existing)
+        except conflicts.WriteConflictError as e:
+            _raise_write_conflict(e)
+        conflicts.invalidate(req.semester)
+        # every offer of the semester gets a session when replacing, so this covers removed entries too
+        analytics_snapshots.refresh_modules(db, {sess.module_code for sess in solver.sessions})
+        for e, new_id in zip(entries, ids):
+            e["id"] = new_id
+        schedule_events.reload(req.semester)
+
+    return {
+        "semester": req.semester,
+        "dry_run": req.dry_run,
+        "placed": len(entries),
+        "backtracks": solver.backtracks,
+        "entries": entries,
+        "unplaced": solver.unplaced_entries(),
+    }
+
+
+@router.post("/repair", response_model=RepairResponse)
+def repair_schedule(
+    req: RepairRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    """
+    Move the entries made invalid by an availability change or a deactivated
+    room, keeping the rest of the semester as it is. Returns the diff; writes
+    it only with dry_run=false.
+    """
+    require_admin_or_pm(current_user)
+
+    try:
+        cfg = SolverConfig(
+            days=req.days,
+            day_start=req.day_start,
+            day_end=req.day_end,
+            slot_minutes=req.slot_minutes,
+            start_step_minutes=req.start_step_minutes,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    started = time.monotonic()
+    rep = load_repair(
+        db,
+        req.semester,
+        cfg,
+        lecturer_ids=req.lecturer_ids,
+        room_ids=req.room_ids,
+        time_budget=max(0, req.time_budget_ms) / 1000,
+    ).repair()
+    moves = rep.moves()
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+
+    if not req.dry_run and moves:
+        try:
+            apply_repair(db, req.semester, moves)
+        except conflicts.WriteConflictError as e:
+            _raise_write_conflict(e)
+        conflicts.invalidate(req.semester)
+        schedule_events.reload(req.semester)
+
+    return {
+        "semester": req.semester,
+        "dry_run": req.dry_run,
+        "affected": len(rep.affected),
+        "evaluations": rep.evaluations,
+        "elapsed_ms": elapsed_ms,
+        "moves": moves,
+        "unresolved": rep.unresolved_entries(),
+    }
+
+
+def _bulk_format(fmt: Optional[str], content_type: str) -> str:
+    if fmt:
+        fmt = fmt.strip().lower()
+        if fmt not in schedule_bulk.FORMATS:
+            raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(schedule_bulk.FORMATS)}")
+        return fmt
+    return "csv" if "csv" in (content_type or "").lower() else "jsonl"
+
+
+class _BodyReader(io.RawIOBase):
+    """
+    Blocking file over the request body for code running in the threadpool:
+    each read pulls the next chunk from the event loop, so rows are parsed as
+    they arrive and at most one chunk is held.
+    """
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self._pending = b""
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        async for chunk in self._chunks:
+            return chunk
+        return None
+
+    def readinto(self, buf) -> int:
+        while not self._pending and not self._done:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                self._done = True
+            else:
+                self._pending = chunk
+        n = min(len(buf), len(self._pending))
+        buf[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+@router.post("/bulk")
+async def bulk_import_schedule(
+    request: Request,
+    format: Optional[str] = None,
+    semester: Optional[str] = None,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    """
+    Body is JSON Lines (default) or CSV with the columns of GET /schedule/export.
+    `semester` fills rows that have none. All rows are written or none are.
+    """
+    require_admin_or_pm(current_user)
+    fmt = _bulk_format(format, request.headers.get("content-type"))
+
+    body = io.BufferedReader(_BodyReader(request))
+    try:
+        return await run_in_threadpool(schedule_bulk.import_entries, db, body, fmt, semester, force)
+    except schedule_bulk.BulkImportError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/export")
+def export_schedule(semester: str, format: str = "jsonl"):
+    fmt = _bulk_format(format, "")
+    rows = schedule_bulk.iter_export_rows(semester)
+    if fmt == "csv":
+        body, media_type = schedule_bulk.render_csv(rows), "text/csv"
+    else:
+        body, media_type = schedule_bulk.render_jsonl(rows), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="schedule-{semester}.{fmt}"'},
+    )
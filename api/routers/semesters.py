@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
-from .. import models, schemas, auth  #
+from .. import models, schemas, auth, response_cache
 from ..permissions import is_admin_or_pm
 
 router = APIRouter(prefix="/semesters", tags=["semesters"])
 
 # GET is open to all users (so the frontend table can load for everyone)
 @router.get("/", response_model=List[schemas.SemesterResponse])
-def get_semesters(db: Session = Depends(get_db)):
-    return db.query(models.Semester).order_by(models.Semester.start_date.desc()).all()
+def get_semesters(request: Request, db: Session = Depends(get_db)):
+    return response_cache.cached_json(
+        request,
+        "semesters",
+        List[schemas.SemesterResponse],
+        lambda: db.query(models.Semester).order_by(models.Semester.start_date.desc()).all(),
+    )
 
 @router.post("/", response_model=schemas.SemesterResponse)
 def create_semester(
@@ -1,17 +1,21 @@
 # api/routers/specializations.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
-from .. import models, schemas, auth
+from .. import models, schemas, auth, response_cache
 from ..permissions import role_of, is_admin_or_pm, hosp_program_ids
 
 router = APIRouter(prefix="/specializations", tags=["specializations"])
 
 @router.get("/", response_model=List[schemas.SpecializationResponse])
-def read_specializations(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_user)):
-    return db.query(models.Specialization).all()
+def read_specializations(request: Request, db: Session = Depends(get_db),
+                         current_user: models.User = Depends(auth.get_current_user)):
+    return response_cache.cached_json(
+        request, "specializations", List[schemas.SpecializationResponse],
+        lambda: db.query(models.Specialization).all()
+    )
 
 @router.post("/", response_model=schemas.SpecializationResponse)
 def create_specialization(p: schemas.SpecializationCreate, db: Session = Depends(get_db),
@@ -0,0 +1,312 @@
+# api/schedule_bulk.py
+"""
+Bulk import / export of schedule entries.
+
+Import reads JSON Lines or CSV record by record, validates every row with a
+handful of set-based lookups (one IN query per referenced table) and writes
+all rows with a single executemany insert inside one transaction; nothing
+is written if any row is invalid. Export streams rows straight from a
+server-side cursor in the same format, so an export can be re-imported.
+"""
+import csv
+import io
+import json
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from . import models, conflicts, analytics_snapshots, schedule_events, schedule_revisions
+from .database import SessionLocal
+from .timeslots import DAYS, day_index, hhmm_to_minutes, minutes_to_hhmm, week_range
+
+FORMATS = ("jsonl", "csv")
+
+EXPORT_FIELDS = [
+    "id", "offered_module_id", "module_code", "room_id", "room_name",
+    "day_of_week", "start_time", "end_time", "semester", "group_ids",
+]
+
+MAX_REPORTED_ERRORS = 20
+
+
+class BulkImportError(Exception):
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        shown = "; ".join(f"line {n}: {msg}" for n, msg in errors[:MAX_REPORTED_ERRORS])
+        more = len(errors) - MAX_REPORTED_ERRORS
+        super().__init__(f"Import rejected, nothing was written. {shown}" + (f" (+{more} more)" if more > 0 else ""))
+
+
+# ---------- writing ----------
+def insert_entries(db: Session, entries: List[dict]) -> List[int]:
+    """
+    executemany insert of schedule entries plus their group links; returns ids
+    in input order. Each entry: offered_module_id, room_id, day_of_week,
+    start_time, end_time, semester, group_ids. Does not commit.
+    """
+    if not entries:
+        return []
+    rows = []
+    for e in entries:
+        start, end = week_range(e["day_of_week"], e["start_time"], e["end_time"])
+        rows.append(
+            {
+                "offered_module_id": e["offered_module_id"],
+                "room_id": e["room_id"],
+                "day_of_week": e["day_of_week"],
+                "start_time": e["start_time"],
+                "end_time": e["end_time"],
+                "semester": e["semester"],
+                "week_start_minute": start,
+                "week_end_minute": end,
+            }
+        )
+    ids = list(
+        db.execute(
+            insert(models.ScheduleEntry).returning(models.ScheduleEntry.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars()
+    )
+    links = [
+        {"schedule_entry_id": entry_id, "group_id": g}
+        for entry_id, e in zip(ids, entries)
+        for g in e["group_ids"]
+    ]
+    if links:
+        db.execute(insert(models.schedule_entry_groups), links)
+    schedule_revisions.mark_written(db, ids)
+    return ids
+
+
+# ---------- parsing ----------
+def _records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+    """(line number, dict or error string) for every non-empty record."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for n, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            yield n, "invalid JSON"
+            continue
+        yield n, rec if isinstance(rec, dict) else "expected a JSON object"
+
+
+def _opt_int(v) -> Optional[int]:
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    return int(v)
+
+
+def _group_ids(v) -> List[int]:
+    if v is None:
+        return []
+    if isinstance(v, str):
+        v = v.strip()
+        if v.startswith("["):
+            v = json.loads(v)
+        else:
+            v = [x for x in v.replace(",", ";").split(";") if x.strip()]
+    return sorted({int(x) for x in v})
+
+
+def _normalize(rec: dict, default_semester: Optional[str]) -> dict:
+    """Raises ValueError with a user-facing message."""
+    try:
+        offered_module_id = int(rec.get("offered_module_id"))
+    except (TypeError, ValueError):
+        raise ValueError("offered_module_id must be an integer")
+    try:
+        room_id = _opt_int(rec.get("room_id"))
+        group_ids = _group_ids(rec.get("group_ids"))
+    except (TypeError, ValueError):
+        raise ValueError("room_id/group_ids must be integers")
+
+    day = DAYS[day_index(rec.get("day_of_week"))]
+    start = hhmm_to_minutes(rec.get("start_time"))
+    end = hhmm_to_minutes(rec.get("end_time"))
+    if end <= start:
+        raise ValueError("end_time must be after start_time")
+
+    semester = str(rec.get("semester") or default_semester or "").strip()
+    if not semester:
+        raise ValueError("semester is required")
+
+    return {
+        "offered_module_id": offered_module_id,
+        "room_id": room_id,
+        "room_name": str(rec.get("room_name") or "").strip() or None,
+        "day_of_week": day,
+        "start_time": minutes_to_hhmm(start),
+        "end_time": minutes_to_hhmm(end),
+        "semester": semester,
+        "group_ids": group_ids,
+    }
+
+
+# ---------- import ----------
+def import_entries(
+    db: Session,
+    stream: IO[bytes],
+    fmt: str,
+    default_semester: Optional[str] = None,
+    force: bool = False,
+) -> dict:
+    """Validate and insert every record of `stream`; raises BulkImportError on any bad row."""
+    errors: List[Tuple[int, str]] = []
+    rows: List[Tuple[int, dict]] = []
+    for n, rec in _records(stream, fmt):
+        if isinstance(rec, str):
+            errors.append((n, rec))
+            continue
+        try:
+            rows.append((n, _normalize(rec, default_semester)))
+        except ValueError as e:
+            errors.append((n, str(e)))
+
+    # set-based reference checks: one query per table
+    offer_ids = {r["offered_module_id"] for _, r in rows}
+    room_ids = {r["room_id"] for _, r in rows if r["room_id"] is not None}
+    room_names = {r["room_name"] for _, r in rows if r["room_id"] is None and r["room_name"]}
+    group_ids = {g for _, r in rows for g in r["group_ids"]}
+
+    offers: Dict[int, Optional[int]] = {}
+    if offer_ids:
+        offers = dict(
+            db.execute(
+                select(models.OfferedModule.id, models.OfferedModule.lecturer_id)
+                .where(models.OfferedModule.id.in_(offer_ids))
+            ).all()
+        )
+    known_rooms = set()
+    if room_ids:
+        known_rooms = set(db.execute(select(models.Room.id).where(models.Room.id.in_(room_ids))).scalars())
+    rooms_by_name: Dict[str, int] = {}
+    if room_names:
+        rooms_by_name = {
+            name: rid
+            for rid, name in db.execute(select(models.Room.id, models.Room.name).where(models.Room.name.in_(room_names)))
+        }
+    known_groups = set()
+    if group_ids:
+        known_groups = set(db.execute(select(models.Group.id).where(models.Group.id.in_(group_ids))).scalars())
+
+    for n, r in rows:
+        if r["offered_module_id"] not in offers:
+            errors.append((n, f"offered module {r['offered_module_id']} not found"))
+        if r["room_id"] is not None and r["room_id"] not in known_rooms:
+            errors.append((n, f"room {r['room_id']} not found"))
+        if r["room_id"] is None and r["room_name"]:
+            if r["room_name"] not in rooms_by_name:
+                errors.append((n, f"room '{r['room_name']}' not found"))
+            else:
+                r["room_id"] = rooms_by_name[r["room_name"]]
+        missing = [g for g in r["group_ids"] if g not in known_groups]
+        if missing:
+            errors.append((n, f"group(s) not found: {missing}"))
+
+    if not errors:
+        # serializes with single-entry writers until commit; sorted so two imports cannot deadlock
+        for sem in sorted({r["semester"] for _, r in rows}):
+            conflicts.lock_semester(db, sem)
+
+    if not errors and not force:
+        # against existing entries and earlier rows of the same file
+        indexes = {}
+        for n, r in rows:
+            idx = indexes.get(r["semester"])
+            if idx is None:
+                idx = indexes[r["semester"]] = conflicts.load_index(db, r["semester"])
+            day = day_index(r["day_of_week"])
+            start, end = hhmm_to_minutes(r["start_time"]), hhmm_to_minutes(r["end_time"])
+            lecturer_id = offers.get(r["offered_module_id"])
+            found = idx.find(day, start, end, r["room_id"], lecturer_id, r["group_ids"])
+            if found:
+                c = found[0]
+                other = f"line {-c['entry_id']}" if c["entry_id"] < 0 else f"entry {c['entry_id']}"
+                errors.append((n, f"{c['type']} {c['resource_id']} already booked {c['start_time']}-{c['end_time']} ({other})"))
+            else:
+                idx.add(-n, day, start, end, r["room_id"], lecturer_id, r["group_ids"])
+
+    if errors:
+        errors.sort()
+        raise BulkImportError(errors)
+
+    ids = insert_entries(db, [r for _, r in rows])
+    db.commit()
+
+    semesters = sorted({r["semester"] for _, r in rows})
+    for sem in semesters:
+        conflicts.invalidate(sem)
+        schedule_events.reload(sem)
+    analytics_snapshots.refresh_modules(
+        db, analytics_snapshots.module_codes_for_offers(db, {r["offered_module_id"] for _, r in rows})
+    )
+    return {"inserted": len(ids), "semesters": semesters}
+
+
+# ---------- export ----------
+def iter_export_rows(semester: str, batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Streams entries of `semester` ordered by id. Uses its own session because
+    it is consumed by a StreamingResponse after the request's session is gone.
+    """
+    e = models.ScheduleEntry
+    entries_stmt = (
+        select(
+            e.id, e.offered_module_id, models.OfferedModule.module_code, e.room_id,
+            models.Room.name, e.day_of_week, e.start_time, e.end_time, e.semester,
+        )
+        .join(models.OfferedModule, models.OfferedModule.id == e.offered_module_id, isouter=True)
+        .join(models.Room, models.Room.id == e.room_id, isouter=True)
+        .where(e.semester == semester)
+        .order_by(e.id)
+    )
+    links_stmt = (
+        select(models.schedule_entry_groups.c.schedule_entry_id, models.schedule_entry_groups.c.group_id)
+        .join(e, e.id == models.schedule_entry_groups.c.schedule_entry_id)
+        .where(e.semester == semester)
+        .order_by(models.schedule_entry_groups.c.schedule_entry_id, models.schedule_entry_groups.c.group_id)
+    )
+
+    db = SessionLocal()
+    try:
+        # both cursors are ordered by entry id, so group links are merged in one pass
+        links = iter(db.execute(links_stmt.execution_options(yield_per=batch_size)))
+        link = next(links, None)
+        for row in db.execute(entries_stmt.execution_options(yield_per=batch_size)):
+            gids = []
+            while link is not None and link[0] < row[0]:
+                link = next(links, None)
+            while link is not None and link[0] == row[0]:
+                gids.append(link[1])
+                link = next(links, None)
+            yield dict(zip(EXPORT_FIELDS, list(row) + [gids]))
+    finally:
+        db.close()
+
+
+def render_jsonl(rows: Iterator[dict]) -> Iterator[str]:
+    for r in rows:
+        yield json.dumps(r) + "\n"
+
+
+def render_csv(rows: Iterator[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for r in rows:
+        writer.writerow({**r, "group_ids": ";".join(str(g) for g in r["group_ids"])})
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
@@ -0,0 +1,186 @@
+# api/schedule_events.py
+"""
+Change feed for schedule entries (GET /schedule/events).
+
+The schedule endpoints publish a small event after each committed write:
+"upsert" with the entry as GET /schedule/ returns it, "delete" with its id,
+or "reload" when a bulk write (import, solver, repair) changed too much to
+describe. Deletes elsewhere that cascade into schedule entries (offered
+module, module, group, room) publish a "reload" from
+api/schedule_revisions.py. Events go through a per-semester broadcast bus
+to the open Server-Sent Events streams of this process.
+
+With SCHEDULE_EVENTS_BACKEND=postgres, publishing is a NOTIFY on the
+schedule_events channel instead, and one listener thread per process
+(LISTEN on a dedicated connection) feeds the local bus, so every instance
+sees every instance's writes. The default "memory" backend only reaches
+streams of the same process.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND = os.getenv("SCHEDULE_EVENTS_BACKEND", "memory").strip().lower()
+CHANNEL = "schedule_events"
+# events kept per semester so a reconnecting client can catch up (Last-Event-ID)
+REPLAY_SIZE = int(os.getenv("SCHEDULE_EVENTS_REPLAY", "256"))
+QUEUE_SIZE = 1000
+NOTIFY_MAX_BYTES = 7900  # Postgres rejects NOTIFY payloads from 8000 bytes
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # a client this far behind gets one reload instead of the backlog
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((None, {"op": "reload"}))
+
+    def push(self, item):
+        self.loop.call_soon_threadsafe(self._put, item)
+
+
+class Bus:
+    """In-process fan-out; publish() may be called from any thread."""
+
+    def __init__(self):
+        self.instance = uuid.uuid4().hex[:8]
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subs: Dict[str, set] = {}
+        self._recent: Dict[str, deque] = {}
+
+    def subscribe(self, semester: str) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(semester, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, semester: str, sub: Subscription):
+        with self._lock:
+            subs = self._subs.get(semester)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    self._subs.pop(semester, None)
+
+    def deliver(self, semester: str, event: dict):
+        with self._lock:
+            event_id = f"{self.instance}-{next(self._seq)}"
+            self._recent.setdefault(semester, deque(maxlen=REPLAY_SIZE)).append((event_id, event))
+            subs = list(self._subs.get(semester, ()))
+        for sub in subs:
+            sub.push((event_id, event))
+
+    def since(self, semester: str, last_event_id: str) -> Optional[List[Tuple[str, dict]]]:
+        """Events after `last_event_id`, or None when they are no longer known here."""
+        with self._lock:
+            recent = list(self._recent.get(semester, ()))
+        for i, (event_id, _) in enumerate(recent):
+            if event_id == last_event_id:
+                return recent[i + 1:]
+        return None
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+
+bus = Bus()
+
+
+# ---------- publishing ----------
+def _notify(message: dict):
+    payload = json.dumps(message, default=str)
+    if len(payload.encode("utf-8")) > NOTIFY_MAX_BYTES:
+        payload = json.dumps({"semester": message["semester"], "event": {"op": "reload"}})
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        conn.commit()
+
+
+def publish(semester: Optional[str], event: dict):
+    """Call after the write has committed."""
+    if not semester:
+        return
+    if BACKEND == "postgres":
+        try:
+            _notify({"semester": semester, "event": event})
+            return
+        except Exception:
+            logger.exception("schedule event NOTIFY failed; delivering locally only")
+    bus.deliver(semester, event)
+
+
+def upserted(semester: str, entry: dict):
+    publish(semester, {"op": "upsert", "entry": entry})
+
+
+def deleted(semester: str, entry_id: int):
+    publish(semester, {"op": "delete", "id": entry_id})
+
+
+def reload(semester: str):
+    publish(semester, {"op": "reload"})
+
+
+# ---------- Postgres LISTEN adapter ----------
+_listener: Optional[threading.Thread] = None
+_listener_lock = threading.Lock()
+
+
+def _listen_forever():
+    while True:
+        try:
+            raw = engine.raw_connection()
+            try:
+                dbapi = raw.driver_connection
+                dbapi.set_isolation_level(0)  # autocommit, required for LISTEN
+                cur = dbapi.cursor()
+                cur.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([dbapi], [], [], 30) == ([], [], []):
+                        continue
+                    dbapi.poll()
+                    while dbapi.notifies:
+                        note = dbapi.notifies.pop(0)
+                        try:
+                            msg = json.loads(note.payload)
+                            bus.deliver(msg["semester"], msg["event"])
+                        except (ValueError, KeyError):
+                            logger.warning("ignoring malformed schedule event %r", note.payload)
+            finally:
+                raw.invalidate()
+        except Exception:
+            logger.exception("schedule event listener lost its connection; reconnecting")
+            threading.Event().wait(5)
+
+
+def ensure_listener():
+    """Start the LISTEN thread on first use (postgres backend only)."""
+    global _listener
+    if BACKEND != "postgres":
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(target=_listen_forever, name="schedule-events-listen", daemon=True)
+            _listener.start()
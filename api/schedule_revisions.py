@@ -0,0 +1,135 @@
+# api/schedule_revisions.py
+"""
+Revisions and tombstones behind GET /schedule/changes.
+
+The "schedule" collection version is bumped once per writing transaction in
+before_commit (api/collection_versions.py), and its row lock is held until
+the commit, so that version is a revision number in commit order. Flushes
+only note which entries were written and which left a semester: deleted,
+moved to another semester, or removed by a database cascade from their
+offered module / module. Right after the bump, this module stamps the
+revision on the written entries and records a tombstone for the others.
+Entries whose group list shrinks through a group delete, or whose room is
+deleted, count as written. Semesters touched by such cascades get a
+"reload" on the schedule event feed once the transaction has committed,
+since no endpoint publishes anything for them.
+
+Bulk writes that bypass the ORM (schedule_bulk.insert_entries, the solver's
+replace) report their rows through mark_written() / tombstone_semester().
+"""
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models, collection_versions, schedule_events
+
+COLLECTION = "schedule"
+
+_entries = models.ScheduleEntry.__table__
+_tombstones = models.ScheduleEntryTombstone.__table__
+_links = models.schedule_entry_groups
+
+
+def _pending(session: Session) -> dict:
+    return session.info.setdefault("schedule_pending", {"written": set(), "gone": set()})
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_cascades(session, flush_context, instances):
+    # rows the database removes or changes on its own; they are gone by after_flush
+    offer_ids = [o.id for o in session.deleted if isinstance(o, models.OfferedModule)]
+    module_codes = [m.module_code for m in session.deleted if isinstance(m, models.Module)]
+    group_ids = [g.id for g in session.deleted if isinstance(g, models.Group)]
+    room_ids = [r.id for r in session.deleted if isinstance(r, models.Room)]
+    if not (offer_ids or module_codes or group_ids or room_ids):
+        return
+    conn = session.connection()
+    gone: List[Tuple[int, str]] = []
+    if offer_ids:
+        gone += conn.execute(
+            select(_entries.c.id, _entries.c.semester).where(_entries.c.offered_module_id.in_(offer_ids))
+        ).all()
+    if module_codes:
+        gone += conn.execute(
+            select(_entries.c.id, _entries.c.semester)
+            .join(models.OfferedModule.__table__, models.OfferedModule.id == _entries.c.offered_module_id)
+            .where(models.OfferedModule.module_code.in_(module_codes))
+        ).all()
+    touched: List[Tuple[int, str]] = []
+    if group_ids:
+        touched += conn.execute(
+            select(_entries.c.id, _entries.c.semester)
+            .join(_links, _links.c.schedule_entry_id == _entries.c.id)
+            .where(_links.c.group_id.in_(group_ids))
+        ).all()
+    if room_ids:
+        touched += conn.execute(
+            select(_entries.c.id, _entries.c.semester).where(_entries.c.room_id.in_(room_ids))
+        ).all()
+    pending = _pending(session)
+    pending["gone"].update((eid, sem) for eid, sem in gone)
+    pending["written"].update({eid for eid, _ in touched} - {eid for eid, _ in gone})
+    session.info.setdefault("schedule_cascade_semesters", set()).update(sem for _, sem in gone + touched)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    written, gone = set(), set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, models.ScheduleEntry):
+            written.add(obj.id)
+            old = inspect(obj).attrs.semester.history.deleted
+            if old and old[0] != obj.semester:
+                gone.add((obj.id, old[0]))
+    for obj in session.deleted:
+        if isinstance(obj, models.ScheduleEntry):
+            gone.add((obj.id, obj.semester))
+    if written or gone:
+        pending = _pending(session)
+        pending["written"] |= written
+        pending["gone"] |= gone
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp(session):
+    # registered after collection_versions' own before_commit hook, which has
+    # flushed and put the new counter values into session.info by now
+    pending = session.info.pop("schedule_pending", None)
+    if not pending or not (pending["written"] or pending["gone"]):
+        return
+    revision = session.info.get("commit_versions", {}).get(COLLECTION)
+    if revision is None:
+        return  # no collection_versions table yet: nothing to number changes with
+    conn = session.connection()
+    if pending["written"]:
+        conn.execute(update(_entries).where(_entries.c.id.in_(pending["written"])).values(revision=revision))
+    rows = [{"entry_id": eid, "semester": sem, "revision": revision} for eid, sem in pending["gone"]]
+    if rows:
+        conn.execute(insert(_tombstones), rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_cascades(session):
+    for semester in sorted(session.info.pop("schedule_cascade_semesters", ())):
+        schedule_events.reload(semester)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    session.info.pop("schedule_pending", None)
+    session.info.pop("schedule_cascade_semesters", None)
+
+
+def mark_written(session: Session, entry_ids: Iterable[int]):
+    """Entries inserted or updated with Core; they are stamped at commit."""
+    _pending(session)["written"].update(entry_ids)
+    collection_versions.mark_changed(session, COLLECTION)
+
+
+def tombstone_semester(session: Session, semester: str):
+    """Tombstones (at commit) for every entry of `semester`; call before deleting them with Core."""
+    conn = session.connection()
+    gone = conn.execute(select(_entries.c.id, _entries.c.semester).where(_entries.c.semester == semester)).all()
+    _pending(session)["gone"].update((eid, sem) for eid, sem in gone)
+    collection_versions.mark_changed(session, COLLECTION)
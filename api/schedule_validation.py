@@ -0,0 +1,169 @@
+# api/schedule_validation.py
+"""
+Whole-semester validation report.
+
+All entries of a semester are loaded with one query and checked in a single
+pass. Double bookings come from a sweep over each (resource, day) list of
+intervals sorted by start, keeping the still-running intervals in a heap,
+so the cost is O(n log n) plus one item per overlapping pair rather than a
+comparison of every pair. Per-entry checks (room capacity, room type,
+lecturer availability, scheduler constraints) run in the same loop.
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from . import models, availability, constraint_rules
+from .timeslots import DAYS, MINUTES_PER_DAY, minutes_to_hhmm, range_bitmap, week_range
+
+# type -> severity; errors make the timetable unusable, warnings need a look
+VIOLATION_TYPES = {
+    "room_double_booking": "error",
+    "lecturer_double_booking": "error",
+    "group_overlap": "error",
+    "room_capacity": "error",
+    "room_type": "warning",
+    "lecturer_availability": "warning",
+    "constraint": "warning",
+    "invalid_time": "error",
+}
+
+
+def sweep_overlaps(intervals: Iterable[Tuple[int, int, int]]):
+    """(start, end, id) intervals -> (id_a, id_b, overlap_start, overlap_end) for every overlapping pair."""
+    active: List[Tuple[int, int]] = []  # heap of (end, id)
+    for start, end, eid in sorted(intervals):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other in active:
+            yield other, eid, start, min(end, other_end)
+        heapq.heappush(active, (end, eid))
+
+
+def _norm(v) -> str:
+    return (v or "").strip().lower()
+
+
+def _violation(vtype: str, entry_ids, message: str, resource_type=None, resource_id=None,
+               week_start: Optional[int] = None, week_end: Optional[int] = None, **extra) -> dict:
+    out = {
+        "type": vtype,
+        "severity": VIOLATION_TYPES[vtype],
+        "entry_ids": sorted(entry_ids),
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "day_of_week": None,
+        "start_time": None,
+        "end_time": None,
+        "message": message,
+    }
+    if week_start is not None:
+        day, start = divmod(week_start, MINUTES_PER_DAY)
+        out["day_of_week"] = DAYS[day]
+        out["start_time"] = minutes_to_hhmm(start)
+        out["end_time"] = minutes_to_hhmm(week_end - day * MINUTES_PER_DAY)
+    out.update(extra)
+    return out
+
+
+def validate_semester(db: Session, semester: str) -> dict:
+    entries = (
+        db.query(models.ScheduleEntry)
+        .options(
+            joinedload(models.ScheduleEntry.offered_module).joinedload(models.OfferedModule.module),
+            joinedload(models.ScheduleEntry.room),
+            selectinload(models.ScheduleEntry.groups),
+        )
+        .filter(models.ScheduleEntry.semester == semester)
+        .order_by(models.ScheduleEntry.id)
+        .all()
+    )
+    semester_row = (
+        db.query(models.Semester)
+        .filter((models.Semester.name == semester) | (models.Semester.acronym == semester))
+        .first()
+    )
+    avail = availability.bitmaps(db)
+    rules = constraint_rules.load_index(db)
+
+    violations: List[dict] = []
+    # (kind, resource id, day) -> [(week start, week end, entry id)]
+    timelines: Dict[tuple, List[Tuple[int, int, int]]] = {}
+
+    for e in entries:
+        offer = e.offered_module
+        module = offer.module if offer else None
+        lec_id = offer.lecturer_id if offer else None
+        try:
+            if e.week_start_minute is not None and e.week_end_minute is not None:
+                start, end = e.week_start_minute, e.week_end_minute
+            else:
+                start, end = week_range(e.day_of_week, e.start_time, e.end_time)
+            if end <= start:
+                raise ValueError("end_time must be after start_time")
+        except ValueError as ex:
+            violations.append(_violation("invalid_time", [e.id], str(ex)))
+            continue
+        day = start // MINUTES_PER_DAY
+
+        if e.room_id is not None:
+            timelines.setdefault(("room", e.room_id, day), []).append((start, end, e.id))
+        if lec_id is not None:
+            timelines.setdefault(("lecturer", lec_id, day), []).append((start, end, e.id))
+        for g in {g.id for g in e.groups}:
+            timelines.setdefault(("group", g, day), []).append((start, end, e.id))
+
+        room = e.room
+        if room is not None:
+            size = sum(g.size or 0 for g in e.groups)
+            if room.capacity is not None and size > room.capacity:
+                violations.append(_violation(
+                    "room_capacity", [e.id], f"{room.name} holds {room.capacity}, groups total {size}",
+                    "room", room.id, start, end,
+                ))
+            wanted = _norm(module.room_type) if module else ""
+            if wanted and wanted != "any" and _norm(room.type) != wanted:
+                violations.append(_violation(
+                    "room_type", [e.id], f"{module.module_code} needs {module.room_type}, {room.name} is {room.type}",
+                    "room", room.id, start, end,
+                ))
+
+        if lec_id is not None:
+            bits = avail.get(lec_id)
+            if bits is not None and range_bitmap(e.day_of_week, e.start_time, e.end_time) & ~bits:
+                violations.append(_violation(
+                    "lecturer_availability", [e.id], f"lecturer {lec_id} is not available then",
+                    "lecturer", lec_id, start, end,
+                ))
+
+        for v in rules.check(constraint_rules.entry_facts(e, semester_row)):
+            violations.append(_violation(
+                "constraint", [e.id], f"{v['constraint']}: {v['message']}", v["scope"], None, start, end,
+                constraint_id=v["constraint_id"],
+            ))
+
+    overlap_types = {"room": "room_double_booking", "lecturer": "lecturer_double_booking", "group": "group_overlap"}
+    for (kind, rid, _), intervals in timelines.items():
+        if len(intervals) < 2:
+            continue
+        for a, b, lo, hi in sweep_overlaps(intervals):
+            violations.append(_violation(
+                overlap_types[kind], [a, b], f"{kind} {rid} is booked twice", kind, rid, lo, hi,
+            ))
+
+    counts: Dict[str, int] = {}
+    by_entry: Dict[int, List[int]] = {}
+    for i, v in enumerate(violations):
+        counts[v["type"]] = counts.get(v["type"], 0) + 1
+        for eid in v["entry_ids"]:
+            by_entry.setdefault(eid, []).append(i)
+
+    return {
+        "semester": semester,
+        "entries_checked": len(entries),
+        "ok": not violations,
+        "counts": counts,
+        "violations": violations,
+        "by_entry": by_entry,
+    }
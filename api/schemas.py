@@ -75,6 +75,11 @@ class LecturerResponse(LecturerBase):
     modules: List[ModuleMini] = []
     model_config = {"from_attributes": True}
 
+class LecturerSummary(BaseModel):
+    # GET /lecturers/?view=summary, for dropdowns
+    id: int
+    name: str
+    employment_type: str
 
 
 
@@ -171,6 +176,19 @@ class ModuleResponse(ModuleBase):
     specializations: List[SpecializationResponse] = []
     model_config = {"from_attributes": True}
 
+class ModuleProjection(BaseModel):
+    # GET /modules/?fields=...: module_code plus the requested ModuleResponse fields
+    module_code: str
+    name: Optional[str] = None
+    ects: Optional[int] = None
+    room_type: Optional[str] = None
+    assessment_type: Optional[str] = None
+    semester: Optional[int] = None
+    category: Optional[str] = None
+    program_id: Optional[int] = None
+    assessment_breakdown: Optional[List[AssessmentPart]] = None
+    specializations: Optional[List[SpecializationResponse]] = None
+
 # --- GROUPS ---
 class GroupBase(BaseModel):
     name: str
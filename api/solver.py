@@ -0,0 +1,942 @@
+# api/solver.py
+"""
+Automatic timetable solver.
+
+The week is cut into a grid of fixed-size slots (days x slots per day) and
+every resource (lecturer, group, room) keeps a busy bitset on that grid.
+Each session to place (one weekly meeting of an offered module) carries a
+domain bitset where bit t means "may start at slot t".  Placing a session
+ORs its block into the busy sets and clears the overlapping start bits from
+the domains of the sessions sharing a lecturer or group (forward checking).
+Variables are picked smallest-domain-first with bounded chronological
+backtracking; whatever cannot be placed is reported instead of failing.
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from . import conflicts, models, schedule_revisions
+from .schedule_bulk import insert_entries
+from .timeslots import DAYS, MINUTES_PER_DAY, WEEKDAYS, day_index, hhmm_to_minutes, minutes_to_hhmm, week_range
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+def _block(start: int, length: int) -> int:
+    return ((1 << length) - 1) << start
+
+
+def _spread(busy: int, duration: int) -> int:
+    """Start bits t whose block [t, t + duration) touches a busy bit."""
+    out = busy
+    for k in range(1, duration):
+        out |= busy >> k
+    return out
+
+
+def _fits(avail: int, duration: int) -> int:
+    """Start bits t whose whole block [t, t + duration) is inside `avail`."""
+    out = avail
+    for k in range(1, duration):
+        out &= avail >> k
+    return out
+
+
+class SolverConfig:
+    def __init__(
+        self,
+        days: Optional[List[str]] = None,
+        day_start: str = "08:00",
+        day_end: str = "20:00",
+        slot_minutes: int = 15,
+        start_step_minutes: int = 30,
+        session_minutes: int = 90,
+        sessions_per_module: int = 1,
+        max_backtracks: int = 2000,
+    ):
+        self.days = [DAYS[day_index(d)] for d in (days or WEEKDAYS)]
+        if len(set(self.days)) != len(self.days):
+            raise ValueError("days must not contain duplicates")
+
+        self.day_start = hhmm_to_minutes(day_start)
+        self.day_end = hhmm_to_minutes(day_end)
+        if self.day_end <= self.day_start:
+            raise ValueError("day_end must be after day_start")
+
+        if slot_minutes <= 0:
+            raise ValueError("slot_minutes must be positive")
+        for name, value in (
+            ("start_step_minutes", start_step_minutes),
+            ("session_minutes", session_minutes),
+            ("day window", self.day_end - self.day_start),
+        ):
+            if value <= 0 or value % slot_minutes:
+                raise ValueError(f"{name} must be a positive multiple of slot_minutes ({slot_minutes})")
+        if sessions_per_module < 1:
+            raise ValueError("sessions_per_module must be at least 1")
+
+        self.slot_minutes = slot_minutes
+        self.start_step = start_step_minutes // slot_minutes
+        self.session_slots = session_minutes // slot_minutes
+        self.sessions_per_module = sessions_per_module
+        self.max_backtracks = max(0, max_backtracks)
+
+        self.slots_per_day = (self.day_end - self.day_start) // slot_minutes
+        self.n_slots = self.slots_per_day * len(self.days)
+        self.full_mask = (1 << self.n_slots) - 1
+        self.day_masks = [_block(d * self.slots_per_day, self.slots_per_day) for d in range(len(self.days))]
+        self._day_pos = {d.lower(): i for i, d in enumerate(self.days)}
+
+    def day_pos(self, day: Optional[str]) -> Optional[int]:
+        return self._day_pos.get((day or "").strip().lower())
+
+    def minutes_block(self, day: Optional[str], start_min: int, end_min: int) -> int:
+        """Grid bits covered by [start_min, end_min) on `day`, clipped to the window."""
+        d = self.day_pos(day)
+        if d is None:
+            return 0
+        S = self.slots_per_day
+        a = max(0, (start_min - self.day_start) // self.slot_minutes)
+        b = min(S, -(-(end_min - self.day_start) // self.slot_minutes))
+        if b <= a:
+            return 0
+        return _block(d * S + a, b - a)
+
+    def start_mask(self, duration: int) -> int:
+        """Aligned start bits whose block ends inside the same day."""
+        S = self.slots_per_day
+        per_day = 0
+        for i in range(0, S - duration + 1, self.start_step):
+            per_day |= 1 << i
+        out = 0
+        for d in range(len(self.days)):
+            out |= per_day << (d * S)
+        return out
+
+    def availability_mask(self, schedule_data) -> int:
+        """
+        LecturerAvailability.schedule_data -> grid bits the lecturer can teach.
+        No record / empty data means "no restriction".
+        """
+        if not isinstance(schedule_data, dict) or not schedule_data:
+            return self.full_mask
+
+        by_day = {str(k).strip().lower(): v for k, v in schedule_data.items()}
+        mask = 0
+        for day in self.days:
+            info = by_day.get(day.lower())
+            if not isinstance(info, dict) or not info.get("is_available"):
+                continue
+            for r in info.get("ranges") or []:
+                if not isinstance(r, dict):
+                    continue
+                try:
+                    s = hhmm_to_minutes(r.get("start"))
+                    e = hhmm_to_minutes(r.get("end"))
+                except ValueError:
+                    continue
+                # only whole slots inside the range count as available
+                d = self.day_pos(day)
+                S = self.slots_per_day
+                a = max(0, -(-(s - self.day_start) // self.slot_minutes))
+                b = min(S, (e - self.day_start) // self.slot_minutes)
+                if b > a:
+                    mask |= _block(d * S + a, b - a)
+        return mask
+
+    def slot_to_time(self, start: int, duration: int):
+        S = self.slots_per_day
+        day = self.days[start // S]
+        begin = self.day_start + (start % S) * self.slot_minutes
+        return day, minutes_to_hhmm(begin), minutes_to_hhmm(begin + duration * self.slot_minutes)
+
+
+class _Session:
+    __slots__ = (
+        "sid", "offer_id", "module_code", "duration", "lecturer_id",
+        "group_ids", "size", "rooms", "available", "domain",
+    )
+
+    def __init__(self, sid, offer_id, module_code, duration, lecturer_id, group_ids, size, rooms, available):
+        self.sid = sid
+        self.offer_id = offer_id
+        self.module_code = module_code
+        self.duration = duration
+        self.lecturer_id = lecturer_id
+        self.group_ids = group_ids
+        self.size = size
+        self.rooms = rooms
+        self.available = available
+        self.domain = 0
+
+
+class TimetableSolver:
+    def __init__(self, cfg: SolverConfig):
+        self.cfg = cfg
+        self.sessions: List[_Session] = []
+        self.lecturer_busy: Dict[int, int] = {}
+        self.group_busy: Dict[int, int] = {}
+        self.room_busy: Dict[int, int] = {}
+        self.placements: Dict[int, tuple] = {}  # sid -> (start, room_id)
+        self.unplaced: List[tuple] = []  # (sid, reason)
+        self.backtracks = 0
+
+    # ---------- problem setup ----------
+    def occupy(self, block: int, lecturer_id: Optional[int], group_ids: Iterable[int], room_id: Optional[int]):
+        """Mark an already scheduled entry as busy time for its resources."""
+        if not block:
+            return
+        if lecturer_id is not None:
+            self.lecturer_busy[lecturer_id] = self.lecturer_busy.get(lecturer_id, 0) | block
+        for g in group_ids:
+            self.group_busy[g] = self.group_busy.get(g, 0) | block
+        if room_id is not None:
+            self.room_busy[room_id] = self.room_busy.get(room_id, 0) | block
+
+    def add_session(self, offer_id, module_code, lecturer_id, group_ids, size, rooms, available, duration=None):
+        s = _Session(
+            sid=len(self.sessions),
+            offer_id=offer_id,
+            module_code=module_code,
+            duration=duration or self.cfg.session_slots,
+            lecturer_id=lecturer_id,
+            group_ids=list(group_ids),
+            size=size,
+            rooms=list(rooms),
+            available=available,
+        )
+        self.sessions.append(s)
+        return s
+
+    def _busy_for(self, s: _Session) -> int:
+        busy = self.lecturer_busy.get(s.lecturer_id, 0) if s.lecturer_id is not None else 0
+        for g in s.group_ids:
+            busy |= self.group_busy.get(g, 0)
+        return busy
+
+    # ---------- search ----------
+    def _ordered_starts(self, s: _Session) -> List[int]:
+        # least loaded days first (for this lecturer/groups), earliest slot first
+        S = self.cfg.slots_per_day
+        busy = self._busy_for(s)
+        days = sorted(range(len(self.cfg.days)), key=lambda d: (_popcount(busy & self.cfg.day_masks[d]), d))
+        out = []
+        for d in days:
+            bits = (s.domain >> (d * S)) & ((1 << S) - 1)
+            while bits:
+                low = bits & -bits
+                out.append(d * S + low.bit_length() - 1)
+                bits ^= low
+        return out
+
+    def _assign(self, sid: int, start: int, unassigned: set):
+        s = self.sessions[sid]
+        block = _block(start, s.duration)
+
+        room_id = None
+        for r in s.rooms:
+            if not (self.room_busy.get(r, 0) & block):
+                room_id = r
+                break
+        if room_id is None:
+            return None
+
+        self.room_busy[room_id] = self.room_busy.get(room_id, 0) | block
+        if s.lecturer_id is not None:
+            self.lecturer_busy[s.lecturer_id] = self.lecturer_busy.get(s.lecturer_id, 0) | block
+        for g in s.group_ids:
+            self.group_busy[g] = self.group_busy.get(g, 0) | block
+
+        day_mask = self.cfg.day_masks[start // self.cfg.slots_per_day]
+        spread_cache = {}
+        saved = []
+        wiped = False
+        for n in self._neighbours[sid]:
+            if n not in unassigned:
+                continue
+            ns = self.sessions[n]
+            mask = spread_cache.get(ns.duration)
+            if mask is None:
+                mask = spread_cache[ns.duration] = _spread(block, ns.duration)
+            if ns.offer_id == s.offer_id:
+                # spread multiple sessions of one module over different days
+                mask |= day_mask
+            new = ns.domain & ~mask
+            if new != ns.domain:
+                saved.append((n, ns.domain))
+                ns.domain = new
+                if not new:
+                    wiped = True
+
+        self.placements[sid] = (start, room_id)
+        return (block, room_id, saved, wiped)
+
+    def _unassign(self, sid: int, rec):
+        s = self.sessions[sid]
+        block, room_id, saved, _ = rec
+        self.room_busy[room_id] &= ~block
+        if s.lecturer_id is not None:
+            self.lecturer_busy[s.lecturer_id] &= ~block
+        for g in s.group_ids:
+            self.group_busy[g] &= ~block
+        for n, old in reversed(saved):
+            self.sessions[n].domain = old
+        self.placements.pop(sid, None)
+
+    def solve(self):
+        cfg = self.cfg
+        start_masks = {}
+        unassigned = set()
+
+        for s in self.sessions:
+            if not s.rooms:
+                self.unplaced.append((s.sid, "no active room matches module room type and group size"))
+                continue
+            if not s.available:
+                self.unplaced.append((s.sid, "lecturer has no availability in the planning window"))
+                continue
+            sm = start_masks.get(s.duration)
+            if sm is None:
+                sm = start_masks[s.duration] = cfg.start_mask(s.duration)
+            s.domain = _fits(s.available, s.duration) & sm & ~_spread(self._busy_for(s), s.duration)
+            unassigned.add(s.sid)
+
+        # sessions that compete for a lecturer or a group (or belong to the same offer)
+        by_resource: Dict[tuple, List[int]] = {}
+        for sid in unassigned:
+            s = self.sessions[sid]
+            keys = [("o", s.offer_id)] + [("g", g) for g in s.group_ids]
+            if s.lecturer_id is not None:
+                keys.append(("l", s.lecturer_id))
+            for k in keys:
+                by_resource.setdefault(k, []).append(sid)
+        self._neighbours = {sid: set() for sid in unassigned}
+        for sids in by_resource.values():
+            for sid in sids:
+                self._neighbours[sid].update(sids)
+        for sid, ns in self._neighbours.items():
+            ns.discard(sid)
+
+        frames = []  # [sid, ordered starts, next position, assignment record]
+        retry = False
+        while True:
+            if not retry:
+                if not unassigned:
+                    break
+                sid = min(
+                    unassigned,
+                    key=lambda i: (_popcount(self.sessions[i].domain), -len(self._neighbours[i]), i),
+                )
+                unassigned.discard(sid)
+                frames.append([sid, self._ordered_starts(self.sessions[sid]), 0, None])
+
+            frame = frames[-1]
+            sid = frame[0]
+            if frame[3] is not None:
+                self._unassign(sid, frame[3])
+                frame[3] = None
+
+            give_up = self.backtracks >= cfg.max_backtracks
+            while frame[2] < len(frame[1]):
+                start = frame[1][frame[2]]
+                frame[2] += 1
+                rec = self._assign(sid, start, unassigned)
+                if rec is None:
+                    continue
+                if rec[3] and not give_up:
+                    self._unassign(sid, rec)
+                    continue
+                frame[3] = rec
+                break
+
+            if frame[3] is not None:
+                retry = False
+                continue
+
+            frames.pop()
+            if frames and not give_up:
+                # chronological backtrack: let the previous session try its next start
+                self.backtracks += 1
+                unassigned.add(sid)
+                retry = True
+            else:
+                self.unplaced.append((sid, "no conflict-free slot found"))
+                retry = False
+
+        return self
+
+    # ---------- output ----------
+    def placed_entries(self) -> List[dict]:
+        out = []
+        for sid in sorted(self.placements):
+            s = self.sessions[sid]
+            start, room_id = self.placements[sid]
+            day, start_time, end_time = self.cfg.slot_to_time(start, s.duration)
+            out.append(
+                {
+                    "offered_module_id": s.offer_id,
+                    "module_code": s.module_code,
+                    "room_id": room_id,
+                    "day_of_week": day,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "group_ids": list(s.group_ids),
+                }
+            )
+        return out
+
+    def unplaced_entries(self) -> List[dict]:
+        return [
+            {
+                "offered_module_id": self.sessions[sid].offer_id,
+                "module_code": self.sessions[sid].module_code,
+                "reason": reason,
+            }
+            for sid, reason in self.unplaced
+        ]
+
+
+# ---------- DB glue ----------
+def _norm(v) -> str:
+    return (v or "").strip().lower()
+
+
+def _program_keys(p: models.StudyProgram) -> set:
+    # same matching rules as permissions.group_payload_in_hosp_domain
+    return {_norm(p.name), _norm(p.acronym), str(p.id)}
+
+
+def load_solver(
+    db: Session,
+    semester: str,
+    cfg: SolverConfig,
+    offer_groups: Optional[Dict[int, List[int]]] = None,
+    infer_groups: bool = True,
+    replace_existing: bool = False,
+) -> TimetableSolver:
+    """
+    Build a solver for `semester` from OfferedModule / Room / Group /
+    LecturerAvailability rows. Existing entries of the semester are kept as
+    fixed busy time unless `replace_existing` is set.
+    """
+    offer_groups = offer_groups or {}
+    solver = TimetableSolver(cfg)
+
+    offers = (
+        db.query(models.OfferedModule)
+        .options(joinedload(models.OfferedModule.module))
+        .filter(models.OfferedModule.semester == semester)
+        .order_by(models.OfferedModule.id)
+        .all()
+    )
+    rooms = (
+        db.query(models.Room)
+        .filter(models.Room.status == True)  # noqa: E712
+        .order_by(models.Room.capacity, models.Room.id)
+        .all()
+    )
+    groups = {g.id: g for g in db.query(models.Group).all()}
+
+    lecturer_ids = {o.lecturer_id for o in offers if o.lecturer_id is not None}
+    availability = {}
+    if lecturer_ids:
+        for a in (
+            db.query(models.LecturerAvailability)
+            .filter(models.LecturerAvailability.lecturer_id.in_(lecturer_ids))
+            .all()
+        ):
+            availability[a.lecturer_id] = cfg.availability_mask(a.schedule_data)
+
+    program_groups: Dict[int, List[int]] = {}
+    if infer_groups:
+        program_ids = {o.module.program_id for o in offers if o.module and o.module.program_id is not None}
+        if program_ids:
+            for p in db.query(models.StudyProgram).filter(models.StudyProgram.id.in_(program_ids)).all():
+                keys = _program_keys(p)
+                program_groups[p.id] = sorted(gid for gid, g in groups.items() if _norm(g.program) in keys)
+
+    already = {}
+    if not replace_existing:
+        entries = (
+            db.query(models.ScheduleEntry)
+            .options(joinedload(models.ScheduleEntry.offered_module), selectinload(models.ScheduleEntry.groups))
+            .filter(models.ScheduleEntry.semester == semester)
+            .all()
+        )
+        for e in entries:
+            if e.week_start_minute is not None and e.week_end_minute is not None:
+                d, start_min = divmod(e.week_start_minute, MINUTES_PER_DAY)
+                block = cfg.minutes_block(DAYS[d], start_min, e.week_end_minute - d * MINUTES_PER_DAY)
+            else:
+                try:
+                    block = cfg.minutes_block(e.day_of_week, hhmm_to_minutes(e.start_time), hhmm_to_minutes(e.end_time))
+                except ValueError:
+                    continue
+            lec_id = e.offered_module.lecturer_id if e.offered_module else None
+            solver.occupy(block, lec_id, [g.id for g in e.groups], e.room_id)
+            already[e.offered_module_id] = already.get(e.offered_module_id, 0) + 1
+
+    for o in offers:
+        needed = cfg.sessions_per_module - already.get(o.id, 0)
+        if needed <= 0:
+            continue
+
+        if o.id in offer_groups:
+            gids = [g for g in offer_groups[o.id] if g in groups]
+        elif o.module and o.module.program_id in program_groups:
+            gids = program_groups[o.module.program_id]
+        else:
+            gids = []
+        size = sum(groups[g].size or 0 for g in gids)
+
+        room_type = _norm(o.module.room_type) if o.module else ""
+        candidate_rooms = [
+            r.id for r in rooms
+            if (r.capacity or 0) >= size and (not room_type or room_type == "any" or _norm(r.type) == room_type)
+        ]
+        available = availability.get(o.lecturer_id, cfg.full_mask) if o.lecturer_id is not None else cfg.full_mask
+
+        for _ in range(needed):
+            solver.add_session(o.id, o.module_code, o.lecturer_id, gids, size, candidate_rooms, available)
+
+    return solver
+
+
+def write_solution(db: Session, semester: str, entries: List[dict], replace_existing: bool = False) -> List[int]:
+    """
+    Bulk insert solved entries (+ group links) in one transaction; returns new
+    ids. The solver read the timetable unlocked, so every entry is re-checked
+    under the semester lock; raises conflicts.WriteConflictError (after rolling
+    back) if one was booked meanwhile.
+    """
+    conflicts.lock_semester(db, semester)
+    if replace_existing:
+        schedule_revisions.tombstone_semester(db, semester)
+        old_ids = select(models.ScheduleEntry.id).where(models.ScheduleEntry.semester == semester)
+        db.execute(delete(models.schedule_entry_groups).where(models.schedule_entry_groups.c.schedule_entry_id.in_(old_ids)))
+        db.execute(delete(models.ScheduleEntry).where(models.ScheduleEntry.semester == semester))
+
+    lecturers = dict(
+        db.query(models.OfferedModule.id, models.OfferedModule.lecturer_id).filter(
+            models.OfferedModule.id.in_({e["offered_module_id"] for e in entries})
+        )
+    ) if entries else {}
+    found = []
+    for e in entries:
+        found += conflicts.find_write_conflicts(
+            db, semester, e["day_of_week"], e["start_time"], e["end_time"],
+            e["room_id"], lecturers.get(e["offered_module_id"]), e["group_ids"],
+        )
+    if found:
+        db.rollback()
+        raise conflicts.WriteConflictError(found)
+
+    ids = insert_entries(db, [{**e, "semester": semester} for e in entries])
+    db.commit()
+    return ids
+
+
+# ---------- incremental repair ----------
+class _Placed:
+    __slots__ = (
+        "idx", "entry_id", "offer_id", "module_code", "lecturer_id", "group_ids",
+        "rooms", "available", "start", "duration", "room_id", "orig",
+        "minutes", "span", "orig_slots", "pinned",
+    )
+
+    def __init__(self, idx, entry, lecturer_id, group_ids, rooms, available, start, duration,
+                 minutes=None, span=None, pinned=None):
+        self.idx = idx
+        self.entry_id = entry.id
+        self.offer_id = entry.offered_module_id
+        self.module_code = entry.offered_module.module_code if entry.offered_module else None
+        self.lecturer_id = lecturer_id
+        self.group_ids = group_ids
+        self.rooms = rooms
+        self.available = available
+        self.start = start
+        self.duration = duration  # grid slots at the current start
+        self.orig_slots = duration  # as stored; may be clipped to the window or off the grid
+        self.minutes = minutes  # real length, kept when the entry moves
+        self.span = span if span is not None else duration  # slots it needs at a new, aligned start
+        self.pinned = pinned  # (week start, week end) of an entry outside the window: busy, never moved
+        self.room_id = entry.room_id
+        # as stored, so an entry that only changes room keeps its exact times
+        self.orig = (start, entry.room_id, entry.day_of_week, entry.start_time, entry.end_time)
+
+
+class TimetableRepair:
+    """
+    Local search that fixes entries of an existing timetable after a lecturer's
+    availability shrinks or a room is deactivated. Every other entry is the
+    warm start: an affected entry is first moved to the nearest free start
+    (same slot with another room, then same day, then other days); if none is
+    free, one blocking entry may be ejected and re-placed (an ejection chain of
+    length one). Entries outside the planning window are never moved, and
+    nothing is placed over them. A moved entry keeps its stored length.
+    """
+
+    def __init__(self, cfg: SolverConfig, time_budget: float = 0.5):
+        self.cfg = cfg
+        self.time_budget = time_budget
+        self.items: List[_Placed] = []
+        self.active_rooms: set = set()
+        self.by_lecturer: Dict[int, set] = {}
+        self.by_group: Dict[int, set] = {}
+        self.by_room: Dict[int, set] = {}
+        self.affected: List[tuple] = []  # (idx, reason)
+        self.unresolved: List[tuple] = []  # (idx, reason)
+        self.evaluations = 0
+        self._start_masks: Dict[int, int] = {}
+
+    # ---------- bookkeeping ----------
+    def add(self, item: _Placed):
+        self.items.append(item)
+        if item.start is not None or item.pinned is not None:
+            self._index(item, True)
+
+    def _index(self, it: _Placed, on: bool):
+        keys = [(self.by_room, it.room_id)] if it.room_id is not None else []
+        if it.lecturer_id is not None:
+            keys.append((self.by_lecturer, it.lecturer_id))
+        keys += [(self.by_group, g) for g in it.group_ids]
+        for table, key in keys:
+            ids = table.setdefault(key, set())
+            if on:
+                ids.add(it.idx)
+            else:
+                ids.discard(it.idx)
+
+    def _slots(self, it: _Placed, start: int) -> int:
+        return it.orig_slots if start == it.orig[0] else it.span
+
+    def _block(self, it: _Placed, start: Optional[int] = None) -> int:
+        if start is None:
+            return _block(it.start, it.duration)
+        return _block(start, self._slots(it, start))
+
+    def _week_minutes(self, block: int) -> tuple:
+        """Minute-of-week range of a grid block (one contiguous run within a day)."""
+        low = (block & -block).bit_length() - 1
+        d, s = divmod(low, self.cfg.slots_per_day)
+        begin = day_index(self.cfg.days[d]) * MINUTES_PER_DAY + self.cfg.day_start + s * self.cfg.slot_minutes
+        return begin, begin + _popcount(block) * self.cfg.slot_minutes
+
+    def _overlapping(self, table: Dict[int, set], key, block: int, skip: int) -> List[int]:
+        out, minutes = [], None
+        for i in table.get(key, ()):
+            other = self.items[i]
+            if i == skip:
+                continue
+            if other.pinned is not None:
+                minutes = minutes or self._week_minutes(block)
+                if other.pinned[0] < minutes[1] and other.pinned[1] > minutes[0]:
+                    out.append(i)
+            elif other.start is not None and self._block(other) & block:
+                out.append(i)
+        return out
+
+    def _person_blockers(self, it: _Placed, block: int) -> set:
+        out = set()
+        if it.lecturer_id is not None:
+            out.update(self._overlapping(self.by_lecturer, it.lecturer_id, block, it.idx))
+        for g in it.group_ids:
+            out.update(self._overlapping(self.by_group, g, block, it.idx))
+        return out
+
+    def _rooms_for(self, it: _Placed) -> List[int]:
+        # the current room first, so a valid room assignment is kept
+        if it.orig[1] in self.active_rooms:
+            return [it.orig[1]] + [r for r in it.rooms if r != it.orig[1]]
+        return it.rooms
+
+    def _start_mask(self, duration: int) -> int:
+        sm = self._start_masks.get(duration)
+        if sm is None:
+            sm = self._start_masks[duration] = self.cfg.start_mask(duration)
+        return sm
+
+    def _candidate_starts(self, it: _Placed) -> List[int]:
+        """Starts inside the lecturer's availability, nearest to the original first."""
+        bits = _fits(it.available, it.span) & self._start_mask(it.span)
+        orig = it.orig[0]
+        if orig is not None and _fits(it.available, it.orig_slots) >> orig & 1:
+            bits |= 1 << orig  # the original start may be off the start_step grid
+        S = self.cfg.slots_per_day
+        starts = []
+        while bits:
+            low = bits & -bits
+            starts.append(low.bit_length() - 1)
+            bits ^= low
+        if orig is None:
+            return starts
+        return sorted(starts, key=lambda t: (t != orig, t // S != orig // S, abs(t % S - orig % S), t))
+
+    # ---------- moves ----------
+    def _place(self, it: _Placed, start: int, room_id: Optional[int]):
+        it.start, it.room_id, it.duration = start, room_id, self._slots(it, start)
+        self._index(it, True)
+
+    def _lift(self, it: _Placed):
+        self._index(it, False)
+        it.start = None
+
+    def _free_room(self, it: _Placed, block: int) -> Optional[int]:
+        for r in self._rooms_for(it):
+            if not self._overlapping(self.by_room, r, block, it.idx):
+                return r
+        return None
+
+    def _place_direct(self, it: _Placed) -> bool:
+        for start in self._candidate_starts(it):
+            self.evaluations += 1
+            block = self._block(it, start)
+            if self._person_blockers(it, block):
+                continue
+            room_id = self._free_room(it, block)
+            if room_id is not None:
+                self._place(it, start, room_id)
+                return True
+        return False
+
+    def _place_with_ejection(self, it: _Placed, deadline: float) -> bool:
+        for start in self._candidate_starts(it):
+            if time.monotonic() > deadline:
+                return False
+            block = self._block(it, start)
+            people = self._person_blockers(it, block)
+            if len(people) > 1:
+                continue
+            options = []  # (blocker idx, room)
+            if people:
+                (b,) = people
+                room_id = self._free_room(it, block)
+                if room_id is None:
+                    # the blocker's own room is freed by ejecting it
+                    room_id = self.items[b].room_id if self.items[b].room_id in self._rooms_for(it) else None
+                if room_id is not None:
+                    options.append((b, room_id))
+            else:
+                for r in self._rooms_for(it):
+                    occupants = self._overlapping(self.by_room, r, block, it.idx)
+                    if len(occupants) == 1:
+                        options.append((occupants[0], r))
+            for b, room_id in options:
+                blocker = self.items[b]
+                if blocker.pinned is not None:
+                    continue
+                self.evaluations += 1
+                saved = (blocker.start, blocker.room_id)
+                self._lift(blocker)
+                if self._overlapping(self.by_room, room_id, block, it.idx) or self._person_blockers(it, block):
+                    self._place(blocker, *saved)
+                    continue
+                self._place(it, start, room_id)
+                if self._place_direct(blocker):
+                    return True
+                self._lift(it)
+                self._place(blocker, *saved)
+        return False
+
+    def repair(self):
+        deadline = time.monotonic() + self.time_budget
+        for idx, _ in self.affected:
+            self._lift(self.items[idx])
+        # fewest options first, like the solver's smallest-domain rule
+        order = sorted(
+            (idx for idx, _ in self.affected),
+            key=lambda i: (_popcount(_fits(self.items[i].available, self.items[i].span)), len(self.items[i].rooms), i),
+        )
+        reasons = dict(self.affected)
+        for idx in order:
+            it = self.items[idx]
+            if not it.rooms:
+                self.unresolved.append((idx, reasons[idx] + "; no active room fits"))
+                continue
+            if self._place_direct(it):
+                continue
+            if time.monotonic() <= deadline and self._place_with_ejection(it, deadline):
+                continue
+            self.unresolved.append((idx, reasons[idx] + "; no free slot found"))
+        return self
+
+    # ---------- output ----------
+    def _slot(self, it: _Placed, start: int, room_id: Optional[int]) -> dict:
+        if start == it.orig[0]:
+            day, start_time, end_time = it.orig[2:]
+        else:
+            day, start_time, _ = self.cfg.slot_to_time(start, it.span)
+            end_time = minutes_to_hhmm(hhmm_to_minutes(start_time) + it.minutes)
+        return {"day_of_week": day, "start_time": start_time, "end_time": end_time, "room_id": room_id}
+
+    def moves(self) -> List[dict]:
+        reasons = dict(self.affected)
+        out = []
+        for it in self.items:
+            if it.start is None or (it.start, it.room_id) == it.orig[:2]:
+                continue
+            out.append(
+                {
+                    "entry_id": it.entry_id,
+                    "offered_module_id": it.offer_id,
+                    "module_code": it.module_code,
+                    "reason": reasons.get(it.idx, "moved to make room for an affected entry"),
+                    "before": self._slot(it, it.orig[0], it.orig[1]),
+                    "after": self._slot(it, it.start, it.room_id),
+                }
+            )
+        return out
+
+    def unresolved_entries(self) -> List[dict]:
+        return [
+            {
+                "entry_id": self.items[idx].entry_id,
+                "offered_module_id": self.items[idx].offer_id,
+                "module_code": self.items[idx].module_code,
+                "reason": reason,
+            }
+            for idx, reason in self.unresolved
+        ]
+
+
+def load_repair(
+    db: Session,
+    semester: str,
+    cfg: SolverConfig,
+    lecturer_ids: Optional[Iterable[int]] = None,
+    room_ids: Optional[Iterable[int]] = None,
+    time_budget: float = 0.5,
+) -> TimetableRepair:
+    """
+    Build a repair for `semester` from its current entries. An entry is
+    affected when its room is inactive or its lecturer's availability no
+    longer covers it; `lecturer_ids` / `room_ids` narrow that to the
+    resources that just changed.
+    """
+    lecturer_ids = set(lecturer_ids) if lecturer_ids is not None else None
+    room_ids = set(room_ids) if room_ids is not None else None
+    rep = TimetableRepair(cfg, time_budget)
+
+    entries = (
+        db.query(models.ScheduleEntry)
+        .options(
+            joinedload(models.ScheduleEntry.offered_module).joinedload(models.OfferedModule.module),
+            selectinload(models.ScheduleEntry.groups),
+        )
+        .filter(models.ScheduleEntry.semester == semester)
+        .order_by(models.ScheduleEntry.id)
+        .all()
+    )
+    rooms = db.query(models.Room).order_by(models.Room.capacity, models.Room.id).all()
+    rep.active_rooms = {r.id for r in rooms if r.status}
+
+    offer_lecturers = {e.offered_module.lecturer_id for e in entries if e.offered_module} - {None}
+    availability = {}
+    if offer_lecturers:
+        for a in (
+            db.query(models.LecturerAvailability)
+            .filter(models.LecturerAvailability.lecturer_id.in_(offer_lecturers))
+            .all()
+        ):
+            availability[a.lecturer_id] = cfg.availability_mask(a.schedule_data)
+
+    for e in entries:
+        offer = e.offered_module
+        lec_id = offer.lecturer_id if offer else None
+        if e.week_start_minute is not None and e.week_end_minute is not None:
+            week = (e.week_start_minute, e.week_end_minute)
+        else:
+            try:
+                week = week_range(e.day_of_week, e.start_time, e.end_time)
+            except ValueError:
+                week = None  # unreadable times: nothing to place or to avoid
+        block = 0
+        if week is not None:
+            d, start_min = divmod(week[0], MINUTES_PER_DAY)
+            block = cfg.minutes_block(DAYS[d], start_min, week[1] - d * MINUTES_PER_DAY)
+        minutes = week[1] - week[0] if week is not None else 0
+        group_ids = [g.id for g in e.groups]
+        size = sum(g.size or 0 for g in e.groups)
+        room_type = _norm(offer.module.room_type) if offer and offer.module else ""
+        candidate_rooms = [
+            r.id for r in rooms
+            if r.status and (r.capacity or 0) >= size
+            and (not room_type or room_type == "any" or _norm(r.type) == room_type)
+        ]
+        available = availability.get(lec_id, cfg.full_mask) if lec_id is not None else cfg.full_mask
+
+        start = (block & -block).bit_length() - 1 if block else None
+        item = _Placed(
+            len(rep.items), e, lec_id, group_ids, candidate_rooms, available,
+            start, _popcount(block), minutes, -(-minutes // cfg.slot_minutes),
+            pinned=week if (week is not None and not block) else None,
+        )
+        rep.add(item)
+        if not block:
+            continue  # outside the planning window: stays where it is, but its time is busy
+
+        reasons = []
+        if e.room_id is not None and e.room_id not in rep.active_rooms and (room_ids is None or e.room_id in room_ids):
+            reasons.append(f"room {e.room_id} is inactive")
+        if lec_id is not None and block & ~available and (lecturer_ids is None or lec_id in lecturer_ids):
+            reasons.append(f"lecturer {lec_id} is unavailable")
+        if reasons:
+            rep.affected.append((item.idx, "; ".join(reasons)))
+    return rep
+
+
+def apply_repair(db: Session, semester: str, moves: List[dict]):
+    """
+    Write the repair's moves as ORM updates (one transaction). The moves were
+    computed from an unlocked read, so under the semester lock every moved
+    entry must still be where "before" says and its new slot must be free;
+    otherwise raises conflicts.WriteConflictError after rolling back.
+    """
+    if not moves:
+        return
+    conflicts.lock_semester(db, semester)
+    rows = {
+        e.id: e
+        for e in db.query(models.ScheduleEntry)
+        .options(joinedload(models.ScheduleEntry.offered_module), selectinload(models.ScheduleEntry.groups))
+        .filter(models.ScheduleEntry.id.in_([m["entry_id"] for m in moves]))
+    }
+    stale = []
+    for m in moves:
+        e = rows.get(m["entry_id"])
+        before = m["before"]
+        if e is None or e.semester != semester or (e.day_of_week, e.start_time, e.end_time, e.room_id) != (
+            before["day_of_week"], before["start_time"], before["end_time"], before["room_id"],
+        ):
+            stale.append(m["entry_id"])
+    if stale:
+        db.rollback()
+        raise conflicts.WriteConflictError(
+            [], "Entries changed since the repair was computed: " + ", ".join(map(str, stale))
+        )
+
+    for m in moves:
+        e = rows[m["entry_id"]]
+        after = m["after"]
+        e.day_of_week, e.start_time, e.end_time, e.room_id = (
+            after["day_of_week"], after["start_time"], after["end_time"], after["room_id"],
+        )
+        e.week_start_minute, e.week_end_minute = week_range(e.day_of_week, e.start_time, e.end_time)
+    # check against the moved state: entries may swap into each other's old slots
+    db.flush()
+    found = []
+    for m in moves:
+        e = rows[m["entry_id"]]
+        found += conflicts.find_write_conflicts(
+            db, semester, e.day_of_week, e.start_time, e.end_time, e.room_id,
+            e.offered_module.lecturer_id if e.offered_module else None,
+            [g.id for g in e.groups], exclude_id=e.id,
+        )
+    if found:
+        db.rollback()
+        raise conflicts.WriteConflictError(found)
+    db.commit()
@@ -0,0 +1,107 @@
+# api/timeslots.py
+from typing import Optional
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKDAYS = DAYS[:5]
+
+MINUTES_PER_DAY = 24 * 60
+
+_DAY_INDEX = {d.lower(): i for i, d in enumerate(DAYS)}
+
+
+def day_index(day: Optional[str]) -> int:
+    idx = _DAY_INDEX.get(str(day or "").strip().lower())
+    if idx is None:
+        raise ValueError(f"Invalid day '{day}'. Expected one of {', '.join(DAYS)}.")
+    return idx
+
+
+def hhmm_to_minutes(value: Optional[str]) -> int:
+    """'09:30' -> 570. Accepts '24:00' as end of day."""
+    try:
+        hh, mm = (value or "").strip().split(":")
+        h, m = int(hh), int(mm)
+    except Exception:
+        raise ValueError(f"Invalid time format '{value}'. Expected HH:MM.")
+    if not (0 <= m < 60) or not (0 <= h < 24 or (h == 24 and m == 0)):
+        raise ValueError(f"Invalid time format '{value}'. Expected HH:MM.")
+    return h * 60 + m
+
+
+def minutes_to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# ScheduleEntry stores times as minute-of-week (Monday 00:00 == 0) for SQL range scans
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def week_minute(day: Optional[str], hhmm: Optional[str]) -> int:
+    return day_index(day) * MINUTES_PER_DAY + hhmm_to_minutes(hhmm)
+
+
+def week_range(day: Optional[str], start_time: Optional[str], end_time: Optional[str]):
+    """('Tuesday', '10:00', '12:00') -> (2040, 2160)"""
+    return week_minute(day, start_time), week_minute(day, end_time)
+
+
+def split_week_minute(minute: int):
+    """2040 -> ('Tuesday', '10:00')"""
+    d, m = divmod(minute, MINUTES_PER_DAY)
+    return DAYS[d], minutes_to_hhmm(m)
+
+
+# Weekly availability bitmaps: one bit per 15-minute slot, bit = day * 96 + slot
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+FULL_WEEK_BITMAP = (1 << SLOTS_PER_WEEK) - 1
+
+
+def range_bitmap(day: Optional[str], start_time: Optional[str], end_time: Optional[str]) -> int:
+    """Every slot the range touches (partial slots included). Raises ValueError."""
+    d = day_index(day)
+    s, e = hhmm_to_minutes(start_time), hhmm_to_minutes(end_time)
+    if e <= s:
+        raise ValueError("end_time must be after start_time")
+    a = s // SLOT_MINUTES
+    b = -(-e // SLOT_MINUTES)
+    return ((1 << (b - a)) - 1) << (d * SLOTS_PER_DAY + a)
+
+
+def availability_bitmap(schedule_data) -> Optional[int]:
+    """
+    LecturerAvailability.schedule_data ({day: {is_available, ranges: [{start, end}]}})
+    -> slots fully inside an available range. None for empty data ("no restriction").
+    """
+    if not isinstance(schedule_data, dict) or not schedule_data:
+        return None
+    bits = 0
+    for day, info in schedule_data.items():
+        try:
+            d = day_index(day)
+        except ValueError:
+            continue
+        if not isinstance(info, dict) or not info.get("is_available"):
+            continue
+        for r in info.get("ranges") or []:
+            if not isinstance(r, dict):
+                continue
+            try:
+                s, e = hhmm_to_minutes(r.get("start")), hhmm_to_minutes(r.get("end"))
+            except ValueError:
+                continue
+            a = -(-s // SLOT_MINUTES)
+            b = e // SLOT_MINUTES
+            if b > a:
+                bits |= ((1 << (b - a)) - 1) << (d * SLOTS_PER_DAY + a)
+    return bits
+
+
+def bitmap_to_hex(bits: Optional[int]) -> str:
+    """None ("no restriction") is stored as ''."""
+    return "" if bits is None else format(bits, "x")
+
+
+def bitmap_from_hex(value: str) -> Optional[int]:
+    return int(value, 16) if value else None
@@ -0,0 +1,12 @@
+-- Indexes backing schedule conflict detection (see api/conflicts.py).
+-- create_all() only creates indexes for brand-new tables, so run this once
+-- against existing databases.
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entries_semester_day_room
+    ON schedule_entries (semester, day_of_week, room_id);
+
+CREATE INDEX IF NOT EXISTS ix_offered_modules_semester_lecturer
+    ON offered_modules (semester, lecturer_id);
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entry_groups_group
+    ON schedule_entry_groups (group_id);
@@ -0,0 +1,24 @@
+-- Integer minute-of-week columns for schedule_entries (Monday 00:00 = 0).
+-- day_of_week / start_time / end_time stay as the API-facing values; the
+-- backend writes both, and overlap queries run on the integer columns:
+--   WHERE semester = :s AND week_start_minute < :hi AND week_end_minute > :lo
+
+ALTER TABLE schedule_entries ADD COLUMN IF NOT EXISTS week_start_minute integer;
+ALTER TABLE schedule_entries ADD COLUMN IF NOT EXISTS week_end_minute integer;
+
+UPDATE schedule_entries AS e
+SET week_start_minute = d.idx * 1440
+        + split_part(e.start_time, ':', 1)::int * 60 + split_part(e.start_time, ':', 2)::int,
+    week_end_minute = d.idx * 1440
+        + split_part(e.end_time, ':', 1)::int * 60 + split_part(e.end_time, ':', 2)::int
+FROM (VALUES
+    ('monday', 0), ('tuesday', 1), ('wednesday', 2), ('thursday', 3),
+    ('friday', 4), ('saturday', 5), ('sunday', 6)
+) AS d(name, idx)
+WHERE lower(trim(e.day_of_week)) = d.name
+  AND e.start_time ~ '^\d{1,2}:\d{2}$'
+  AND e.end_time ~ '^\d{1,2}:\d{2}$'
+  AND e.week_start_minute IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entries_semester_week_start
+    ON schedule_entries (semester, week_start_minute);
@@ -0,0 +1,9 @@
+-- Precomputed /analytics/metrics payloads (see api/analytics_snapshots.py).
+-- Fill after creating: python -m api.analytics_snapshots
+
+CREATE TABLE IF NOT EXISTS analytics_snapshots (
+    semester_id integer PRIMARY KEY,
+    module_counts json NOT NULL DEFAULT '{}',
+    payload json NOT NULL DEFAULT '{}',
+    refreshed_at timestamp NOT NULL DEFAULT now()
+);
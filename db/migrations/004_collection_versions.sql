@@ -0,0 +1,11 @@
+-- Per-collection version counters behind the list endpoints' ETags
+-- (see api/collection_versions.py).
+
+CREATE TABLE IF NOT EXISTS collection_versions (
+    name varchar(50) PRIMARY KEY,
+    version integer NOT NULL DEFAULT 0
+);
+
+INSERT INTO collection_versions (name, version) VALUES
+    ('modules', 0), ('lecturers', 0), ('rooms', 0), ('groups', 0), ('study-programs', 0)
+ON CONFLICT (name) DO NOTHING;
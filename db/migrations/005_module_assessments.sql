@@ -0,0 +1,62 @@
+-- Module assessment breakdown as rows instead of JSON text in
+-- modules.assessment_type (see ModuleAssessment in api/models.py).
+-- JSON values ([...] or {"assessments": [...]}) are converted and the column
+-- keeps a plain label (the first assessment type); free-text values stay as
+-- they are. Unparseable JSON is left untouched.
+
+CREATE TABLE IF NOT EXISTS module_assessments (
+    id serial PRIMARY KEY,
+    module_code varchar NOT NULL REFERENCES modules (module_code) ON DELETE CASCADE,
+    position integer NOT NULL DEFAULT 0,
+    type varchar(100) NOT NULL,
+    weight integer
+);
+
+CREATE INDEX IF NOT EXISTS ix_module_assessments_module_code ON module_assessments (module_code);
+CREATE INDEX IF NOT EXISTS ix_module_assessments_id ON module_assessments (id);
+
+DO $$
+DECLARE
+    r record;
+    doc jsonb;
+    items jsonb;
+    item jsonb;
+    pos integer;
+BEGIN
+    FOR r IN SELECT module_code, assessment_type FROM modules WHERE assessment_type ~ '^\s*[\[{]' LOOP
+        BEGIN
+            doc := r.assessment_type::jsonb;
+        EXCEPTION WHEN others THEN
+            CONTINUE;
+        END;
+
+        items := CASE jsonb_typeof(doc) WHEN 'array' THEN doc ELSE doc -> 'assessments' END;
+        IF items IS NULL OR jsonb_typeof(items) <> 'array' THEN
+            items := '[]'::jsonb;
+        END IF;
+
+        DELETE FROM module_assessments WHERE module_code = r.module_code;
+        pos := 0;
+        FOR item IN SELECT value FROM jsonb_array_elements(items) LOOP
+            IF jsonb_typeof(item) = 'object' AND coalesce(trim(item ->> 'type'), '') <> '' THEN
+                INSERT INTO module_assessments (module_code, position, type, weight)
+                VALUES (
+                    r.module_code,
+                    pos,
+                    trim(item ->> 'type'),
+                    CASE WHEN (item ->> 'weight') ~ '^\d+$' THEN (item ->> 'weight')::integer END
+                );
+                pos := pos + 1;
+            END IF;
+        END LOOP;
+
+        UPDATE modules
+        SET assessment_type = (
+            SELECT type FROM module_assessments
+            WHERE module_code = r.module_code
+            ORDER BY position
+            LIMIT 1
+        )
+        WHERE module_code = r.module_code;
+    END LOOP;
+END $$;
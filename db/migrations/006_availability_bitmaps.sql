@@ -0,0 +1,5 @@
+-- Weekly 15-minute availability bitmaps next to the JSON schedule_data
+-- (see api/availability.py). Rows left NULL are converted in memory when the
+-- availability index loads, and stored on their next /availabilities/update.
+
+ALTER TABLE lecturer_availabilities ADD COLUMN IF NOT EXISTS slot_bitmap varchar(200);
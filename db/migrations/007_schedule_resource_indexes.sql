@@ -0,0 +1,10 @@
+-- Indexes behind the per-resource timetables (GET /schedule/by-room/{id},
+-- /by-lecturer/{id}, /me). By-group uses ix_schedule_entry_groups_group and
+-- the lecturer lookup starts from ix_offered_modules_semester_lecturer
+-- (001_schedule_conflict_indexes.sql).
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entries_room_semester
+    ON schedule_entries (room_id, semester);
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entries_offered_module
+    ON schedule_entries (offered_module_id);
@@ -0,0 +1,24 @@
+-- Delta sync for GET /schedule/changes (see api/schedule_revisions.py).
+-- schedule_entries.revision is the "schedule" collection version of the
+-- entry's last write; entries that leave a semester leave a tombstone.
+-- Existing rows keep revision NULL and only reach clients through a full
+-- snapshot.
+
+ALTER TABLE schedule_entries ADD COLUMN IF NOT EXISTS revision integer;
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entries_semester_revision
+    ON schedule_entries (semester, revision);
+
+CREATE TABLE IF NOT EXISTS schedule_entry_tombstones (
+    id serial PRIMARY KEY,
+    entry_id integer NOT NULL,
+    semester varchar NOT NULL,
+    revision integer NOT NULL,
+    deleted_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_schedule_entry_tombstones_semester_revision
+    ON schedule_entry_tombstones (semester, revision);
+
+INSERT INTO collection_versions (name, version) VALUES ('schedule', 0)
+ON CONFLICT (name) DO NOTHING;
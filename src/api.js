@@ -72,7 +72,13 @@ const api = {
   
 
   // ---------- MODULES ----------
-  getModules() { return request("/modules/"); },
+  // params (all optional): program_id, semester, category, specialization_id, after, limit, fields
+  getModules(params = {}) {
+    const qs = new URLSearchParams(
+      Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== "")
+    ).toString();
+    return request(`/modules/${qs ? `?${qs}` : ""}`);
+  },
   createModule(payload) { return request("/modules/", { method: "POST", body: JSON.stringify(payload) }); },
   updateModule(id, payload) { return request(`/modules/${id}`, { method: "PUT", body: JSON.stringify(payload) }); },
   deleteModule(id) { return request(`/modules/${id}`, { method: "DELETE" }); },
@@ -101,6 +107,8 @@ const api = {
 
   // ---------- LECTURERS ----------
   getLecturers() { return request("/lecturers/"); },
+  // id / name / employment_type only, for dropdowns
+  getLecturersSummary() { return request("/lecturers/?view=summary"); },
   createLecturer(payload) { return request("/lecturers/", { method: "POST", body: JSON.stringify(payload) }); },
   updateLecturer(id, payload) { return request(`/lecturers/${id}`, { method: "PUT", body: JSON.stringify(payload) }); },
   deleteLecturer(id) { return request(`/lecturers/${id}`, { method: "DELETE" }); },
@@ -164,6 +172,33 @@ const api = {
     const query = semester ? `?semester=${encodeURIComponent(semester)}` : "";
     return request(`/schedule${query}`);
   },
+  // delta sync: pass the previous response's revision as `since`
+  getScheduleChanges(semester, since) {
+    const params = new URLSearchParams({ semester });
+    if (since !== undefined && since !== null) params.set("since", since);
+    return request(`/schedule/changes?${params.toString()}`);
+  },
+  getMySchedule(semester) {
+    return request(`/schedule/me?semester=${encodeURIComponent(semester)}`);
+  },
+  getLecturerScheduleById(lecturerId, semester) {
+    return request(`/schedule/by-lecturer/${lecturerId}?semester=${encodeURIComponent(semester)}`);
+  },
+  getGroupSchedule(groupId, semester) {
+    return request(`/schedule/by-group/${groupId}?semester=${encodeURIComponent(semester)}`);
+  },
+  getRoomSchedule(roomId, semester) {
+    return request(`/schedule/by-room/${roomId}?semester=${encodeURIComponent(semester)}`);
+  },
+  // subscribable calendar feed URL (no auth header, calendar apps fetch it directly)
+  getCalendarFeedUrl(kind, id, semester) {
+    const query = semester ? `?semester=${encodeURIComponent(semester)}` : "";
+    return `${API_BASE_URL}/schedule/ical/${kind}/${id}.ics${query}`;
+  },
+  // Server-Sent Events: upsert / delete / reload for one semester
+  scheduleEventsUrl(semester) {
+    return `${API_BASE_URL}/schedule/events?semester=${encodeURIComponent(semester)}`;
+  },
   createScheduleEntry(payload) {
     return request("/schedule/", { method: "POST", body: JSON.stringify(payload) });
   },
@@ -174,6 +209,18 @@ const api = {
   deleteScheduleEntry(id) {
     return request(`/schedule/${id}`, { method: "DELETE" });
   },
+  checkScheduleEntry(payload) {
+    return request("/schedule/check", { method: "POST", body: JSON.stringify(payload) });
+  },
+  solveSchedule(payload) {
+    return request("/schedule/solve", { method: "POST", body: JSON.stringify(payload) });
+  },
+  validateSchedule(semester) {
+    return request(`/schedule/validate?semester=${encodeURIComponent(semester)}`);
+  },
+  repairSchedule(payload) {
+    return request("/schedule/repair", { method: "POST", body: JSON.stringify(payload) });
+  },
 };
 
 
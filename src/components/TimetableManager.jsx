@@ -9,6 +9,7 @@ export default function TimetableManager({ currentUserRole }) {
   const [semesters, setSemesters] = useState([]);
   const [selectedSemester, setSelectedSemester] = useState("");
   const [scheduleData, setScheduleData] = useState([]);
+  const [issues, setIssues] = useState({}); // entry id -> violations from /schedule/validate
 
   // Listas
   const [offeredModules, setOfferedModules] = useState([]);
@@ -104,8 +105,21 @@ export default function TimetableManager({ currentUserRole }) {
     } catch (e) {
       console.error(e);
     }
+    if (!isStudent) {
+      try {
+        // violations per entry id, for highlighting the cards
+        const report = await api.validateSchedule(selectedSemester);
+        const byEntry = {};
+        Object.entries(report?.by_entry || {}).forEach(([id, idxs]) => {
+          byEntry[id] = idxs.map((i) => report.violations[i]);
+        });
+        setIssues(byEntry);
+      } catch (e) {
+        console.error(e);
+      }
+    }
     setLoading(false);
-  }, [selectedSemester]);
+  }, [selectedSemester, isStudent]);
 
   const loadDropdowns = useCallback(async () => {
     if (!selectedSemester) return;
@@ -144,6 +158,25 @@ export default function TimetableManager({ currentUserRole }) {
     }
   }, [selectedSemester, loadSchedule, loadDropdowns]);
 
+  // live changes from other planners (GET /schedule/events)
+  useEffect(() => {
+    if (!selectedSemester || typeof EventSource === "undefined") return;
+    const source = new EventSource(api.scheduleEventsUrl(selectedSemester));
+    source.addEventListener("upsert", (msg) => {
+      const { entry } = JSON.parse(msg.data);
+      setScheduleData((prev) => {
+        const rest = prev.filter((e) => e.id !== entry.id);
+        return [...rest, entry];
+      });
+    });
+    source.addEventListener("delete", (msg) => {
+      const { id } = JSON.parse(msg.data);
+      setScheduleData((prev) => prev.filter((e) => e.id !== id));
+    });
+    source.addEventListener("reload", () => loadSchedule());
+    return () => source.close();
+  }, [selectedSemester, loadSchedule]);
+
   // --- FILTRADO ---
   const filteredData = useMemo(() => {
     return (scheduleData || []).filter((entry) => {
@@ -609,11 +642,14 @@ export default function TimetableManager({ currentUserRole }) {
 
   const AgendaCard = ({ entry }) => {
     const groupLine = Array.isArray(entry.group_names) ? entry.group_names.join(", ") : (filterGroup || "—");
+    const entryIssues = issues[entry.id] || [];
+    const hasError = entryIssues.some((v) => v.severity === "error");
     return (
       <div
         onClick={() => !isStudent && openEdit(entry)}
+        title={entryIssues.map((v) => v.message).join("\n") || undefined}
         style={{
-          border: "1px solid #e9ecef",
+          border: entryIssues.length ? `2px solid ${hasError ? "#fa5252" : "#fab005"}` : "1px solid #e9ecef",
           borderRadius: "12px",
           padding: "14px",
           background: "white",
@@ -631,6 +667,11 @@ export default function TimetableManager({ currentUserRole }) {
         <div style={{ display: "flex", flexDirection: "column", gap: 6, fontSize: "0.95rem", color: "#495057" }}>
           <div>📍 <b>{entry.room_name}</b></div>
           <div>👥 {groupLine}</div>
+          {entryIssues.length > 0 && (
+            <div style={{ color: hasError ? "#c92a2a" : "#e67700", fontWeight: 700 }}>
+              ⚠ {entryIssues.length} issue{entryIssues.length > 1 ? "s" : ""}
+            </div>
+          )}
         </div>
 
         {!isStudent && (
@@ -0,0 +1,41 @@
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+# api.database builds its engine at import time; point it at a throwaway file first
+_DB_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api import conflicts, models  # noqa: E402
+from api.database import SessionLocal, engine  # noqa: E402
+from api.index import app  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    conflicts.invalidate()
+    session = SessionLocal()
+    session.add(models.StudyProgram(id=1, name="Computer Science", acronym="CS", start_date="2024", total_ects=180))
+    session.add(models.Semester(id=1, name="WS25", acronym="WS", start_date=date(2025, 10, 1), end_date=date(2026, 2, 1)))
+    for i in (1, 2):
+        session.add(models.Lecturer(id=i, first_name=f"Lecturer{i}", title="Dr", employment_type="Full"))
+        session.add(models.Room(id=i, name=f"R{i}", capacity=60, type="Lecture Classroom"))
+        session.add(models.Group(id=i, name=f"G{i}", size=20))
+        session.add(models.Module(module_code=f"M{i}", name=f"Module {i}", ects=5, room_type="Lecture Classroom", semester=1, program_id=1))
+        session.add(models.OfferedModule(id=i, module_code=f"M{i}", lecturer_id=i, semester="WS25"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    return TestClient(app)
@@ -0,0 +1,70 @@
+import pytest
+
+
+def _entry(offer=1, room=1, day="Monday", start="10:00", end="12:00", groups=()):
+    return {
+        "offered_module_id": offer,
+        "room_id": room,
+        "day_of_week": day,
+        "start_time": start,
+        "end_time": end,
+        "semester": "WS25",
+        "group_ids": list(groups),
+    }
+
+
+@pytest.fixture
+def booked(client):
+    r = client.post("/schedule/", json=_entry(groups=[1]))
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.parametrize("start,end", [("12:00", "13:00"), ("08:00", "10:00")])
+def test_touching_boundaries_are_allowed(client, booked, start, end):
+    # same room, lecturer and group; [start, end) intervals only touch
+    r = client.post("/schedule/", json=_entry(start=start, end=end, groups=[1]))
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.parametrize(
+    "entry,kind",
+    [
+        (_entry(offer=2, room=1, start="11:00", end="13:00"), "room"),
+        (_entry(offer=1, room=2, start="09:00", end="10:30"), "lecturer"),
+        (_entry(offer=2, room=2, start="10:30", end="11:30", groups=[1]), "group"),
+    ],
+)
+def test_partial_overlap_is_rejected(client, booked, entry, kind):
+    r = client.post("/schedule/", json=entry)
+    assert r.status_code == 409
+    assert f"{kind} " in r.json()["detail"]
+    assert f"(entry {booked['id']})" in r.json()["detail"]
+
+
+def test_other_day_is_allowed(client, booked):
+    r = client.post("/schedule/", json=_entry(day="Tuesday", groups=[1]))
+    assert r.status_code == 200, r.text
+
+
+def test_force_skips_the_check(client, booked):
+    r = client.post("/schedule/?force=true", json=_entry(offer=2, start="11:00", end="13:00"))
+    assert r.status_code == 200, r.text
+
+
+def test_update_checks_against_other_entries(client, booked):
+    other = client.post("/schedule/", json=_entry(offer=2, room=2, start="12:00", end="14:00")).json()
+
+    r = client.put(f"/schedule/{other['id']}", json={"room_id": 1, "start_time": "11:30"})
+    assert r.status_code == 409
+
+    r = client.put(f"/schedule/{other['id']}", json={"room_id": 1})
+    assert r.status_code == 200, r.text
+
+    r = client.put(f"/schedule/{other['id']}?force=true", json={"room_id": 1, "start_time": "11:30"})
+    assert r.status_code == 200, r.text
+
+
+def test_update_does_not_conflict_with_itself(client, booked):
+    r = client.put(f"/schedule/{booked['id']}", json={"end_time": "12:30"})
+    assert r.status_code == 200, r.text